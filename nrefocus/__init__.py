@@ -3,7 +3,10 @@ from .autof import autofocus, autofocus_stack
 from .propg import refocus, refocus_stack
 from . import pad
 from .iface import RefocusNumpy, RefocusNumpy1D, RefocusPyFFTW, RefocusCupy, \
-    get_best_interface
+    RefocusScipy, RefocusStack, RefocusStack1D, get_best_interface
+from .iface.autotune import autotune
+from ._executor import get_executor, shutdown_executors
+from ._kernel_cache import KernelCache, kernel_cache
 from ._ndarray_backend import get_ndarray_backend, set_ndarray_backend
 
 from ._version import version as __version__
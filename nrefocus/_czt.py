@@ -0,0 +1,70 @@
+"""Chirp-z transform for zoomed inverse Fourier transforms
+
+.. versionadded:: 0.7.0
+"""
+from ._ndarray_backend import xp
+
+
+def get_czt_length(size, count):
+    """Length of the FFTs used by :func:`izoom`"""
+    # the linear convolution needs at least size + count - 1 samples
+    return 1 << (size + count - 2).bit_length()
+
+
+def izoom(spectrum, axis, start, step, count):
+    r"""Inverse DFT at equidistant, non-integer positions
+
+    Computes
+
+    .. math::
+
+        u_j = \frac{1}{N} \sum_k F_k \exp(2\pi i f_k (s + j h))
+
+    for :math:`j = 0, \dots, M-1` with Bluestein's algorithm, where
+    :math:`f_k` are the sample frequencies of `spectrum` (see
+    :func:`numpy.fft.fftfreq`), :math:`s` is `start` and :math:`h` is
+    `step`. For integer `start` and `step`, this is a subset of
+    :func:`numpy.fft.ifft`. The computational cost scales with
+    :math:`(N + M) \log(N + M)` instead of the size of a zero-padded
+    spectrum with the sampling `step`.
+
+    Parameters
+    ----------
+    spectrum: ndarray
+        Fourier transform along `axis` (in the order of
+        :func:`numpy.fft.fft`)
+    axis: int
+        Axis along which the inverse transform is computed
+    start: float
+        Position of the first output sample [px]
+    step: float
+        Distance between two output samples [px]
+    count: int
+        Number of output samples
+
+    Returns
+    -------
+    field: ndarray
+        Inverse transform with `count` samples along `axis`
+    """
+    size = spectrum.shape[axis]
+    length = get_czt_length(size, count)
+    # frequencies (k - size//2) / size in ascending order
+    data = xp.moveaxis(xp.fft.fftshift(spectrum, axes=axis), axis, -1)
+    center = size // 2
+    scale = step / size
+    kk = xp.arange(size)
+    jj = xp.arange(count)
+    # exp(2πi·scale·k·j) = exp(iπ·scale·(k² + j² - (j-k)²))
+    pre = xp.exp(1j * xp.pi * (2 * kk * start / size + scale * kk ** 2))
+    post = xp.exp(1j * xp.pi * (scale * jj ** 2
+                                - 2 * center * (start + jj * step) / size))
+    chirp = xp.zeros(length, dtype=complex)
+    chirp[:count] = xp.exp(-1j * xp.pi * scale * jj ** 2)
+    if size > 1:
+        # negative lags of the linear convolution
+        nn = xp.arange(size - 1, 0, -1)
+        chirp[length - size + 1:] = xp.exp(-1j * xp.pi * scale * nn ** 2)
+    conv = xp.fft.ifft(xp.fft.fft(data * pre, n=length, axis=-1)
+                       * xp.fft.fft(chirp), axis=-1)[..., :count]
+    return xp.moveaxis(conv * post / size, -1, axis)
@@ -0,0 +1,170 @@
+"""Persistent executors for the stack functions
+
+:func:`nrefocus.refocus_stack` and :func:`nrefocus.autofocus_stack`
+distribute the fields of a stack to an executor from
+:mod:`concurrent.futures`. By default, a process pool is created on
+first use and kept for all subsequent calls, such that the worker
+processes only start (and import `nrefocus` and `lmfit`) once. The
+warm workers keep their process-wide caches between calls, i.e. the
+kernel cache (:data:`nrefocus.kernel_cache`) and, for
+:class:`nrefocus.RefocusPyFFTW`, the FFTW plans and wisdom.
+
+Since the Fourier transforms of numpy and the kernel evaluation with
+numexpr release the GIL, a thread pool (`executor="thread"`) is a
+lightweight alternative that does not copy the stack at all.
+
+.. versionadded:: 0.7.0
+"""
+import atexit
+import concurrent.futures as cf
+import os
+import threading
+
+from ._ndarray_backend import xp
+from ._shared_stack import SharedStack
+from ._threads import THREAD_ENV_VARS, get_cpu_count
+
+
+#: Kinds of persistent executors (see :func:`get_executor`)
+EXECUTOR_KINDS = ["process", "thread"]
+
+_lock = threading.Lock()
+#: Persistent executors (kind: executor)
+_executors = {}
+
+
+def _init_process_worker():
+    """Limit the multithreaded FFTs of a worker process to one thread
+
+    The workers of :class:`concurrent.futures.ProcessPoolExecutor`
+    are not daemonic, so :func:`nrefocus._threads.get_thread_budget`
+    cannot tell that they share the CPUs with the other workers.
+    """
+    os.environ.setdefault(THREAD_ENV_VARS[0], "1")
+
+
+def get_executor(kind="process", max_workers=None):
+    """Return a persistent executor for the stack functions
+
+    The executor is created on first use and shut down when the
+    interpreter exits (or with :func:`shutdown_executors`). If
+    `max_workers` changes, the executor is replaced.
+
+    Parameters
+    ----------
+    kind: str
+        "process" for a :class:`concurrent.futures.ProcessPoolExecutor`
+        or "thread" for a :class:`concurrent.futures.ThreadPoolExecutor`
+    max_workers: int or None
+        Number of workers; defaults to the number of CPUs available
+        to the process
+
+    Returns
+    -------
+    executor: concurrent.futures.Executor
+        The persistent executor; do not shut it down
+    """
+    if kind not in EXECUTOR_KINDS:
+        raise ValueError(f"Unknown executor kind: '{kind}'")
+    if max_workers is None:
+        max_workers = get_cpu_count()
+    with _lock:
+        if not _executors:
+            atexit.register(shutdown_executors)
+        current = _executors.get(kind)
+        if current is not None:
+            if current[0] == max_workers:
+                return current[1]
+            current[1].shutdown(wait=False)
+        if kind == "process":
+            executor = cf.ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_process_worker)
+        else:
+            executor = cf.ThreadPoolExecutor(max_workers=max_workers)
+        _executors[kind] = (max_workers, executor)
+        return executor
+
+
+def shutdown_executors(wait=True):
+    """Shut down all persistent executors of :func:`get_executor`"""
+    with _lock:
+        executors = [ex for _, ex in _executors.values()]
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def map_stack(worker, fieldstack, dtype, kwargs, executor=None,
+              num_cpus=None):
+    """Apply a function to every field of a stack with an executor
+
+    For thread pools, the workers access the stacks directly. For
+    all other executors (e.g. process pools), the input and output
+    stacks are placed in shared memory and the workers only receive
+    the names of the memory blocks (see :mod:`nrefocus._shared_stack`).
+
+    Parameters
+    ----------
+    worker: callable
+        Picklable function `worker(field, **kwargs[m])` that
+        returns the processed field (or None) and a picklable result
+    fieldstack: ndarray
+        Stack of fields; the first axis iterates through the fields
+    dtype: dtype
+        Data type of the output stack
+    kwargs: list of dicts
+        Keyword arguments for each field
+    executor: None, str, or concurrent.futures.Executor
+        Executor to use; None or a kind in :const:`EXECUTOR_KINDS`
+        selects a persistent executor (see :func:`get_executor`)
+    num_cpus: int or None
+        Number of workers of the persistent executor
+
+    Returns
+    -------
+    outstack: ndarray
+        Stack of processed fields (zeros where `worker` returned None)
+    results: list
+        The results of `worker` for each field
+    """
+    if executor is None:
+        executor = "process"
+    if isinstance(executor, str):
+        executor = get_executor(executor, max_workers=num_cpus)
+    indices = range(fieldstack.shape[0])
+    if isinstance(executor, cf.ThreadPoolExecutor):
+        outstack = xp.zeros(fieldstack.shape, dtype=dtype)
+        results = list(executor.map(
+            _process_field,
+            [(worker, fieldstack, outstack, m, kwargs[m]) for m in indices]))
+    else:
+        with SharedStack(fieldstack.shape, fieldstack.dtype,
+                         data=fieldstack) as src, \
+                SharedStack(fieldstack.shape, dtype) as dst:
+            results = list(executor.map(
+                _process_shared_field,
+                [(worker, src.spec, dst.spec, m, kwargs[m])
+                 for m in indices]))
+            outstack = xp.array(dst.array, copy=True)
+    return outstack, results
+
+
+def _process_field(args):
+    """Apply a worker to one field and write it to the output stack"""
+    worker, src, dst, index, kwargs = args
+    field, result = worker(src[index], **kwargs)
+    if field is not None:
+        dst[index] = field
+    return result
+
+
+def _process_shared_field(args):
+    """Like :func:`_process_field` for stacks in shared memory"""
+    worker, src_spec, dst_spec, index, kwargs = args
+    src = SharedStack.attach(src_spec)
+    dst = SharedStack.attach(dst_spec)
+    try:
+        return _process_field((worker, src.array, dst.array, index, kwargs))
+    finally:
+        src.close()
+        dst.close()
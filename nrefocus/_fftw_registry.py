@@ -0,0 +1,158 @@
+"""Process-wide pool of FFTW plans and their aligned buffers
+
+Creating a :class:`pyfftw.FFTW` plan allocates aligned input and
+output arrays and runs the FFTW planner. For a sequence of
+:class:`nrefocus.RefocusPyFFTW` instances with the same shape (e.g.
+when autofocusing the frames of a stack), the plans and buffers of
+instances that were garbage-collected are handed to new instances
+instead.
+
+Plans are leased exclusively, i.e. every instance has its own
+buffers, like without the pool. Returned plans are kept until
+their total size exceeds the memory budget of the pool.
+
+.. versionadded:: 0.7.0
+"""
+import collections
+import threading
+
+import pyfftw
+
+
+class FFTWRegistry:
+    def __init__(self, max_bytes=512 * 1024**2):
+        """Pool of FFTW plans with reference counting
+
+        Parameters
+        ----------
+        max_bytes: int
+            Memory budget for the buffers of unused plans in bytes;
+            the least recently returned plans are freed when the
+            budget is exceeded. Set to 0 to disable pooling.
+        """
+        self._max_bytes = max_bytes
+        #: unused plans (plan id: (key, plan)), least recent first
+        self._idle = collections.OrderedDict()
+        #: keys of leased plans (plan id: key)
+        self._leased = {}
+        self._lock = threading.Lock()
+        #: Number of leased plans per key
+        self.refcounts = collections.Counter()
+        #: Number of bytes held by unused plans
+        self.nbytes = 0
+        #: Number of plans that were reused
+        self.hits = 0
+        #: Number of plans that were created
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._idle)
+
+    @property
+    def max_bytes(self):
+        """Memory budget for unused plans in bytes"""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    def acquire(self, input_shape, input_dtype, output_shape, output_dtype,
+                axes, direction="FFTW_FORWARD", flags=("FFTW_MEASURE",),
+                threads=1, planning_timelimit=None):
+        """Lease a plan with new or reused aligned buffers
+
+        The arguments are those of :func:`pyfftw.empty_aligned` and
+        :class:`pyfftw.FFTW`. `planning_timelimit` is only used for
+        new plans.
+
+        Returns
+        -------
+        plan: pyfftw.FFTW
+            Plan with the buffers `plan.input_array` and
+            `plan.output_array`; the contents of the buffers are
+            undefined. Return the plan with :func:`release`.
+        """
+        key = (tuple(input_shape), str(input_dtype),
+               tuple(output_shape), str(output_dtype),
+               tuple(axes), direction, tuple(flags), threads)
+        plan = None
+        with self._lock:
+            for plan_id, (idle_key, idle_plan) in reversed(self._idle.items()):
+                if idle_key == key:
+                    plan = idle_plan
+                    del self._idle[plan_id]
+                    self.nbytes -= get_plan_nbytes(plan)
+                    self.hits += 1
+                    break
+            else:
+                self.misses += 1
+        if plan is None:
+            plan = pyfftw.FFTW(
+                pyfftw.empty_aligned(input_shape, dtype=input_dtype),
+                pyfftw.empty_aligned(output_shape, dtype=output_dtype),
+                axes=axes,
+                direction=direction,
+                flags=flags,
+                threads=threads,
+                planning_timelimit=planning_timelimit)
+        with self._lock:
+            self._leased[id(plan)] = key
+            self.refcounts[key] += 1
+        return plan
+
+    def release(self, plan):
+        """Return a plan obtained with :func:`acquire` to the pool"""
+        with self._lock:
+            key = self._leased.pop(id(plan))
+            self.refcounts[key] -= 1
+            if not self.refcounts[key]:
+                del self.refcounts[key]
+            self._idle[id(plan)] = (key, plan)
+            self.nbytes += get_plan_nbytes(plan)
+            self._evict()
+
+    def clear(self):
+        """Free all unused plans and reset the hit/miss counters"""
+        with self._lock:
+            self._idle.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return a dictionary with the pool statistics"""
+        return {"idle": len(self._idle),
+                "leased": len(self._leased),
+                "nbytes": self.nbytes,
+                "max_bytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                }
+
+    def _evict(self):
+        """Free least recently returned plans until within budget"""
+        while self._idle and self.nbytes > self._max_bytes:
+            _, (_, plan) = self._idle.popitem(last=False)
+            self.nbytes -= get_plan_nbytes(plan)
+
+
+def get_plan_nbytes(plan):
+    """Return the number of bytes of the buffers of a plan"""
+    return plan.input_array.nbytes + plan.output_array.nbytes
+
+
+def release_plans(plans):
+    """Return all plans in the list `plans` to :data:`fftw_registry`
+
+    The list is emptied. This is used as a :class:`weakref.finalize`
+    callback of :class:`nrefocus.RefocusPyFFTW`.
+    """
+    while plans:
+        fftw_registry.release(plans.pop())
+
+
+#: FFTW plan pool shared by all RefocusPyFFTW instances of this process
+fftw_registry = FFTWRegistry()
@@ -0,0 +1,135 @@
+"""Persistent FFTW wisdom for :class:`nrefocus.RefocusPyFFTW`
+
+FFTW stores the results of planning (e.g. with `FFTW_MEASURE`) as
+"wisdom". Loading the wisdom of previous runs makes planning of the
+same transforms almost free. The wisdom is loaded from a cache file
+when the first :class:`nrefocus.RefocusPyFFTW` is created and newly
+acquired wisdom is saved when the interpreter exits.
+
+The cache file is defined by the environment variable
+`NREFOCUS_FFTW_WISDOM`; set it to an empty string to disable the
+cache. It defaults to `nrefocus/fftw_wisdom.json` in the user cache
+directory (`XDG_CACHE_HOME` or `~/.cache`).
+
+.. versionadded:: 0.7.0
+"""
+import atexit
+import pathlib
+import threading
+
+import pyfftw
+
+from ._user_cache import get_cache_path, read_json, write_json
+
+
+#: Environment variable for the path of the wisdom cache file
+WISDOM_ENV_VAR = "NREFOCUS_FFTW_WISDOM"
+
+#: Version of the wisdom file format
+WISDOM_FORMAT = 1
+
+_lock = threading.Lock()
+#: Wisdom that is already stored in the cache file
+_saved_wisdom = None
+_loaded = False
+
+
+def get_wisdom_path():
+    """Return the path of the wisdom cache file (None if disabled)"""
+    return get_cache_path(WISDOM_ENV_VAR, "fftw_wisdom.json")
+
+
+def _read_wisdom(path):
+    """Read wisdom from `path`, return None if it cannot be used"""
+    data = read_json(path)
+    try:
+        if data["format"] != WISDOM_FORMAT:
+            return None
+        return tuple(ww.encode("ascii") for ww in data["wisdom"])
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def load_wisdom(path=None):
+    """Import FFTW wisdom from a cache file
+
+    Parameters
+    ----------
+    path: str or pathlib.Path or None
+        Wisdom cache file; defaults to :func:`get_wisdom_path`
+
+    Returns
+    -------
+    success: bool
+        Whether wisdom was imported; False if the file does not
+        exist or cannot be read
+    """
+    global _saved_wisdom
+    if path is None:
+        path = get_wisdom_path()
+        if path is None:
+            return False
+    path = pathlib.Path(path)
+    wisdom = _read_wisdom(path)
+    if wisdom is None:
+        return False
+    pyfftw.import_wisdom(wisdom)
+    with _lock:
+        if path == get_wisdom_path():
+            _saved_wisdom = pyfftw.export_wisdom()
+    return True
+
+
+def save_wisdom(path=None):
+    """Export the FFTW wisdom of this process to a cache file
+
+    The wisdom in the file is merged with the wisdom of this process
+    and the file is replaced atomically, such that processes sharing
+    the file neither lose each other's wisdom (except for concurrent
+    writes) nor read incomplete files.
+
+    Parameters
+    ----------
+    path: str or pathlib.Path or None
+        Wisdom cache file; defaults to :func:`get_wisdom_path`
+
+    Returns
+    -------
+    success: bool
+        Whether the wisdom was written
+    """
+    global _saved_wisdom
+    if path is None:
+        path = get_wisdom_path()
+        if path is None:
+            return False
+    path = pathlib.Path(path)
+    stored = _read_wisdom(path)
+    if stored is not None:
+        pyfftw.import_wisdom(stored)
+    wisdom = pyfftw.export_wisdom()
+    data = {"format": WISDOM_FORMAT,
+            "wisdom": [ww.decode("ascii") for ww in wisdom]}
+    if not write_json(path, data):
+        return False
+    with _lock:
+        if path == get_wisdom_path():
+            _saved_wisdom = wisdom
+    return True
+
+
+def ensure_wisdom_loaded():
+    """Load the wisdom cache once and save new wisdom at exit"""
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+    load_wisdom()
+    atexit.register(_save_wisdom_at_exit)
+
+
+def _save_wisdom_at_exit():
+    """Save the wisdom cache if new wisdom was acquired"""
+    if pyfftw.export_wisdom() != _saved_wisdom:
+        save_wisdom()
@@ -0,0 +1,158 @@
+"""Process-wide cache for propagation kernels
+
+Refocus instances that share the same geometry (padded shape,
+wavelength, pixel size, medium index and kernel type) compute
+identical kernels for identical relative distances. This module
+provides a bounded least-recently-used cache that is shared by all
+:class:`nrefocus.iface.base.Refocus` instances of a process.
+
+.. versionadded:: 0.7.0
+"""
+import collections
+import contextlib
+import threading
+
+
+class KernelCache:
+    def __init__(self, max_bytes=256 * 1024**2):
+        """Bounded LRU cache for propagation kernels
+
+        Parameters
+        ----------
+        max_bytes: int
+            Memory budget of the cache in bytes; the least recently
+            used entries are evicted when the budget is exceeded.
+            Set to 0 to disable caching.
+
+        Notes
+        -----
+        Cached numpy arrays are flagged read-only, because they
+        are handed out to all Refocus instances with the same
+        geometry.
+        """
+        self._max_bytes = max_bytes
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        #: Number of bytes currently held by the cache
+        self.nbytes = 0
+        #: Number of successful lookups
+        self.hits = 0
+        #: Number of unsuccessful lookups
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def max_bytes(self):
+        """Memory budget of the cache in bytes"""
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    def accepts(self, nbytes):
+        """Whether an entry of size `nbytes` would be cached at all"""
+        return 0 < nbytes <= self._max_bytes
+
+    def clear(self):
+        """Remove all entries and reset the hit/miss counters"""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    @contextlib.contextmanager
+    def isolated(self):
+        """Context manager that hides the cache contents temporarily
+
+        The cache is empty within the context and the previous
+        entries and statistics are restored afterwards, discarding
+        all entries added within the context. This is used for
+        timing kernel computations (see :func:`nrefocus.autotune`)
+        without altering the cache of the caller.
+        """
+        with self._lock:
+            saved = (self._data, self.nbytes, self.hits, self.misses)
+            self._data = collections.OrderedDict()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._data, self.nbytes, self.hits, self.misses = saved
+
+    def get(self, key):
+        """Return the cached entry for `key` or None"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Add an array (or a tuple of arrays/None) to the cache
+
+        Entries larger than :attr:`max_bytes` are not stored.
+        """
+        nbytes = get_nbytes(value)
+        if not self.accepts(nbytes):
+            return
+        for arr in _iter_arrays(value):
+            if hasattr(arr, "flags") and hasattr(arr.flags, "writeable"):
+                # cupy arrays cannot be flagged read-only
+                try:
+                    arr.flags.writeable = False
+                except (AttributeError, ValueError):
+                    pass
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= get_nbytes(self._data.pop(key))
+            self._data[key] = value
+            self.nbytes += nbytes
+            self._evict()
+
+    def stats(self):
+        """Return a dictionary with the cache statistics"""
+        return {"entries": len(self._data),
+                "nbytes": self.nbytes,
+                "max_bytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                }
+
+    def _evict(self):
+        """Remove least recently used entries until within budget"""
+        while self._data and self.nbytes > self._max_bytes:
+            _, value = self._data.popitem(last=False)
+            self.nbytes -= get_nbytes(value)
+
+
+def _iter_arrays(value):
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            yield from _iter_arrays(item)
+    elif value is not None:
+        yield value
+
+
+def get_nbytes(value):
+    """Return the number of bytes of an array or a tuple of arrays"""
+    return sum(getattr(arr, "nbytes", 0) for arr in _iter_arrays(value))
+
+
+#: Kernel cache shared by all Refocus instances of this process
+kernel_cache = KernelCache()
@@ -0,0 +1,91 @@
+"""Field stacks in shared memory for worker processes
+
+:func:`nrefocus.refocus_stack` and :func:`nrefocus.autofocus_stack`
+place the input and the output stack in
+:class:`multiprocessing.shared_memory.SharedMemory` blocks. The worker
+processes only receive the names of the blocks, the index of their
+field and the refocusing parameters, and they write their results
+directly to the output block. Compared to sending every field to the
+workers and every refocused field back (pickling), this avoids
+several copies of the stack.
+
+.. versionadded:: 0.7.0
+"""
+import gc
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedStack:
+    def __init__(self, shape, dtype, data=None, name=None):
+        """Numpy array in a shared memory block
+
+        Parameters
+        ----------
+        shape: tuple of ints
+            Shape of the array
+        dtype: dtype
+            Data type of the array
+        data: ndarray or None
+            Initial values of the array; the array is filled with
+            zeros if None (only when creating a new block)
+        name: str or None
+            Name of an existing block to attach to (in a worker
+            process); if None, a new block is created, which is
+            removed in :func:`SharedStack.close`
+        """
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        nbytes = self.dtype.itemsize * int(np.prod(self.shape))
+        self._owner = name is None
+        if self._owner:
+            # blocks must not be empty
+            self._shm = shared_memory.SharedMemory(create=True,
+                                                   size=max(nbytes, 1))
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        #: Array in the shared memory block
+        self.array = np.ndarray(self.shape, dtype=self.dtype,
+                                buffer=self._shm.buf)
+        if self._owner:
+            if data is None:
+                self.array[...] = 0
+            else:
+                self.array[...] = data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def spec(self):
+        """Picklable description for :func:`SharedStack.attach`"""
+        return self._shm.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        """Attach to the block of another process via its `spec`"""
+        name, shape, dtype = spec
+        return cls(shape=shape, dtype=dtype, name=name)
+
+    def close(self):
+        """Release the block (and remove it if it was created here)
+
+        All views of :attr:`SharedStack.array` must be released
+        before.
+        """
+        if self._shm is None:
+            return
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # views in reference cycles (e.g. of a Refocus instance)
+            gc.collect()
+            self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,49 @@
+"""Thread budget of the current process
+
+.. versionadded:: 0.7.0
+"""
+import multiprocessing as mp
+import os
+
+
+#: Environment variables that limit the number of threads (in this order)
+THREAD_ENV_VARS = ["NREFOCUS_NUM_THREADS", "OMP_NUM_THREADS"]
+
+
+def get_cpu_count():
+    """Number of CPUs the current process may run on
+
+    This respects the CPU affinity of the process (e.g. set via
+    `taskset` or a batch scheduler), which may be smaller than
+    :func:`multiprocessing.cpu_count`.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # not available on macOS and Windows
+        return mp.cpu_count()
+
+
+def get_thread_budget():
+    """Default number of threads for multithreaded Fourier transforms
+
+    The thread budget is
+
+    - the value of the first environment variable in
+      :const:`THREAD_ENV_VARS` that is set to a positive integer,
+    - 1 in daemonic worker processes (e.g. of a
+      :class:`multiprocessing.pool.Pool`), which would otherwise
+      oversubscribe the CPUs that are shared with the other workers,
+    - the number of CPUs available to the process otherwise
+      (see :func:`get_cpu_count`).
+    """
+    for var in THREAD_ENV_VARS:
+        try:
+            threads = int(os.environ.get(var, ""))
+        except ValueError:
+            continue
+        if threads > 0:
+            return threads
+    if mp.current_process().daemon:
+        return 1
+    return get_cpu_count()
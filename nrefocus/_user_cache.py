@@ -0,0 +1,70 @@
+"""Files in the user cache directory
+
+.. versionadded:: 0.7.0
+"""
+import json
+import os
+import pathlib
+import tempfile
+
+
+def get_cache_path(env_var, name):
+    """Return the path of a cache file (None if disabled)
+
+    Parameters
+    ----------
+    env_var: str
+        Environment variable that overrides the path; an empty
+        string disables the cache file
+    name: str
+        File name in the `nrefocus` directory of the user cache
+        directory (`XDG_CACHE_HOME` or `~/.cache`)
+    """
+    path = os.environ.get(env_var)
+    if path is None:
+        cache_dir = os.environ.get("XDG_CACHE_HOME") \
+            or pathlib.Path.home() / ".cache"
+        return pathlib.Path(cache_dir) / "nrefocus" / name
+    elif path:
+        return pathlib.Path(path)
+    else:
+        return None
+
+
+def read_json(path):
+    """Read a JSON file, return None if it cannot be read"""
+    try:
+        with open(path) as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path, data):
+    """Atomically replace a JSON file
+
+    The data are written to a temporary file in the same directory,
+    which then replaces `path`, such that other processes never read
+    incomplete files.
+
+    Returns
+    -------
+    success: bool
+        Whether the file was written
+    """
+    path = pathlib.Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=path.name + ".",
+                                        suffix=".tmp",
+                                        dir=path.parent)
+        try:
+            with os.fdopen(fd, "w") as fobj:
+                json.dump(data, fobj)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        return False
+    return True
@@ -3,6 +3,7 @@ import multiprocessing as mp
 from ._ndarray_backend import xp
 
 from . import iface
+from ._executor import map_stack
 from .propg import refocus_stack
 
 
@@ -66,14 +67,23 @@ def autofocus(field, nm, res, ival, roi=None,
     of 2D fields. This is because the :func:`nrefocus.refocus_stack`
     function uses `async` which appears to not work with e.g.
     :mod:`pyfftw`.
+
+    .. versionchanged:: 0.7.0
+       If the shape of `field` was autotuned on this host (see
+       :func:`nrefocus.autotune`), the fastest interface is used.
     """
     fshape = len(field.shape)
+    rfkwargs = {}
     if fshape == 1:
         # 1D field
         rfcls = iface.RefocusNumpy1D
     elif fshape == 2:
         # 2D field
         rfcls = iface.RefocusNumpy
+        tuned = iface.autotune.get_tuned_settings(field.shape)
+        if tuned is not None:
+            # fastest interface on this host (see `nrefocus.autotune`)
+            rfcls, rfkwargs = tuned
     else:
         raise AssertionError("Dimension of `field` must be 1 or 2.")
 
@@ -90,7 +100,8 @@ def autofocus(field, nm, res, ival, roi=None,
                medium_index=nm,
                distance=0,
                kernel="helmholtz",
-               padding=padding
+               padding=padding,
+               **rfkwargs
                )
 
     data = rf.autofocus(metric=metric,
@@ -108,7 +119,7 @@ def autofocus(field, nm, res, ival, roi=None,
 def autofocus_stack(fieldstack, nm, res, ival, roi=None,
                     metric="average gradient", minimizer="lmfit",
                     minimizer_kwargs=None, padding=True, same_dist=False,
-                    num_cpus=_cpu_count, copy=True):
+                    num_cpus=_cpu_count, copy=True, executor=None):
     """Numerical autofocusing of a stack using the Helmholtz equation.
 
     Parameters
@@ -143,7 +154,13 @@ def autofocus_stack(fieldstack, nm, res, ival, roi=None,
         Number of CPUs to use
     copy: bool
         If False, overwrites input array.
+    executor: None, str, or concurrent.futures.Executor
+        Executor for autofocusing the fields; "process" (default if
+        None) or "thread" for the persistent process or thread pool
+        with `num_cpus` workers (see :func:`nrefocus.get_executor`),
+        or any executor instance, which is not shut down
 
+        .. versionadded:: 0.7.0
 
     Returns
     -------
@@ -151,30 +168,35 @@ def autofocus_stack(fieldstack, nm, res, ival, roi=None,
         The focusing distance(s) (only one value if `same_dist`)
     field_stack: xp.ndarray
         The refocused field stack
+
+    Notes
+    -----
+    The fields are autofocused with `executor`; worker processes
+    read the input and write the output stack in shared memory (see
+    :mod:`nrefocus._shared_stack`).
+
+    .. versionchanged:: 0.7.0
+       shared memory transport and persistent pools for worker
+       processes
     """
     dopt = list()
 
     m = fieldstack.shape[0]
-
-    # setup arguments
-    stackargs = list()
-    for s in range(m):
-        stackargs.append([xp.array(fieldstack[s], copy=copy), nm, res, ival,
-                          roi, metric, minimizer, minimizer_kwargs,
-                          padding, 1])
+    kwargs = {"nm": nm, "res": res, "ival": ival, "roi": roi,
+              "metric": metric, "minimizer": minimizer,
+              "minimizer_kwargs": minimizer_kwargs, "padding": padding,
+              "num_cpus": 1}
     # perform first pass
-    p = mp.Pool(num_cpus)
-    result = p.map_async(_autofocus_wrapper, stackargs).get()
-    p.close()
-    p.terminate()
-    p.join()
-
-    newstack = xp.zeros(fieldstack.shape, dtype=fieldstack.dtype)
+    newstack, result = map_stack(_autofocus_field,
+                                 fieldstack,
+                                 dtype=fieldstack.dtype,
+                                 kwargs=[kwargs] * m,
+                                 executor=executor,
+                                 num_cpus=num_cpus)
 
     for s in range(m):
-        if isinstance(result[s], list):
-            dopt.append(result[s][0])
-            newstack[s] = result[s][1]
+        if result[s] is not None:
+            dopt.append(result[s])
 
     # perform second pass if `same_dist` is True
     if same_dist:
@@ -182,14 +204,20 @@ def autofocus_stack(fieldstack, nm, res, ival, roi=None,
         davg = xp.average(dopt)
         newstack = refocus_stack(fieldstack, davg, nm, res,
                                  num_cpus=num_cpus, copy=copy,
-                                 padding=padding)
+                                 padding=padding, executor=executor)
 
         return davg, newstack
     else:
         return dopt, newstack
 
 
-def _autofocus_wrapper(args):
-    """Calls autofocus with *args. Needed for multiprocessing pool.
+def _autofocus_field(field, **kwargs):
+    """Autofocus one field of a stack (see :func:`_executor.map_stack`)
+
+    Returns the refocused field and the focusing distance (None
+    if autofocusing did not return a field).
     """
-    return autofocus(*args)
+    data = autofocus(field, **kwargs)
+    if isinstance(data, list):
+        return data[1], data[0]
+    return None, None
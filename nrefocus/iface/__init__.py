@@ -1,8 +1,10 @@
 # flake8: noqa: F401
 import warnings
 
+from . import autotune
 from .rf_numpy import RefocusNumpy
 from .rf_numpy_1d import RefocusNumpy1D
+from .rf_stack import RefocusStack, RefocusStack1D
 
 try:
     import pyfftw
@@ -13,6 +15,15 @@ except ImportError:
 else:
     from .rf_pyfftw import RefocusPyFFTW
 
+try:
+    import scipy.fft
+except ImportError:
+    scipy = None
+    RefocusScipy = None
+    warnings.warn("Interface 'RefocusScipy' unavailable!")
+else:
+    from .rf_scipy import RefocusScipy
+
 try:
     import cupy
 except ImportError:
@@ -23,17 +34,31 @@ else:
     from .rf_cupy import RefocusCupy
 
 
-def get_best_interface():
+def get_best_interface(shape=None):
     """Return the fastest refocusing interface available
 
+    If `shape` is given and was autotuned on this host (see
+    :func:`nrefocus.autotune`), the fastest interface in the
+    autotuning profile is returned. Otherwise:
+
     If `cupy` is installed, :class:`nrefocus.RefocusCupy`
     is returned. If `cupy` is not installed, then
     if `pyfftw` is installed, :class:`nrefocus.RefocusPyFFTW`
-    is returned. The fallback is :class:`nrefocus.RefocusNumpy`.
+    is returned. Otherwise, if `scipy` is installed,
+    :class:`nrefocus.RefocusScipy` is returned. The fallback
+    is :class:`nrefocus.RefocusNumpy`.
+
+    .. versionchanged:: 0.7.0
+       added :class:`nrefocus.RefocusScipy` and the `shape` argument
     """
+    if shape is not None:
+        tuned = autotune.get_tuned_settings(shape)
+        if tuned is not None:
+            return tuned[0]
     ordered_candidates = [
         RefocusCupy,
         RefocusPyFFTW,
+        RefocusScipy,
         RefocusNumpy,
     ]
     for cand in ordered_candidates:
@@ -0,0 +1,270 @@
+"""Autotuning of the refocusing interface for a field shape
+
+:func:`autotune` times short trial propagations with the available
+interfaces and settings (number of threads, precision, padding
+size) for a given field shape and records the fastest combination
+in a per-host profile. :func:`nrefocus.get_best_interface` and the
+functional API (:func:`nrefocus.refocus`, :func:`nrefocus.autofocus`)
+use the profile for shapes that were tuned.
+
+The profile is stored in the file defined by the environment variable
+`NREFOCUS_AUTOTUNE_PROFILE` (an empty string disables the profile),
+which defaults to `nrefocus/autotune_<hostname>.json` in the user
+cache directory (`XDG_CACHE_HOME` or `~/.cache`).
+
+.. versionadded:: 0.7.0
+"""
+import itertools
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+
+from .._kernel_cache import kernel_cache
+from .._ndarray_backend import xp
+from .._threads import get_thread_budget
+from .._user_cache import get_cache_path, read_json, write_json
+
+
+#: Environment variable for the path of the autotuning profile
+PROFILE_ENV_VAR = "NREFOCUS_AUTOTUNE_PROFILE"
+
+#: Version of the profile file format
+PROFILE_FORMAT = 1
+
+_lock = threading.Lock()
+#: Parsed profiles (path: (file signature, shapes))
+_profiles = {}
+
+
+def get_profile_path():
+    """Return the path of the autotuning profile (None if disabled)"""
+    return get_cache_path(PROFILE_ENV_VAR,
+                          f"autotune_{socket.gethostname()}.json")
+
+
+def get_profile_key(shape):
+    """Key of a field shape in the autotuning profile"""
+    return "{}:{}".format(xp.backend_name(),
+                          "x".join(str(int(s)) for s in shape))
+
+
+def load_profile(path=None):
+    """Return the autotuning profile as a dictionary
+
+    Parameters
+    ----------
+    path: str or pathlib.Path or None
+        Profile file; defaults to :func:`get_profile_path`
+
+    Returns
+    -------
+    profile: dict
+        Results of :func:`autotune` for each profile key (see
+        :func:`get_profile_key`); empty if there is no profile
+
+    Notes
+    -----
+    The parsed profile is kept in memory and the file is only read
+    again when its modification time, size or inode change (the
+    profile is replaced atomically by :func:`save_result`).
+    """
+    if path is None:
+        path = get_profile_path()
+        if path is None:
+            return {}
+    path = str(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _lock:
+        cached = _profiles.get(path)
+    if cached is not None and cached[0] == signature:
+        shapes = cached[1]
+    else:
+        data = read_json(path)
+        if (not isinstance(data, dict)
+                or data.get("format") != PROFILE_FORMAT
+                or not isinstance(data.get("shapes"), dict)):
+            shapes = {}
+        else:
+            shapes = data["shapes"]
+        with _lock:
+            _profiles[path] = (signature, shapes)
+    # callers may modify the returned dictionary
+    return dict(shapes)
+
+
+def get_tuned_settings(shape, path=None):
+    """Return the tuned interface and keyword arguments for `shape`
+
+    Parameters
+    ----------
+    shape: tuple of ints
+        Shape of the input field
+    path: str or pathlib.Path or None
+        Profile file; defaults to :func:`get_profile_path`
+
+    Returns
+    -------
+    settings: tuple or None
+        The interface class and the keyword arguments (e.g. "threads"
+        or "pad_size") to create it with; None if `shape` was not
+        tuned or the tuned interface is not available
+    """
+    from .. import iface
+
+    entry = load_profile(path).get(get_profile_key(shape))
+    if entry is None:
+        return None
+    rfcls = getattr(iface, entry.get("interface", ""), None)
+    if rfcls is None:
+        return None
+    return rfcls, dict(entry.get("kwargs", {}))
+
+
+def get_candidates(threads=None, dtypes=("complex128",),
+                   pad_sizes=(None, "fast")):
+    """Return the interfaces and settings tried by :func:`autotune`
+
+    Parameters
+    ----------
+    threads: list of ints or None
+        Numbers of threads to try for multithreaded interfaces;
+        defaults to one thread and the thread budget of the process
+    dtypes: list of str
+        Precisions to try (see :func:`Refocus.__init__`)
+    pad_sizes: list
+        Padding sizes to try (see :func:`Refocus.__init__`)
+
+    Returns
+    -------
+    candidates: list of tuples
+        Interface classes and the keyword arguments to create them with
+    """
+    from .. import iface
+
+    if threads is None:
+        threads = sorted({1, get_thread_budget()})
+    candidates = []
+    if xp.is_cupy():
+        interfaces = [(iface.RefocusCupy, None)]
+    else:
+        interfaces = [(iface.RefocusNumpy, None),
+                      (iface.RefocusScipy, "workers"),
+                      (iface.RefocusPyFFTW, "threads"),
+                      ]
+    for (rfcls, thread_kw), dtype, pad_size in itertools.product(
+            interfaces, dtypes, pad_sizes):
+        if rfcls is None:
+            continue
+        kwargs = {"dtype": dtype, "pad_size": pad_size}
+        if thread_kw is None:
+            candidates.append((rfcls, kwargs))
+        else:
+            for num in threads:
+                candidates.append((rfcls, dict(kwargs, **{thread_kw: num})))
+    return candidates
+
+
+def autotune(shape, candidates=None, repeats=5, save=True, path=None):
+    """Find the fastest refocusing interface and settings for a shape
+
+    Every candidate is created for a random field of the given
+    shape and timed for `repeats` propagations (after one warm-up
+    propagation). Candidates are ranked by the median propagation
+    time; the time it takes to create the instance (e.g. FFTW
+    planning) is recorded, but not used for ranking.
+
+    Every candidate starts with an empty :data:`nrefocus.kernel_cache`,
+    such that all candidates compute their kernels instead of reusing
+    the kernels of the previous candidates. The contents of the cache
+    are restored afterwards (see
+    :meth:`nrefocus._kernel_cache.KernelCache.isolated`).
+
+    Parameters
+    ----------
+    shape: tuple of ints
+        Shape of the 2D input field
+    candidates: list of tuples or None
+        Interface classes and keyword arguments to try; defaults
+        to :func:`get_candidates`
+    repeats: int
+        Number of timed propagations per candidate
+    save: bool
+        Whether to record the result in the autotuning profile
+    path: str or pathlib.Path or None
+        Profile file; defaults to :func:`get_profile_path`
+
+    Returns
+    -------
+    result: dict
+        Name of the fastest "interface", its "kwargs", its median
+        propagation "time" and "init_time" [s], and the "timings" of
+        all candidates
+    """
+    shape = tuple(int(s) for s in shape)
+    if len(shape) != 2:
+        raise ValueError("Autotuning is only implemented for 2D fields!")
+    if candidates is None:
+        candidates = get_candidates()
+    rng = np.random.default_rng(42)
+    field = xp.asarray(np.exp(1j * rng.uniform(0, 0.1, size=shape)))
+    timings = []
+    for rfcls, kwargs in candidates:
+        # every candidate starts with an empty kernel cache
+        with kernel_cache.isolated():
+            t0 = time.perf_counter()
+            rf = rfcls(field=field,
+                       wavelength=647e-9,
+                       pixel_size=0.139e-6,
+                       **kwargs)
+            init_time = time.perf_counter() - t0
+            times = []
+            for ii in range(repeats + 1):
+                t0 = time.perf_counter()
+                # a new distance in every call, i.e. every kernel
+                # is computed
+                rf.propagate((ii + 1) * 1e-7, copy=False)
+                times.append(time.perf_counter() - t0)
+        timings.append({"interface": rfcls.__name__,
+                        "kwargs": kwargs,
+                        "time": float(np.median(times[1:])),
+                        "init_time": init_time,
+                        })
+    best = min(timings, key=lambda tt: tt["time"])
+    result = dict(best, timings=timings)
+    if save:
+        save_result(shape, best, path=path)
+    return result
+
+
+def save_result(shape, result, path=None):
+    """Record an autotuning result for `shape` in the profile
+
+    The profile file is re-read before it is replaced, such that
+    results of other processes are kept.
+
+    Returns
+    -------
+    success: bool
+        Whether the profile was written
+    """
+    if path is None:
+        path = get_profile_path()
+        if path is None:
+            return False
+    shapes = load_profile(path)
+    shapes[get_profile_key(shape)] = {
+        "interface": result["interface"],
+        "kwargs": result["kwargs"],
+        "time": result["time"],
+        "init_time": result["init_time"],
+    }
+    return write_json(path, {"format": PROFILE_FORMAT,
+                             "host": socket.gethostname(),
+                             "shapes": shapes})
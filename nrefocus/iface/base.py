@@ -1,16 +1,49 @@
 from abc import ABC, abstractmethod
+import itertools
+import math
 import warnings
 import numexpr as ne
 
+from .._czt import get_czt_length, izoom
+from .._kernel_cache import kernel_cache
 from .._ndarray_backend import xp, NDArrayBackendWarning
 from .. import metrics
 from .. import minimizers
+from .. import pad
 from ..roi_handling import parse_roi
 
 
+#: Default memory budget [bytes] of one chunk in batched propagation
+CHUNK_BYTES = 128 * 1024**2
+
+
+def _get_ifft_costs(size, count, last_axis=True):
+    """Estimated cost of a pruned 1D inverse DFT
+
+    Returns the relative costs for computing `count` of `size`
+    outputs via an FFT and via a matrix DFT. The FFT needs about
+    5·N·log2(N) floating point operations and the matrix DFT 8·N
+    per output, but matrix products (BLAS) run at about ten times
+    the throughput of an FFT. FFTs along non-contiguous axes are
+    about twice as slow.
+    """
+    fft_cost = 5 * size * max(1, math.log2(size))
+    if not last_axis:
+        fft_cost *= 2
+    dft_cost = size * count
+    return fft_cost, dft_cost
+
+
 class Refocus(ABC):
+    #: Number of leading axes of the input field that index a stack
+    #: of fields which are refocused together (see
+    #: :class:`nrefocus.RefocusStack1D`)
+    stack_ndim = 0
+
     def __init__(self, field, wavelength, pixel_size, medium_index=1.3333,
-                 distance=0, kernel="helmholtz", padding=True):
+                 distance=0, kernel="helmholtz", padding=True,
+                 dtype="complex128", workspace=False, real_input=False,
+                 pad_factor=2, pad_size=None):
         r"""
         Parameters
         ----------
@@ -33,8 +66,60 @@ class Refocus(ABC):
               - k_\mathrm{y}^2} - k_\mathrm{m}\right)\right)`
             - "fresnel": paraxial approximation
               :math:`\exp(-id(k_\mathrm{x}^2+k_\mathrm{y}^2)/2k_\mathrm{m})`
-        padding: bool
-            Whether to perform boundary-padding with linear ramp
+        padding: bool or str
+            Whether to perform boundary-padding with linear ramp;
+            alternatively, the padding mode "ramp", "zero",
+            "mirror" or "apodize" (see :func:`nrefocus.pad.pad_add`)
+
+            .. versionchanged:: 0.7.0
+               added padding modes
+        dtype: str or dtype
+            Precision of the padded field, the kernel and the Fourier
+            transforms, one of
+
+            - "complex128": double precision (default)
+            - "complex64": single precision, which halves memory
+              usage and bandwidth at the cost of accuracy
+
+            .. versionadded:: 0.7.0
+        workspace: bool
+            Whether to allocate reusable kernel, product and output
+            buffers on first use, such that :func:`Refocus.propagate`
+            does not allocate new padded arrays in every call
+
+            .. versionadded:: 0.7.0
+        real_input: bool or str
+            Whether the input field is real-valued (e.g. amplitude or
+            intensity data). If True, the forward transform is a
+            real-to-complex FFT and :attr:`Refocus.fft_origin` only
+            holds the non-negative frequencies of the last axis,
+            which halves memory usage and computation time of the
+            initial Fourier transform. The missing half is restored
+            from Hermitian symmetry when the kernel is applied, i.e.
+            the refocused field is complex-valued as usual. Set to
+            "auto" to enable this for all non-complex input fields.
+
+            .. versionadded:: 0.7.0
+        pad_factor: float
+            Minimum ratio between the padded and the original size
+            along each axis. Factors below 2 (e.g. 1.5) speed up
+            the Fourier transforms at the cost of less suppression
+            of wrap-around artifacts.
+
+            .. versionadded:: 0.7.0
+        pad_size: None, str, int, or tuple of ints
+            Size of the padded field; set to "fast" to pad each axis
+            to the next FFT-friendly length (only prime factors 2, 3,
+            5 and 7) at or above `pad_factor` times its size (see
+            :func:`nrefocus.pad.get_pad_size`). Set to "auto" to
+            only pad by the lateral spread of the field over the
+            largest propagation distance (see
+            :func:`Refocus.get_guard_band`), limited by `pad_factor`.
+            The padded field is then enlarged whenever a larger
+            distance is requested. The original size is recorded and
+            restored when the refocused field is returned.
+
+            .. versionadded:: 0.7.0
         """
         super(Refocus, self).__init__()
         self.wavelength = wavelength
@@ -43,14 +128,173 @@ class Refocus(ABC):
         self.distance = distance
         self.kernel = kernel
         self.padding = padding
+        self.pad_factor = pad_factor
+        self.pad_size = pad_size
+        if padding is True:
+            self.pad_mode = "ramp"
+        elif not padding:
+            self.pad_mode = None
+        elif padding in pad.PAD_MODES:
+            self.pad_mode = padding
+        else:
+            raise ValueError(f"Unknown padding mode: '{padding}'")
         self.origin = field
+        self.dtype = xp.dtype(dtype)
+        if self.dtype.name not in ["complex64", "complex128"]:
+            raise ValueError(f"Unsupported dtype: '{dtype}'")
+        # distance-independent kernel data (see `_get_kz`)
+        self._kz = None
+        self._kz_shared = False
+        # reusable buffers (see `_get_workspace`)
+        self.workspace = workspace
+        self._workspace = None
         self.backend_check()
+        field = self._cast_field(field)
+        if real_input == "auto":
+            real_input = field.dtype.kind != "c"
+        elif real_input and field.dtype.kind == "c":
+            if xp.any(field.imag):
+                raise ValueError("`real_input` requires a real-valued "
+                                 "field, got non-zero imaginary part!")
+            field = field.real
+        self.real_input = bool(real_input)
+        # largest relative distance covered by `pad_size="auto"`
+        self._pad_distance = 0
+        self._shape = self._get_pad_shape(self._pad_distance)
         self.fft_origin = self._init_fft(field, padding)
 
+    @property
+    def real_dtype(self):
+        """Real-valued dtype corresponding to :attr:`Refocus.dtype`"""
+        return xp.finfo(self.dtype).dtype
+
     @property
     def shape(self):
-        """Shape of the padded input field or Fourier transform"""
-        return self.fft_origin.shape
+        """Shape of the padded input field and its Fourier transform
+
+        For `real_input`, :attr:`Refocus.fft_origin` is smaller along
+        the last axis (see :func:`Refocus.__init__`). For stacks of
+        fields, this is the shape of one padded field.
+        """
+        return self._shape
+
+    @property
+    def stack_shape(self):
+        """Shape of the stack axes of the input field
+
+        Empty unless the interface refocuses stacks of fields
+        (see :attr:`Refocus.stack_ndim`).
+
+        .. versionadded:: 0.7.0
+        """
+        return tuple(self.origin.shape[:self.stack_ndim])
+
+    @property
+    def field_shape(self):
+        """Shape of one (unpadded) input field of the stack
+
+        .. versionadded:: 0.7.0
+        """
+        return tuple(self.origin.shape[self.stack_ndim:])
+
+    def get_guard_band(self, distance):
+        r"""Lateral spread of the field over a propagation distance
+
+        The pixel grid resolves spatial frequencies up to
+        :math:`k_\mathrm{max} = \pi / \Delta x` along each axis,
+        i.e. up to :math:`\sqrt{n} k_\mathrm{max}` along the
+        diagonal of an n-dimensional grid, which corresponds to the
+        numerical aperture :math:`\sqrt{n} \lambda / 2 \Delta x`.
+        A plane wave with the lateral wave number
+        :math:`k_\mathrm{r}` is shifted by
+        :math:`d k_\mathrm{r} / k_\mathrm{z}` (Helmholtz kernel) or
+        :math:`d k_\mathrm{r} / k_\mathrm{m}` (Fresnel kernel).
+        The padding must be at least this wide to avoid wrap-around
+        of the field at the borders of the padded field.
+
+        Parameters
+        ----------
+        distance: float
+            Relative propagation distance [m]
+
+        Returns
+        -------
+        guard_band: int or float
+            Largest lateral shift [px]; infinite if the pixel grid
+            resolves grazing waves (Helmholtz kernel with
+            :math:`k_\mathrm{m} \leq \sqrt{n} k_\mathrm{max}`)
+
+        .. versionadded:: 0.7.0
+        """
+        if distance == 0:
+            return 0
+        # sine of the largest angle resolved by the grid (diagonal)
+        sin_max = math.sqrt(len(self.field_shape)) * self.wavelength \
+            / (2 * self.pixel_size * self.medium_index)
+        if self.kernel == "fresnel":
+            tan_max = sin_max
+        elif sin_max < 1:
+            tan_max = sin_max / math.sqrt(1 - sin_max ** 2)
+        else:
+            return math.inf
+        return math.ceil(abs(distance) / self.pixel_size * tan_max
+                         - 1e-9)
+
+    def _get_pad_shape(self, max_distance):
+        """Return the padded shape for the current padding options
+
+        Parameters
+        ----------
+        max_distance: float
+            Largest relative propagation distance [m], only used
+            for `pad_size="auto"`
+        """
+        shape = tuple(int(s) for s in self.field_shape)
+        if self.pad_mode in [None, "apodize"]:
+            return shape
+        elif self.pad_size == "auto":
+            guard = self.get_guard_band(max_distance)
+            limit = pad.get_pad_size(shape, pad_factor=self.pad_factor,
+                                     pad_size="fast")
+            size = []
+            for small, large in zip(shape, limit):
+                if guard == 0:
+                    size.append(small)
+                elif small + guard < large:
+                    size.append(min(pad.get_fast_size(small + guard), large))
+                else:
+                    size.append(large)
+            return tuple(size)
+        else:
+            return pad.get_pad_size(shape,
+                                    pad_factor=self.pad_factor,
+                                    pad_size=self.pad_size)
+
+    def _fit_padding(self, distances):
+        """Enlarge the padded field for `pad_size="auto"` if necessary
+
+        Parameters
+        ----------
+        distances: float or array-like of floats
+            Absolute focusing distances [m] that will be computed
+        """
+        if self.pad_size != "auto" or self.pad_mode in [None, "apodize"]:
+            return
+        max_distance = float(xp.max(xp.abs(
+            xp.asarray(distances, dtype=float) - self.distance)))
+        if max_distance <= self._pad_distance:
+            return
+        self._pad_distance = max_distance
+        shape = self._get_pad_shape(max_distance)
+        if shape != self._shape:
+            self._shape = shape
+            self._kz = None
+            self._kz_shared = False
+            self._workspace = None
+            field = self._cast_field(self.origin)
+            if self.real_input and field.dtype.kind == "c":
+                field = field.real
+            self.fft_origin = self._init_fft(field, self.padding)
 
     @abstractmethod
     def _init_fft(self, field, padding):
@@ -74,8 +318,26 @@ class Refocus(ABC):
         Notes
         -----
         Any subclass should perform padding with
-        :func:`nrefocus.pad.padd_add` during initialization.
+        :func:`nrefocus.pad.pad_add` during initialization, using
+        :attr:`Refocus.pad_mode` and the padded :attr:`Refocus.shape`.
+        If :attr:`Refocus.real_input` is set, `field` is real-valued
+        and only the half spectrum of the real-to-complex FFT
+        (e.g. :func:`numpy.fft.rfft2`) should be returned.
+        """
+
+    def _cast_field(self, field):
+        """Cast the input field to the precision of this instance
+
+        Complex fields are cast to :attr:`Refocus.dtype` and
+        floating point fields to :attr:`Refocus.real_dtype`.
+        Other fields (e.g. integers) are left as they are.
         """
+        field = xp.asarray(field)
+        if field.dtype.kind == "c":
+            field = field.astype(self.dtype, copy=False)
+        elif field.dtype.kind == "f":
+            field = field.astype(self.real_dtype, copy=False)
+        return field
 
     @property
     @abstractmethod
@@ -171,6 +433,9 @@ class Refocus(ABC):
         if interval[0] > interval[1]:
             interval = (interval[1], interval[0])
 
+        # size the padding for the interval (`pad_size="auto"`)
+        self._fit_padding(interval)
+
         # construct the correct ROI
         roi = self.parse_roi(roi)
 
@@ -190,65 +455,850 @@ class Refocus(ABC):
     def parse_roi(roi):
         return parse_roi(roi)
 
-    def _evaluate_kernel(self, kx, ky, km, d):
-        """Cupy doesn't work with numerical expressions, so we need this"""
+    def _compute_kz(self):
+        r"""Compute the distance-independent axial wavenumber grid
+
+        The grid only covers the quadrant of non-negative spatial
+        frequencies (see :func:`Refocus._get_quadrant_blocks`).
+
+        Returns
+        -------
+        kz: ndarray
+            Axial wavenumber relative to the wavenumber of the
+            medium [1/px], i.e. the kernel at the relative distance
+            `d` [px] is :math:`\exp(idk_\mathrm{z})`
+        mask: ndarray of bool or None
+            Pass-band of the kernel (only propagating waves);
+            None if the kernel does not filter in Fourier space
+        """
+        nm = self.medium_index
+        res = self.wavelength / self.pixel_size
+        twopi = 2 * xp.pi
+
+        km = twopi * nm / res
+        kx = (self._get_fftfreq(0) * twopi).reshape(-1, 1)
+        ky = (self._get_fftfreq(1) * twopi).reshape(1, -1)
+
         if self.kernel == "helmholtz":
             if xp.is_cupy():
                 # cupy doesn't work directly with numexpr
-                # unnormalized: exp(i*d*sqrt(km²-kx²-ky²))
                 root_km = km ** 2 - kx ** 2 - ky ** 2
                 rt0 = root_km > 0
-                # multiply by rt0 (filter in Fourier space)
-                fstemp = xp.exp(1j * d * (xp.sqrt(root_km * rt0) - km)) * rt0
+                kz = xp.sqrt(root_km * rt0) - km
             else:
-                # unnormalized: exp(i*d*sqrt(km²-kx²-ky²))
+                # unnormalized: sqrt(km²-kx²-ky²)
                 root_km = ne.evaluate(
                     "km ** 2 - kx**2 - ky**2",
                     local_dict={"kx": kx, "ky": ky, "km": km})
                 rt0 = ne.evaluate("root_km > 0")
-                # multiply by rt0 (filter in Fourier space)
-                fstemp = ne.evaluate(
-                    "exp(1j * d * (sqrt(root_km * rt0) - km)) * rt0",
-                    local_dict={"root_km": root_km, "rt0": rt0,
-                                "km": km, "d": d})
-
+                kz = ne.evaluate("sqrt(root_km * rt0) - km",
+                                 local_dict={"root_km": root_km, "rt0": rt0,
+                                             "km": km})
         elif self.kernel == "fresnel":
+            rt0 = None
             if xp.is_cupy():
-                fstemp = xp.exp(-1j * d * (kx**2 + ky**2) / (2 * km))
+                kz = -(kx**2 + ky**2) / (2 * km)
             else:
-                # unnormalized: exp(i*d*(km-(kx²+ky²)/(2*km))
-                fstemp = ne.evaluate(
-                    "exp(-1j * d * (kx**2 + ky**2) / (2 * km))",
-                    local_dict={"kx": kx, "ky": ky, "km": km, "d": d})
+                # unnormalized: km-(kx²+ky²)/(2*km)
+                kz = ne.evaluate("-(kx**2 + ky**2) / (2 * km)",
+                                 local_dict={"kx": kx, "ky": ky, "km": km})
         else:
             raise KeyError(f"Unknown propagation kernel: '{self.kernel}'")
+        return kz.astype(self.real_dtype, copy=False), rt0
+
+    def _get_fftfreq(self, axis):
+        """Sample frequencies [1/px] of the kernel quadrant along `axis`
+
+        See :func:`Refocus._get_quadrant_blocks` for details.
+        """
+        return xp.fft.rfftfreq(self.shape[axis])
+
+    def _get_quadrant_blocks(self):
+        """Map the quadrant of the kernel onto the full spectrum
+
+        All kernels only depend on the magnitude of the spatial
+        frequencies. On the `fftfreq` grid of size N, the frequency
+        at index N-i is exactly the negative of the frequency at
+        index i (for even and odd N), so the kernel is mirror
+        symmetric and defined by the indices 0, ..., N//2 along
+        every axis. :func:`Refocus._compute_kz` only computes
+        this quadrant (a quarter of the grid in 2D), which
+        reduces the number of transcendental function evaluations
+        per kernel accordingly.
+
+        Returns
+        -------
+        blocks: list of (dst, ksrc, fsrc, conjugate)
+            Index tuples, such that the full Fourier transform of the
+            propagated field at `dst` is the product of the kernel
+            quadrant at `ksrc` and `fft_origin[fsrc]` (complex
+            conjugated if `conjugate` is set, see
+            :func:`Refocus._get_spectrum_blocks`)
+        """
+        direct = []  # (dst, ksrc) of the non-negative frequencies
+        mirror = []  # (dst, ksrc) of the negative frequencies
+        for size in self.shape:
+            nhalf = size // 2 + 1
+            direct.append((slice(0, nhalf), slice(0, nhalf)))
+            mirror.append((slice(nhalf, size), slice(size - nhalf, 0, -1)))
+        blocks = []
+        if not self.real_input:
+            for segments in itertools.product(*zip(direct, mirror)):
+                dst, ksrc = zip(*segments)
+                blocks.append((dst, ksrc, dst, False))
+        else:
+            # non-negative frequencies of the last axis are stored
+            for segments in itertools.product(*zip(direct[:-1],
+                                                   mirror[:-1])):
+                dst, ksrc = zip(*(segments + (direct[-1],)))
+                blocks.append((dst, ksrc, dst, False))
+            # negative frequencies of the last axis are the conjugate
+            # at the mirrored position along all axes (row 0 is its
+            # own mirror)
+            size = self.shape[-1]
+            nhalf = size // 2 + 1
+            mirror_last = (slice(nhalf, size), slice(size - nhalf, 0, -1),
+                           slice(size - nhalf, 0, -1))
+            axes = []
+            for size in self.shape[:-1]:
+                nhalf = size // 2 + 1
+                axes.append([
+                    (slice(0, 1), slice(0, 1), slice(0, 1)),
+                    (slice(1, nhalf), slice(1, nhalf),
+                     slice(size - 1, size - nhalf, -1)),
+                    (slice(nhalf, size), slice(size - nhalf, 0, -1),
+                     slice(size - nhalf, 0, -1)),
+                ])
+            for segments in itertools.product(*axes):
+                dst, ksrc, fsrc = zip(*(segments + (mirror_last,)))
+                blocks.append((dst, ksrc, fsrc, True))
+        return blocks
+
+    def _get_spectrum_blocks(self):
+        """Map :attr:`Refocus.fft_origin` onto the full spectrum
+
+        Returns
+        -------
+        blocks: list of (dst, src, conjugate)
+            Index tuples, such that the full Fourier transform of the
+            padded field is `fft_origin[src]` (complex conjugated if
+            `conjugate` is set) at `dst`. For `real_input`, the
+            negative frequencies of the last axis are the conjugate
+            of the stored frequencies at the mirrored position
+            (Hermitian symmetry), `F(-k) = conj(F(k))`. Since all
+            kernels only depend on the magnitude of `k`, the kernel
+            at `dst` is the kernel at `src`.
+        """
+        if not self.real_input:
+            return [((), (), False)]
+        return [(dst, fsrc, conjugate) for dst, _, fsrc, conjugate
+                in self._get_quadrant_blocks() if conjugate] + \
+            [((slice(None),) * (len(self.shape) - 1)
+              + (slice(0, self.shape[-1] // 2 + 1),), (), False)]
+
+    def _get_kz(self):
+        """Return the axial wavenumber grid, computing it only once
+
+        The grid is shared via :data:`nrefocus.kernel_cache` with all
+        instances of the same geometry. See :func:`Refocus._compute_kz`
+        for details.
+        """
+        if self._kz is None:
+            key = self._get_cache_key(None)
+            self._kz = kernel_cache.get(key)
+            # whether the geometry is shared with another instance
+            self._kz_shared = self._kz is not None
+            if self._kz is None:
+                self._kz = self._compute_kz()
+                kernel_cache.put(key, self._kz)
+        return self._kz
+
+    def _get_cache_key(self, distance):
+        """Key identifying a kernel in :data:`nrefocus.kernel_cache`
+
+        Parameters
+        ----------
+        distance: float or None
+            Absolute focusing distance [m]; None identifies the
+            distance-independent axial wavenumber grid
+        """
+        if distance is not None:
+            distance = float(distance - self.distance)
+        return (xp.backend_name(),
+                tuple(self.shape),
+                self.real_input,
+                self.wavelength,
+                self.pixel_size,
+                self.medium_index,
+                self.kernel,
+                self.dtype.name,
+                distance,
+                )
+
+    def _evaluate_kernel(self, kz, rt0, d):
+        """Cupy doesn't work with numerical expressions, so we need this"""
+        if xp.is_cupy() or self.dtype.name == "complex64":
+            # numexpr does not support single precision complex numbers;
+            # `d` may be an array (e.g. in `propagate_many`), which
+            # cupy does not convert to a numpy scalar
+            d = xp.asarray(d, dtype=self.real_dtype)
+            fstemp = xp.exp(1j * (kz * d))
+            if rt0 is not None:
+                # multiply by rt0 (filter in Fourier space)
+                fstemp *= rt0
+        else:
+            local_dict = {"kz": kz, "d": d}
+            expr = "exp(1j * d * kz)"
+            if rt0 is not None:
+                # multiply by rt0 (filter in Fourier space)
+                local_dict["rt0"] = rt0
+                expr += " * rt0"
+            fstemp = ne.evaluate(expr, local_dict=local_dict)
         return fstemp
 
     def get_kernel(self, distance):
         """Return the current kernel
 
         Ther kernel type `self.kernel` is used
-        (see :func:`Refocus.__init__`)
+        (see :func:`Refocus.__init__`). The distance-independent
+        axial wavenumber grid is computed only once per instance,
+        so that every new `distance` only costs one complex
+        exponential on a quadrant of the grid (see
+        :func:`Refocus._get_quadrant_blocks`).
+
+        Kernels are looked up in and added to the process-wide
+        :data:`nrefocus.kernel_cache`, which is shared by all
+        instances with the same geometry. The returned array
+        may thus be read-only.
+
+        For `real_input`, the kernel has the shape of
+        :attr:`Refocus.fft_origin` (non-negative frequencies of
+        the last axis).
         """
-        nm = self.medium_index
-        res = self.wavelength / self.pixel_size
+        self._fit_padding(distance)
+        key = self._get_cache_key(distance)
+        fstemp = kernel_cache.get(key)
+        if fstemp is None:
+            d = (distance - self.distance) / self.pixel_size
+            fstemp = self._expand_kernel(self._evaluate_quadrant(d))
+            kernel_cache.put(key, fstemp)
+        return fstemp
+
+    def get_spectrum(self, distance):
+        """Return the Fourier transform of the propagated field
+
+        The kernel is obtained with :func:`Refocus.get_kernel` (and
+        thus shared via :data:`nrefocus.kernel_cache`).
+
+        Parameters
+        ----------
+        distance: float
+            Absolute focusing distance [m]
+
+        Returns
+        -------
+        spectrum: ndarray
+            Full Fourier transform of the propagated, padded field,
+            also for `real_input` (see :attr:`Refocus.fft_origin`);
+            the array is not shared and may be modified
+
+        .. versionadded:: 0.7.0
+        """
+        kernel = self.get_kernel(distance)
+        return self._apply_kernel(fft_kernel=kernel)
+
+    def _expand_kernel(self, kernel_quadrant, out=None):
+        """Mirror a kernel quadrant to the shape of the spectrum
+
+        Parameters
+        ----------
+        kernel_quadrant: ndarray
+            Kernel evaluated on the grid of :func:`Refocus._get_kz`
+        out: ndarray or None
+            Array with the shape of :attr:`Refocus.fft_origin` to
+            which the kernel is written
+
+        Returns
+        -------
+        fft_kernel: ndarray
+            Kernel for :attr:`Refocus.fft_origin`
+        """
+        if out is None:
+            out = xp.empty(self.fft_origin.shape[self.stack_ndim:],
+                           dtype=self.dtype)
+        for _, ksrc, fsrc, conjugate in self._get_quadrant_blocks():
+            if not conjugate:
+                out[fsrc] = kernel_quadrant[ksrc]
+        return out
+
+    def _get_product(self, distance, out=None):
+        """Return the product of initial Fourier transform and kernel
+
+        If the kernel is in :data:`nrefocus.kernel_cache` (or should
+        go there, because another instance with the same geometry
+        exists), the cached kernel is used. Otherwise, the kernel
+        is only evaluated on a quadrant of the grid and multiplied
+        with the mirrored blocks of :attr:`Refocus.fft_origin`,
+        without forming the full kernel array.
+
+        Parameters
+        ----------
+        distance: float
+            Absolute focusing distance [m]
+        out: ndarray or None
+            Array to which the product is written, e.g. the input
+            buffer of the inverse Fourier transform
+        """
+        self._get_kz()
+        key = self._get_cache_key(distance)
+        fft_kernel = kernel_cache.get(key)
         d = (distance - self.distance) / self.pixel_size
-        twopi = 2 * xp.pi
+        # the kernel is shared by all fields of a stack
+        kernel_nbytes = self.fft_origin[(0,) * self.stack_ndim].nbytes
+        if (fft_kernel is None and self._kz_shared
+                and kernel_cache.accepts(kernel_nbytes)):
+            fft_kernel = self._expand_kernel(self._evaluate_quadrant(d))
+            kernel_cache.put(key, fft_kernel)
+        return self._apply_kernel(fft_kernel=fft_kernel, d=d, out=out)
 
-        km = twopi * nm / res
-        kx = (xp.fft.fftfreq(self.fft_origin.shape[0]) * twopi).reshape(-1, 1)
-        ky = (xp.fft.fftfreq(self.fft_origin.shape[1]) * twopi).reshape(1, -1)
-        fstemp = self._evaluate_kernel(kx, ky, km, d)
-        return fstemp
+    def _apply_kernel(self, fft_kernel=None, d=None, out=None, frames=None):
+        """Multiply :attr:`Refocus.fft_origin` with a kernel
+
+        Parameters
+        ----------
+        fft_kernel: ndarray or None
+            Propagation kernel (see :func:`Refocus.get_kernel`); if
+            None, the kernel for `d` is evaluated on a quadrant of
+            the grid (see :func:`Refocus._get_quadrant_blocks`)
+        d: float or ndarray
+            Relative distance [px] for which the kernel is evaluated
+            if `fft_kernel` is None; an array of shape (n, 1, 1)
+            (or (n, 1) in 1D) yields a stack of n products. For
+            stacks of fields, the leading axes are broadcast against
+            :attr:`Refocus.stack_shape` (e.g. one distance per field
+            with the shape `stack_shape + (1,)`).
+        out: ndarray or None
+            Array to which the product is written
+        frames: slice or None
+            For stacks of fields, only multiply the fields
+            `fft_origin[frames]` (e.g. a chunk of the stack)
+
+        Returns
+        -------
+        product: ndarray
+            Full Fourier transform of the propagated, padded field
+            (see :func:`Refocus._get_spectrum_blocks`)
+        """
+        ndim = len(self.shape)
+        fft_origin = self.fft_origin
+        if frames is not None:
+            fft_origin = fft_origin[frames]
+        if fft_kernel is not None:
+            kernels = [fft_kernel]
+            blocks = [(dst, src, src, conjugate) for dst, src, conjugate
+                      in self._get_spectrum_blocks()]
+        elif self.kernel == "fresnel":
+            # one factor per axis, the 2D kernel is never formed
+            kernels = self._get_fresnel_factors(d)
+            blocks = self._get_quadrant_blocks()
+        else:
+            kernels = [self._evaluate_quadrant(d)]
+            blocks = self._get_quadrant_blocks()
+        if out is None:
+            batch = fft_origin.shape[:fft_origin.ndim - ndim]
+            if fft_kernel is None:
+                batch = xp.broadcast_shapes(xp.shape(d)[:-ndim], batch)
+            out = xp.empty(batch + self.shape, dtype=self.dtype)
+        for dst, ksrc, fsrc, conjugate in blocks:
+            dst_out = out[(Ellipsis,) + dst]
+            factor = fft_origin[(Ellipsis,) + tuple(fsrc)]
+            if conjugate:
+                factor = xp.conj(factor, out=dst_out)
+            for ii, kernel in enumerate(kernels):
+                if len(kernels) == 1:
+                    index = (Ellipsis,) + tuple(ksrc)
+                else:
+                    # the factor of axis `ii` only extends along `ii`
+                    index = (Ellipsis,) + tuple(
+                        ksrc[ax] if ax == ii else slice(None)
+                        for ax in range(ndim))
+                xp.multiply(factor, kernel[index], out=dst_out)
+                factor = dst_out
+        return out
+
+    def _evaluate_quadrant(self, d):
+        """Evaluate the kernel on the quadrant grid
+
+        Parameters
+        ----------
+        d: float or ndarray
+            Relative distance [px] (see :func:`Refocus._apply_kernel`)
+
+        Returns
+        -------
+        kernel_quadrant: ndarray
+            Kernel on the grid of :func:`Refocus._get_kz` (see
+            :func:`Refocus._get_quadrant_blocks`)
+        """
+        if self.kernel == "fresnel":
+            kernel_quadrant = None
+            for factor in self._get_fresnel_factors(d):
+                if kernel_quadrant is None:
+                    kernel_quadrant = factor
+                else:
+                    kernel_quadrant = kernel_quadrant * factor
+        else:
+            kz, rt0 = self._get_kz()
+            kernel_quadrant = self._evaluate_kernel(kz, rt0, d)
+        return kernel_quadrant
+
+    def _get_fresnel_factors(self, d):
+        r"""Separable factors of the Fresnel kernel
+
+        The Fresnel kernel
+        :math:`\exp(-id(k_\mathrm{x}^2+k_\mathrm{y}^2)/2k_\mathrm{m})`
+        is the outer product of one exponential per axis. Evaluating
+        these factors only costs Ny + Nx instead of Ny·Nx complex
+        exponentials.
+
+        Parameters
+        ----------
+        d: float or ndarray
+            Relative distance [px] (see :func:`Refocus._apply_kernel`)
+
+        Returns
+        -------
+        factors: list of ndarrays
+            One factor per axis on the quadrant grid (see
+            :func:`Refocus._get_quadrant_blocks`) with the shape
+            of a broadcastable 1D array along that axis
+        """
+        km = 2 * xp.pi * self.medium_index \
+            / (self.wavelength / self.pixel_size)
+        ndim = len(self.shape)
+        factors = []
+        for ax in range(ndim):
+            kx = self._get_fftfreq(ax) * 2 * xp.pi
+            shape = [1] * ndim
+            shape[ax] = -1
+            phase = -kx ** 2 / (2 * km)
+            phase = phase.astype(self.real_dtype).reshape(shape)
+            factors.append(
+                xp.exp(1j * (d * phase)).astype(self.dtype, copy=False))
+        return factors
+
+    def _get_product_buffer(self):
+        """Return the buffer for the product of field and kernel
+
+        Returns None if no workspace is used.
+        """
+        if self.workspace:
+            return self._get_workspace()["product"]
+
+    def _get_workspace(self):
+        """Return the reusable buffers of this instance
+
+        Returns
+        -------
+        workspace: dict
+            Padded arrays for the "product" of kernel and initial
+            Fourier transform, and the inverse Fourier transform
+            "output"
+        """
+        if self._workspace is None:
+            shape = self.stack_shape + self.shape
+            self._workspace = {
+                "product": xp.empty(shape, dtype=self.dtype),
+                "output": xp.empty(shape, dtype=self.dtype),
+            }
+        return self._workspace
+
+    def _return_field(self, refoc, out=None, copy=True, shared=False):
+        """Remove padding and hand over the refocused field
+
+        Parameters
+        ----------
+        refoc: ndarray
+            Padded, refocused field
+        out: ndarray or None
+            Output array to which the refocused field is written
+        copy: bool
+            Whether to copy `refoc` if it is `shared`
+        shared: bool
+            Whether `refoc` is a buffer of this instance (e.g. in
+            the workspace) that is overwritten in the next call
+        """
+        if self.pad_mode:
+            # the padding is at the end of every axis of a field
+            refoc = refoc[(Ellipsis,) + tuple(
+                slice(0, s) for s in self.field_shape)]
+        if out is not None:
+            out[...] = refoc
+            refoc = out
+        elif copy and shared:
+            refoc = refoc.copy()
+        return refoc
+
+    def sweep_kernels(self, distances, reanchor=32):
+        """Yield kernels along an evenly spaced sequence of distances
+
+        For equally spaced distances, the kernel satisfies
+        kernel(d+Δ) = kernel(d)·kernel(Δ), which replaces the
+        evaluation of the complex exponential with one complex
+        multiplication per step. Every `reanchor` steps, the kernel
+        is evaluated directly to limit the accumulation of rounding
+        errors. If `distances` are not evenly spaced, every kernel
+        is evaluated directly.
+
+        Parameters
+        ----------
+        distances: 1d array-like of floats
+            Absolute focusing distances [m]
+        reanchor: int
+            Number of steps after which the kernel is evaluated
+            directly. Each recurrence step adds a relative error
+            in the order of the machine epsilon `eps` of the kernel
+            dtype. The deviation from the directly evaluated kernels
+            stays below `(4 * reanchor + 2 * p) * eps`, where `p` is
+            the largest phase `|d * kz|` [rad] of the sweep (the
+            direct evaluation of such a phase already has a
+            rounding error of `p * eps`).
+
+        Yields
+        ------
+        fft_kernel: ndarray
+            Kernel for the corresponding distance. The same array
+            is updated in-place in each iteration; make a copy if
+            you need to keep it.
+        """
+        # validate before the first kernel is requested
+        if reanchor < 1:
+            raise ValueError("reanchor must be >= 1")
+        distances = [float(dd) for dd in distances]
+        self._fit_padding(distances)
+        return self._iter_sweep_kernels(distances, reanchor)
+
+    def _iter_sweep_kernels(self, distances, reanchor):
+        """Generator of :func:`Refocus.sweep_kernels`"""
+        if len(distances) > 1:
+            step = (distances[-1] - distances[0]) / (len(distances) - 1)
+            evenly_spaced = all(
+                abs(dd - (distances[0] + ii * step)) <= 1e-9 * abs(step)
+                for ii, dd in enumerate(distances))
+        else:
+            evenly_spaced = False
+        if evenly_spaced:
+            step_quadrant = self._evaluate_quadrant(step / self.pixel_size)
+        fft_kernel = None
+        for ii, dd in enumerate(distances):
+            # the recurrence runs on the kernel quadrant
+            if not evenly_spaced or ii % reanchor == 0:
+                quadrant = self._evaluate_quadrant(
+                    (dd - self.distance) / self.pixel_size)
+            else:
+                quadrant *= step_quadrant
+            fft_kernel = self._expand_kernel(quadrant, out=fft_kernel)
+            yield fft_kernel
+
+    def sweep(self, distances, reanchor=32):
+        """Yield the refocused fields along a sequence of distances
+
+        This is a generator version of :func:`Refocus.propagate`
+        that uses :func:`Refocus.sweep_kernels` to compute the
+        kernels for evenly spaced `distances` with only one
+        complex multiplication per step.
+
+        Parameters
+        ----------
+        distances: 1d array-like of floats
+            Absolute focusing distances [m]
+        reanchor: int
+            Number of steps after which the kernel is evaluated
+            directly (see :func:`Refocus.sweep_kernels`)
+
+        Yields
+        ------
+        refocused_field: ndarray
+            Initial field refocused at the corresponding distance
+        """
+        kernels = self.sweep_kernels(distances, reanchor=reanchor)
+        return (self._propagate_kernel(fft_kernel) for fft_kernel in kernels)
+
+    def iter_planes(self, distances, reuse_buffer=True):
+        """Iterate over the refocused planes for a sequence of distances
+
+        This is meant for scanning many planes with per-plane
+        reductions (e.g. a maximum projection or a metric). Since
+        the planes are computed one after another via
+        :func:`Refocus.sweep`, the peak memory usage is a fixed
+        number of field-sized arrays, independent of the number
+        of `distances`.
+
+        Together with the `workspace` option (see
+        :func:`Refocus.__init__`), no padded arrays are allocated
+        during iteration.
+
+        Parameters
+        ----------
+        distances: 1d array-like of floats
+            Absolute focusing distances [m]
+        reuse_buffer: bool
+            If True (default), every plane is written to the same
+            output array, i.e. the yielded array is overwritten in
+            the next iteration. If False, a new array is yielded
+            for every plane.
+
+        Yields
+        ------
+        refocused_field: ndarray
+            Initial field refocused at the corresponding distance
+        """
+        plane = None
+        for fft_kernel in self.sweep_kernels(distances):
+            if plane is None or not reuse_buffer:
+                plane = xp.empty(self.origin.shape, dtype=self.dtype)
+            yield self._propagate_kernel(fft_kernel, out=plane)
+
+    def _propagate_kernel(self, fft_kernel, out=None, copy=True):
+        """Propagate the initial field with a given kernel
+
+        Parameters
+        ----------
+        fft_kernel: ndarray
+            Propagation kernel (see :func:`Refocus.get_kernel`)
+        out: ndarray or None
+            Output array (see :func:`Refocus.propagate`)
+        copy: bool
+            Whether to return a copy of internal buffers (see
+            :func:`Refocus.propagate`)
+
+        Returns
+        -------
+        refocused_field: ndarray
+            Initial field refocused with `fft_kernel`
+        """
+        product = self._apply_kernel(fft_kernel=fft_kernel,
+                                     out=self._get_product_buffer())
+        return self._propagate_product(product, out=out, copy=copy)
+
+    @abstractmethod
+    def _propagate_product(self, product, out=None, copy=True):
+        """Inverse Fourier transform of the propagated spectrum
+
+        Parameters
+        ----------
+        product: ndarray
+            Product of :attr:`Refocus.fft_origin` and kernel; may
+            be overwritten
+        out: ndarray or None
+            Output array (see :func:`Refocus.propagate`)
+        copy: bool
+            Whether to return a copy of internal buffers (see
+            :func:`Refocus.propagate`)
+
+        Returns
+        -------
+        refocused_field: ndarray
+            Refocused field without padding (see
+            :func:`Refocus._return_field`)
+        """
+
+    def _propagate_roi(self, product, roi, out=None):
+        """Inverse Fourier transform restricted to a region of interest
+
+        The inverse transform is computed one axis after another.
+        Along each axis, only the ROI indices are kept, computed
+        either with a full 1D inverse FFT (discarding the other
+        indices) or with a matrix DFT for the ROI indices only,
+        whichever needs fewer operations. The axes are processed
+        in the cheaper order, i.e. for a small ROI, the second
+        axis is only transformed for the few ROI indices of the
+        first axis.
+
+        Parameters
+        ----------
+        product: ndarray
+            Product of :attr:`Refocus.fft_origin` and kernel
+        roi: slice or tuple of slices
+            Region of interest (see :func:`Refocus.parse_roi`)
+            relative to the input field
+        out: ndarray or None
+            Output array with the shape of the ROI
+
+        Returns
+        -------
+        refocused_roi: ndarray
+            Refocused field in the region of interest
+        """
+        if isinstance(roi, slice):
+            roi = (roi,)
+        indices = []
+        for ax, size in enumerate(self.field_shape):
+            sl = roi[ax] if ax < len(roi) else slice(None)
+            indices.append(range(*sl.indices(size)))
+
+        # find the cheapest order of axes
+        best = None
+        for order in itertools.permutations(range(len(self.shape))):
+            cost = 0
+            count = 1
+            for size in self.shape:
+                count *= size
+            for ax in order:
+                size = self.shape[ax]
+                count //= size
+                cost += count * min(_get_ifft_costs(
+                    size, len(indices[ax]), ax == len(self.shape) - 1))
+                count *= len(indices[ax])
+            if best is None or cost < best[0]:
+                best = (cost, order)
+
+        refoc = product
+        # axes of a field in `product` (after the stack axes)
+        offset = product.ndim - len(self.shape)
+        for ax in best[1]:
+            pax = ax + offset
+            size = refoc.shape[pax]
+            fft_cost, dft_cost = _get_ifft_costs(
+                size, len(indices[ax]), ax == len(self.shape) - 1)
+            if dft_cost < fft_cost:
+                matrix = self._get_idft_matrix(size, indices[ax])
+                refoc = xp.moveaxis(
+                    xp.tensordot(matrix, refoc, axes=([1], [pax])), 0, pax)
+            else:
+                refoc = xp.take(xp.fft.ifft(refoc, axis=pax),
+                                xp.asarray(indices[ax], dtype=int),
+                                axis=pax)
+        refoc = refoc.astype(self.dtype, copy=False)
+        if out is not None:
+            out[...] = refoc
+            refoc = out
+        return refoc
+
+    def _get_idft_matrix(self, size, indices):
+        """Return the inverse DFT matrix for a subset of output indices
+
+        The matrices are shared via :data:`nrefocus.kernel_cache`.
+
+        Parameters
+        ----------
+        size: int
+            Length of the transform
+        indices: range
+            Output indices of the inverse DFT
+
+        Returns
+        -------
+        matrix: ndarray
+            Matrix of shape (len(indices), size) which yields the
+            inverse DFT at `indices` when multiplied with a vector
+        """
+        key = ("idft", xp.backend_name(), size, indices, self.dtype.name)
+        matrix = kernel_cache.get(key)
+        if matrix is None:
+            # integer phase (modulo size) for accurate large products
+            phase = xp.outer(xp.asarray(indices, dtype=int),
+                             xp.arange(size)) % size
+            matrix = (xp.exp(2j * xp.pi / size * phase) / size).astype(
+                self.dtype, copy=False)
+            kernel_cache.put(key, matrix)
+        return matrix
+
+    def propagate_many(self, distances, chunk_size=None):
+        """Propagate the initial field to multiple distances
+
+        The kernels for a chunk of distances are computed as one
+        (n_d, Ny, Nx) block by broadcasting, multiplied with the
+        Fourier transform of the initial field and transformed
+        back with one batched inverse FFT. Padding is removed while
+        the chunk is written to the output array.
+
+        Parameters
+        ----------
+        distances: 1d array-like of floats
+            Absolute focusing distances [m]
+        chunk_size: int or None
+            Number of distances that are propagated at once; if
+            None, the chunk size is chosen such that the kernel block
+            occupies at most :const:`CHUNK_BYTES`.
+
+        Returns
+        -------
+        refocused_stack: ndarray
+            Initial field refocused at `distances`, stacked along
+            the first axis (followed by the axes of
+            :attr:`Refocus.stack_shape` for stacks of fields)
+        """
+        distances = [float(dd) for dd in distances]
+        self._fit_padding(distances)
+        if chunk_size is None:
+            nbytes = self.dtype.itemsize
+            for size in self.stack_shape + self.shape:
+                nbytes *= size
+            chunk_size = max(1, CHUNK_BYTES // nbytes)
+        out_shape = tuple(self.origin.shape)
+        out_slice = (Ellipsis,) + tuple(slice(0, s)
+                                        for s in self.field_shape)
+        refoc_stack = xp.empty((len(distances),) + out_shape,
+                               dtype=self.dtype)
+        for start in range(0, len(distances), chunk_size):
+            stop = min(start + chunk_size, len(distances))
+            d = (xp.array(distances[start:stop]) - self.distance) \
+                / self.pixel_size
+            d = d.reshape((-1,) + (1,) * len(out_shape))
+            fft_block = self._apply_kernel(d=d)
+            refoc_stack[start:stop] = self._ifft_many(fft_block)[out_slice]
+        return refoc_stack
 
     @abstractmethod
-    def propagate(self, distance):
+    def _ifft_many(self, fft_block):
+        """Batched inverse FFT over all but the first axis
+
+        Parameters
+        ----------
+        fft_block: ndarray
+            Stack of Fourier transforms along the first axis; may
+            be overridden
+
+        Returns
+        -------
+        block: ndarray
+            Stack of inverse Fourier transforms
+        """
+
+    def propagate(self, distance, out=None, copy=True, roi=None):
         """Propagate the initial field to a certain distance
 
         Parameters
         ----------
-        distance: float
-            Absolute focusing distance [m]
+        distance: float or ndarray
+            Absolute focusing distance [m]; for stacks of fields
+            (see :attr:`Refocus.stack_ndim`), an array with one
+            distance per field (shape :attr:`Refocus.stack_shape`)
+            is also accepted
+
+            .. versionchanged:: 0.7.0
+               distances per field of a stack
+        out: ndarray or None
+            If given, the refocused field is written to this array
+            (shape of the input field, :attr:`Refocus.dtype`)
+
+            .. versionadded:: 0.7.0
+        copy: bool
+            If True (default), the returned array is owned by the
+            caller. If False, the returned array may be a zero-copy
+            view of an internal buffer (e.g. the workspace), which
+            is overwritten in the next call.
+
+            .. versionadded:: 0.7.0
+        roi: list or tuple or slice or None
+            If given, only this region of interest of the refocused
+            field is computed and returned (see
+            :func:`Refocus.autofocus` for the format). The inverse
+            Fourier transform is pruned to the ROI (see
+            :func:`Refocus._propagate_roi`).
+
+            .. versionadded:: 0.7.0
 
         Returns
         -------
@@ -257,6 +1307,121 @@ class Refocus(ABC):
 
         Notes
         -----
-        Any subclass should perform padding with
-        :func:`nrefocus.pad.pad_rem` during initialization.
+        Unless the kernel is cached, it is evaluated and multiplied
+        with :attr:`Refocus.fft_origin` without forming the full
+        kernel array, writing directly to the input buffer of the
+        inverse Fourier transform (see :func:`Refocus._get_product`).
+        Subclasses implement the inverse Fourier transform and the
+        removal of the padding in :func:`Refocus._propagate_product`.
+        """
+        self._fit_padding(distance)
+        if xp.ndim(distance):
+            # one kernel per field, evaluated by broadcasting
+            product = self._apply_kernel(
+                d=self._get_field_distances(distance),
+                out=self._get_product_buffer())
+        else:
+            product = self._get_product(distance,
+                                        out=self._get_product_buffer())
+        roi = self.parse_roi(roi)
+        if roi is not None:
+            return self._propagate_roi(product, roi=roi, out=out)
+        return self._propagate_product(product, out=out, copy=copy)
+
+    def _get_field_distances(self, distance):
+        """Relative distances [px] for one distance per field of a stack
+
+        Parameters
+        ----------
+        distance: ndarray
+            Absolute focusing distances [m] with the shape
+            :attr:`Refocus.stack_shape`
+
+        Returns
+        -------
+        d: ndarray
+            Relative distances that broadcast against the stack of
+            Fourier transforms (see :func:`Refocus._apply_kernel`)
+        """
+        if xp.shape(distance) != self.stack_shape:
+            raise ValueError(
+                f"Expected one distance per field of the stack with "
+                f"the shape {self.stack_shape}, got "
+                f"{xp.shape(distance)}!")
+        d = (xp.asarray(distance, dtype=float) - self.distance) \
+            / self.pixel_size
+        return d.reshape(d.shape + (1,) * len(self.shape))
+
+    def propagate_zoom(self, distance, center, extent, out_shape):
+        """Propagate the initial field onto an arbitrary output grid
+
+        The refocused field is evaluated on an equidistant grid
+        that may be finer than the pixel grid (e.g. for a 4x
+        oversampled view of a particle) with a chirp-z transform
+        (see :func:`nrefocus._czt.izoom`). The computational cost
+        scales with the size of the output grid and not with the
+        size of an equivalently zero-padded spectrum.
+
+        Parameters
+        ----------
+        distance: float
+            Absolute focusing distance [m]
+        center: float or tuple of floats
+            Center of the output grid [m] along each axis; the
+            pixel with the index `i` of the input field is located
+            at `i * pixel_size`
+        extent: float or tuple of floats
+            Size of the output grid [m] along each axis
+        out_shape: int or tuple of ints
+            Number of output samples along each axis
+
+        Returns
+        -------
+        refocused_field: ndarray
+            Initial field refocused at `distance` with the shape
+            `out_shape`
+        coords: tuple of 1d ndarrays
+            Coordinates [m] of the output samples along each axis
+
+        Notes
+        -----
+        The field is interpolated with the band-limited Fourier
+        series of the padded field, i.e. the output is periodic
+        with the padded field size and includes the padding
+        region outside of the input field.
+
+        .. versionadded:: 0.7.0
         """
+        self._fit_padding(distance)
+        ndim = len(self.shape)
+        center, extent, out_shape = [
+            tuple(vv) if hasattr(vv, "__len__") else (vv,) * ndim
+            for vv in [center, extent, out_shape]]
+        # process the axes in the cheaper order
+        best = None
+        for order in itertools.permutations(range(ndim)):
+            cost = 0
+            count = 1
+            for size in self.shape:
+                count *= size
+            for ax in order:
+                length = get_czt_length(self.shape[ax], out_shape[ax])
+                count //= self.shape[ax]
+                cost += count * length * math.log2(length + 1)
+                count *= out_shape[ax]
+            if best is None or cost < best[0]:
+                best = (cost, order)
+
+        refoc = self._get_product(distance)
+        coords = [None] * ndim
+        for ax in best[1]:
+            step = extent[ax] / out_shape[ax]
+            # the center is the sample with index `out_shape // 2`
+            start = center[ax] - out_shape[ax] // 2 * step
+            coords[ax] = start + xp.arange(out_shape[ax]) * step
+            refoc = izoom(refoc,
+                          axis=ax - ndim,
+                          start=start / self.pixel_size,
+                          step=step / self.pixel_size,
+                          count=out_shape[ax])
+        return refoc.astype(self.dtype, copy=False), tuple(coords)
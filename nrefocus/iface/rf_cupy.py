@@ -39,12 +39,17 @@ class RefocusCupy(Refocus):
                 "backend, use `nrefocus.set_ndarray_backend('cupy')` "))
 
         field_gpu = xp.asarray(field)
-        if padding:
-            field_gpu = pad.pad_add(field_gpu)
+        if self.pad_mode:
+            field_gpu = pad.pad_add(field_gpu, size=self.shape,
+                                    mode=self.pad_mode)
         with sp.fft.set_backend(cufft):
-            return sp.fft.fft2(field_gpu)
+            if self.real_input:
+                fft_field0 = sp.fft.rfft2(field_gpu)
+            else:
+                fft_field0 = sp.fft.fft2(field_gpu)
+        return fft_field0.astype(self.dtype, copy=False)
 
-    def propagate(self, distance):
+    def propagate(self, distance, out=None, copy=True, roi=None):
         if not xp.is_cupy():
             warnings.warn(UserWarning(
                 "You are using `RefocusCupy` without the 'cupy' ndarray "
@@ -52,11 +57,17 @@ class RefocusCupy(Refocus):
                 "To set the ndarray "
                 "backend, use `nrefocus.set_ndarray_backend('cupy')` "))
 
-        fft_kernel = self.get_kernel(distance=distance)
-        fft_gpu = xp.asarray(self.fft_origin * fft_kernel)
+        return super(RefocusCupy, self).propagate(
+            distance=distance, out=out, copy=copy, roi=roi)
 
+    def _propagate_product(self, product, out=None, copy=True):
         with sp.fft.set_backend(cufft):
-            refoc = sp.fft.ifft2(fft_gpu)
-        if self.padding:
-            refoc = pad.pad_rem(refoc)
-        return refoc
+            # cupyx does not support an output array
+            refoc = sp.fft.ifft2(product, overwrite_x=self.workspace)
+        # with `overwrite_x`, the result may be the workspace buffer
+        return self._return_field(refoc, out=out, copy=copy,
+                                  shared=self.workspace)
+
+    def _ifft_many(self, fft_block):
+        with sp.fft.set_backend(cufft):
+            return sp.fft.ifft2(fft_block, axes=(-2, -1))
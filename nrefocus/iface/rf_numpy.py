@@ -1,3 +1,5 @@
+import inspect
+
 from .._ndarray_backend import xp
 
 from .. import pad
@@ -5,6 +7,10 @@ from .. import pad
 from .base import Refocus
 
 
+#: Whether `numpy.fft` supports the `out` argument (numpy>=2.0)
+FFT_HAS_OUT = "out" in inspect.signature(xp.fft.ifftn).parameters
+
+
 class RefocusNumpy(Refocus):
     """Refocusing with numpy-based Fourier transform
 
@@ -30,13 +36,29 @@ class RefocusNumpy(Refocus):
         fft_field0: 2d complex-valued ndarray
             Fourier transform the initial field
         """
-        if padding:
-            field = pad.pad_add(field)
-        return xp.fft.fft2(field)
-
-    def propagate(self, distance):
-        fft_kernel = self.get_kernel(distance=distance)
-        refoc = xp.fft.ifft2(self.fft_origin * fft_kernel)
-        if self.padding:
-            refoc = pad.pad_rem(refoc)
-        return refoc
+        if self.pad_mode:
+            field = pad.pad_add(field, size=self.shape, mode=self.pad_mode)
+        if self.real_input:
+            # half spectrum (see `Refocus._get_spectrum_blocks`)
+            fft_field0 = xp.fft.rfft2(field)
+        else:
+            fft_field0 = xp.fft.fft2(field)
+        # numpy<2 always computes the FFT in double precision
+        return fft_field0.astype(self.dtype, copy=False)
+
+    def _propagate_product(self, product, out=None, copy=True):
+        if self.workspace:
+            ws = self._get_workspace()
+            if FFT_HAS_OUT:
+                # `ifft2` ignores `out` in numpy 2.x
+                refoc = xp.fft.ifftn(product, axes=(0, 1), out=ws["output"])
+            else:
+                refoc = ws["output"]
+                refoc[:] = xp.fft.ifft2(product)
+        else:
+            refoc = xp.fft.ifft2(product)
+        return self._return_field(refoc, out=out, copy=copy,
+                                  shared=self.workspace)
+
+    def _ifft_many(self, fft_block):
+        return xp.fft.ifft2(fft_block, axes=(-2, -1))
@@ -3,6 +3,7 @@ from .._ndarray_backend import xp
 from .. import pad
 
 from .base import Refocus
+from .rf_numpy import FFT_HAS_OUT
 
 
 class RefocusNumpy1D(Refocus):
@@ -10,7 +11,9 @@ class RefocusNumpy1D(Refocus):
     backend_incompatible = None
 
     def __init__(self, field, wavelength, pixel_size, medium_index=1.3333,
-                 distance=0, kernel="helmholtz", padding=True):
+                 distance=0, kernel="helmholtz", padding=True,
+                 dtype="complex128", workspace=False, real_input=False,
+                 pad_factor=2, pad_size=None):
         r"""Refocus a 1D field with numpy
 
         .. versionadded:: 0.3.0
@@ -36,8 +39,37 @@ class RefocusNumpy1D(Refocus):
               - k_\mathrm{m}\right)\right)`
             - "fresnel": paraxial approximation
               :math:`\exp(-idk_\mathrm{x}^2/2k_\mathrm{m})`
-        padding: bool
+        padding: bool or str
             Wheter to perform boundary-padding with linear ramp
+            or the padding mode (see :func:`Refocus.__init__`)
+
+            .. versionchanged:: 0.7.0
+               added padding modes
+        dtype: str or dtype
+            Precision of the padded field, the kernel and the Fourier
+            transforms ("complex128" or "complex64")
+
+            .. versionadded:: 0.7.0
+        workspace: bool
+            Whether to reuse kernel, product and output buffers
+            in :func:`RefocusNumpy1D.propagate`
+
+            .. versionadded:: 0.7.0
+        real_input: bool or str
+            Whether to use a real-to-complex forward FFT for
+            real-valued fields (see :func:`Refocus.__init__`)
+
+            .. versionadded:: 0.7.0
+        pad_factor: float
+            Minimum ratio between the padded and the original size
+            (see :func:`Refocus.__init__`)
+
+            .. versionadded:: 0.7.0
+        pad_size: None, str, or int
+            Size of the padded field, e.g. "fast" for an FFT-friendly
+            size (see :func:`Refocus.__init__`)
+
+            .. versionadded:: 0.7.0
         """
         super(RefocusNumpy1D, self).__init__(
             field=field,
@@ -47,6 +79,11 @@ class RefocusNumpy1D(Refocus):
             distance=distance,
             kernel=kernel,
             padding=padding,
+            dtype=dtype,
+            workspace=workspace,
+            real_input=real_input,
+            pad_factor=pad_factor,
+            pad_size=pad_size,
         )
 
     def _init_fft(self, field, padding):
@@ -64,19 +101,27 @@ class RefocusNumpy1D(Refocus):
         fft_field0: 1d complex-valued ndarray
             Fourier transform the initial field
         """
-        if padding:
-            field = pad.pad_add(field)
-        return xp.fft.fft(field)
+        if self.pad_mode:
+            field = pad.pad_add(field, size=self.shape, mode=self.pad_mode,
+                                stack_ndim=self.stack_ndim)
+        if self.real_input:
+            fft_field0 = xp.fft.rfft(field)
+        else:
+            fft_field0 = xp.fft.fft(field)
+        # numpy<2 always computes the FFT in double precision
+        return fft_field0.astype(self.dtype, copy=False)
+
+    def _compute_kz(self):
+        """Compute the distance-independent axial wavenumber for 1D
 
-    def get_kernel(self, distance):
-        """Return the kernel for a 1D propagation"""
+        See :func:`Refocus._compute_kz` for details.
+        """
         nm = self.medium_index
         res = self.wavelength / self.pixel_size
-        d = (distance - self.distance) / self.pixel_size
         twopi = 2 * xp.pi
 
         km = twopi * nm / res
-        kx = xp.fft.fftfreq(len(self.fft_origin)) * 2 * xp.pi
+        kx = self._get_fftfreq(0) * 2 * xp.pi
 
         # free space propagator is
         if self.kernel == "helmholtz":
@@ -86,29 +131,57 @@ class RefocusNumpy1D(Refocus):
             root_km = km ** 2 - kx ** 2
             rt0 = (root_km > 0)
             # multiply by rt0 (filter in Fourier space)
-            fstemp = xp.exp(1j * (xp.sqrt(root_km * rt0) - km) * d) * rt0
+            kz = xp.sqrt(root_km * rt0) - km
         elif self.kernel == "fresnel":
             # unnormalized: exp(i*d*(km-kx²/(2*km))
-            fstemp = xp.exp(-1j * d * kx ** 2 / (2 * km))
+            rt0 = None
+            kz = -kx ** 2 / (2 * km)
         else:
             raise KeyError(f"Unknown propagation kernel: '{self.kernel}'")
-        return fstemp
+        return kz.astype(self.real_dtype, copy=False), rt0
 
-    def propagate(self, distance):
+    def propagate(self, distance, out=None, copy=True, roi=None):
         """Propagate the initial field to a certain distance
 
         Parameters
         ----------
         distance: float
             Absolute focusing distance [m]
+        out: ndarray or None
+            If given, the refocused field is written to this array
+
+            .. versionadded:: 0.7.0
+        copy: bool
+            If False, the returned array may be a view of the
+            workspace (see :func:`Refocus.propagate`)
+
+            .. versionadded:: 0.7.0
+        roi: slice or list or None
+            If given, only this region of interest of the refocused
+            field is computed (see :func:`Refocus.propagate`)
+
+            .. versionadded:: 0.7.0
 
         Returns
         -------
         refocused_field: 1d ndarray
             Initial 1D field refocused at `distance`
         """
-        fft_kernel = self.get_kernel(distance=distance)
-        refoc = xp.fft.ifft(self.fft_origin * fft_kernel)
-        if self.padding:
-            refoc = pad.pad_rem(refoc)
-        return refoc
+        return super(RefocusNumpy1D, self).propagate(
+            distance=distance, out=out, copy=copy, roi=roi)
+
+    def _propagate_product(self, product, out=None, copy=True):
+        if self.workspace:
+            ws = self._get_workspace()
+            if FFT_HAS_OUT:
+                refoc = xp.fft.ifft(product, out=ws["output"])
+            else:
+                refoc = ws["output"]
+                refoc[:] = xp.fft.ifft(product)
+        else:
+            refoc = xp.fft.ifft(product)
+        return self._return_field(refoc, out=out, copy=copy,
+                                  shared=self.workspace)
+
+    def _ifft_many(self, fft_block):
+        return xp.fft.ifft(fft_block, axis=-1)
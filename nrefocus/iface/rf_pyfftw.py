@@ -1,23 +1,139 @@
-import multiprocessing as mp
+import weakref
 
-from .._ndarray_backend import xp
-import pyfftw
-
-from .. import pad
+from .. import _fftw_wisdom, pad
+from .._fftw_registry import fftw_registry, release_plans
+from .._threads import get_thread_budget
 
 from .base import Refocus
 
 
+#: Planner flags of FFTW, ordered by increasing planning time
+PLANNER_EFFORTS = ["FFTW_ESTIMATE", "FFTW_MEASURE", "FFTW_PATIENT",
+                   "FFTW_EXHAUSTIVE"]
+
+
 class RefocusPyFFTW(Refocus):
     """Refocusing with FFTW
 
     .. versionadded:: 0.4.0
 
+    .. versionchanged:: 0.7.0
+       FFTW wisdom is loaded from a cache file when the first instance
+       is created and saved at exit (see :func:`save_wisdom`)
+
+    .. versionchanged:: 0.7.0
+       FFTW plans and their aligned buffers are taken from and
+       returned to the process-wide pool
+       :data:`nrefocus._fftw_registry.fftw_registry`, such that new
+       instances with the same shape do not have to plan or allocate
+
     """
     backend_expected = "numpy"
     # pyfftw can't used `cupy` ndarrays
     backend_incompatible = "cupy"
 
+    def __init__(self, field, wavelength, pixel_size, medium_index=1.3333,
+                 distance=0, kernel="helmholtz", padding=True,
+                 dtype="complex128", workspace=False, real_input=False,
+                 pad_factor=2, pad_size=None, threads=None,
+                 planner_effort="FFTW_MEASURE", planning_timelimit=None):
+        """
+        Parameters
+        ----------
+        field, wavelength, pixel_size, medium_index, distance, kernel,
+        padding, dtype, workspace, real_input, pad_factor, pad_size:
+            see :func:`Refocus.__init__`
+        threads: int or None
+            Number of threads of the forward and backward Fourier
+            transforms; if None, the thread budget of the process is
+            used, i.e. the environment variable `NREFOCUS_NUM_THREADS`
+            or `OMP_NUM_THREADS`, one thread in the worker processes
+            of a :class:`multiprocessing.pool.Pool`, or the number of
+            CPUs available to the process (CPU affinity)
+
+            .. versionadded:: 0.7.0
+        planner_effort: str
+            FFTW planner flag for the forward and backward transforms,
+            one of "FFTW_ESTIMATE" (fastest planning), "FFTW_MEASURE",
+            "FFTW_PATIENT" or "FFTW_EXHAUSTIVE" (fastest transforms)
+
+            .. versionadded:: 0.7.0
+        planning_timelimit: float or None
+            Maximum time [s] spent planning each transform; None
+            means no limit
+
+            .. versionadded:: 0.7.0
+        """
+        if planner_effort not in PLANNER_EFFORTS:
+            raise ValueError(f"Unknown planner effort: '{planner_effort}'")
+        self.threads = get_thread_budget() if threads is None else threads
+        self.planner_effort = planner_effort
+        self.planning_timelimit = planning_timelimit
+        _fftw_wisdom.ensure_wisdom_loaded()
+        # plans leased from `fftw_registry`, returned when garbage-collected
+        self._plans = []
+        weakref.finalize(self, release_plans, self._plans)
+        super(RefocusPyFFTW, self).__init__(
+            field=field,
+            wavelength=wavelength,
+            pixel_size=pixel_size,
+            medium_index=medium_index,
+            distance=distance,
+            kernel=kernel,
+            padding=padding,
+            dtype=dtype,
+            workspace=workspace,
+            real_input=real_input,
+            pad_factor=pad_factor,
+            pad_size=pad_size,
+        )
+
+    @staticmethod
+    def load_wisdom(path=None):
+        """Import FFTW wisdom from a file
+
+        This is done automatically for the default cache file, which
+        is defined by the environment variable `NREFOCUS_FFTW_WISDOM`
+        (an empty string disables the cache) and defaults to
+        `nrefocus/fftw_wisdom.json` in the user cache directory.
+
+        Parameters
+        ----------
+        path: str or pathlib.Path or None
+            Wisdom file; defaults to the cache file
+
+        Returns
+        -------
+        success: bool
+            Whether wisdom was imported
+
+        .. versionadded:: 0.7.0
+        """
+        return _fftw_wisdom.load_wisdom(path)
+
+    @staticmethod
+    def save_wisdom(path=None):
+        """Export the FFTW wisdom of this process to a file
+
+        New wisdom is saved to the cache file automatically at exit
+        (see :func:`load_wisdom`). The file is merged with existing
+        wisdom and replaced atomically, so it can be shared by
+        several processes.
+
+        Parameters
+        ----------
+        path: str or pathlib.Path or None
+            Wisdom file; defaults to the cache file
+
+        Returns
+        -------
+        success: bool
+            Whether the wisdom was written
+
+        .. versionadded:: 0.7.0
+        """
+        return _fftw_wisdom.save_wisdom(path)
+
     def _init_fft(self, field, padding):
         """Perform initial Fourier transform of the input field
 
@@ -25,8 +141,9 @@ class RefocusPyFFTW(Refocus):
         ----------
         field: 2d complex-valued ndarray
             Input field to be refocused
-        padding: bool
+        padding: bool or str
             Wheter to perform boundary-padding with linear ramp
+            (see :attr:`Refocus.pad_mode`)
 
         Returns
         -------
@@ -35,32 +152,90 @@ class RefocusPyFFTW(Refocus):
 
         Notes
         -----
-        The number of threads in PyFFTW is currently set to the
-        number of CPUs via `multiprocessing.cpu_count()`.
+        Both transforms are planned with :attr:`RefocusPyFFTW.threads`
+        threads and the :attr:`RefocusPyFFTW.planner_effort`.
+
+        The padded field is written directly to the aligned input
+        array of the forward plan. The forward plan is returned to
+        the pool right away, the backward plans when the instance
+        is garbage-collected.
         """
-        if padding:
-            field = pad.pad_add(field)
+        # plans of a previous padded shape (see `Refocus._fit_padding`)
+        release_plans(self._plans)
+        shape = self.shape
         # compute the input Fourier transform
-        origin = pyfftw.empty_aligned(field.shape, dtype='complex128')
-        fft_origin = pyfftw.empty_aligned(field.shape, dtype='complex128')
-        fft_obj = pyfftw.FFTW(origin, fft_origin, axes=(0, 1))
-        origin[:] = field
+        if self.real_input:
+            # real-to-complex transform (half spectrum)
+            origin_dtype = self.real_dtype
+            fft_shape = shape[:-1] + (shape[-1] // 2 + 1,)
+        else:
+            origin_dtype = self.dtype
+            fft_shape = shape
+        # planning overwrites the input array
+        fft_obj = self._acquire_plan(shape, origin_dtype, fft_shape,
+                                     direction="FFTW_FORWARD")
+        origin = fft_obj.input_array
+        if self.pad_mode:
+            pad.pad_add(field, size=shape, mode=self.pad_mode, out=origin)
+        else:
+            origin[:] = field
         fft_obj()
+        fft_origin = fft_obj.output_array.copy()
+        fftw_registry.release(fft_obj)
 
         # now setup the backward transform
-        inv_input = pyfftw.empty_aligned(field.shape, dtype='complex128')
-        inv_output = pyfftw.empty_aligned(field.shape, dtype='complex128')
-        self._ifft_obj = pyfftw.FFTW(inv_input, inv_output, axes=(0, 1),
-                                     direction="FFTW_BACKWARD",
-                                     flags=["FFTW_DESTROY_INPUT"],
-                                     threads=mp.cpu_count())
+        self._ifft_obj = self._acquire_plan(shape, self.dtype, shape,
+                                            direction="FFTW_BACKWARD")
+        self._plans.append(self._ifft_obj)
+        # batched backward transform (see `_ifft_many`)
+        self._ifft_many_obj = None
         return fft_origin
 
-    def propagate(self, distance):
-        fft_kernel = self.get_kernel(distance=distance)
-        xp.multiply(self.fft_origin, fft_kernel,
-                    out=self._ifft_obj.input_array)
-        refoc = self._ifft_obj()
-        if self.padding:
-            refoc = pad.pad_rem(refoc)
-        return refoc
+    def _acquire_plan(self, input_shape, input_dtype, output_shape,
+                      direction):
+        """Lease a plan from :data:`fftw_registry`
+
+        The plan is computed with :attr:`RefocusPyFFTW.threads`
+        threads and the :attr:`RefocusPyFFTW.planner_effort`;
+        backward transforms may overwrite their input.
+        """
+        flags = [self.planner_effort]
+        if direction == "FFTW_BACKWARD":
+            flags.append("FFTW_DESTROY_INPUT")
+        return fftw_registry.acquire(
+            input_shape=input_shape,
+            input_dtype=input_dtype,
+            output_shape=output_shape,
+            output_dtype=self.dtype,
+            axes=tuple(range(len(input_shape) - 2, len(input_shape))),
+            direction=direction,
+            flags=flags,
+            threads=self.threads,
+            planning_timelimit=self.planning_timelimit)
+
+    def _get_product_buffer(self):
+        """The product is written to the input of the backward plan"""
+        return self._ifft_obj.input_array
+
+    def _get_workspace(self):
+        """The buffers of the backward FFTW plan are the workspace"""
+        return {"product": self._ifft_obj.input_array,
+                "output": self._ifft_obj.output_array,
+                }
+
+    def _propagate_product(self, product, out=None, copy=True):
+        refoc = self._ifft_obj(input_array=product)
+        return self._return_field(refoc, out=out, copy=copy, shared=True)
+
+    def _ifft_many(self, fft_block):
+        """Batched inverse FFT, reusing the plan for equal chunk sizes"""
+        if (self._ifft_many_obj is None
+                or self._ifft_many_obj.input_shape != fft_block.shape):
+            if self._ifft_many_obj is not None:
+                self._plans.remove(self._ifft_many_obj)
+                fftw_registry.release(self._ifft_many_obj)
+            self._ifft_many_obj = self._acquire_plan(
+                fft_block.shape, self.dtype, fft_block.shape,
+                direction="FFTW_BACKWARD")
+            self._plans.append(self._ifft_many_obj)
+        return self._ifft_many_obj(input_array=fft_block)
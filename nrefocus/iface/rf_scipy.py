@@ -0,0 +1,116 @@
+import scipy.fft
+
+from .._ndarray_backend import xp
+
+from .. import pad
+from .._threads import get_thread_budget
+
+from .base import Refocus
+
+
+class RefocusScipy(Refocus):
+    """Refocusing with the multithreaded Fourier transform of scipy
+
+    .. versionadded:: 0.7.0
+
+    """
+    backend_expected = "numpy"
+    # scipy.fft does not work with `cupy` ndarrays
+    backend_incompatible = "cupy"
+
+    def __init__(self, field, wavelength, pixel_size, medium_index=1.3333,
+                 distance=0, kernel="helmholtz", padding=True,
+                 dtype="complex128", workspace=False, real_input=False,
+                 pad_factor=2, pad_size=None, workers=None,
+                 overwrite_x=True):
+        """
+        Parameters
+        ----------
+        field, wavelength, pixel_size, medium_index, distance, kernel,
+        padding, dtype, workspace, real_input, pad_factor, pad_size:
+            see :func:`Refocus.__init__`
+        workers: int or None
+            Number of threads of the Fourier transforms (see
+            :func:`scipy.fft.fft2`); if None, the thread budget of
+            the process is used (see :class:`RefocusPyFFTW`)
+        overwrite_x: bool
+            Whether the Fourier transforms may overwrite their
+            (internal) input arrays, i.e. whether the padded field
+            and the product of kernel and Fourier transform are
+            transformed in-place. This avoids one padded array per
+            transform.
+        """
+        self.workers = get_thread_budget() if workers is None else workers
+        self.overwrite_x = overwrite_x
+        super(RefocusScipy, self).__init__(
+            field=field,
+            wavelength=wavelength,
+            pixel_size=pixel_size,
+            medium_index=medium_index,
+            distance=distance,
+            kernel=kernel,
+            padding=padding,
+            dtype=dtype,
+            workspace=workspace,
+            real_input=real_input,
+            pad_factor=pad_factor,
+            pad_size=pad_size,
+        )
+
+    def _init_fft(self, field, padding):
+        """Perform initial Fourier transform of the input field
+
+        Parameters
+        ----------
+        field: 2d complex-valued ndarray
+            Input field to be refocused
+        padding: bool or str
+            Whether to perform boundary-padding with linear ramp
+            (see :attr:`Refocus.pad_mode`)
+
+        Returns
+        -------
+        fft_field0: 2d complex-valued ndarray
+            Fourier transform the initial field
+        """
+        if self.pad_mode:
+            field = pad.pad_add(field, size=self.shape, mode=self.pad_mode)
+        # never overwrite the input field of the user
+        overwrite_x = (self.overwrite_x
+                       and not xp.may_share_memory(field, self.origin))
+        if self.real_input:
+            # half spectrum (see `Refocus._get_spectrum_blocks`)
+            fft_field0 = scipy.fft.rfft2(field, workers=self.workers,
+                                         overwrite_x=overwrite_x)
+        else:
+            fft_field0 = scipy.fft.fft2(field, workers=self.workers,
+                                        overwrite_x=overwrite_x)
+        return fft_field0.astype(self.dtype, copy=False)
+
+    def _get_workspace(self):
+        """Only the product buffer is needed for in-place transforms"""
+        if self._workspace is None:
+            product = xp.empty(self.shape, dtype=self.dtype)
+            self._workspace = {
+                "product": product,
+                "output": (product if self.overwrite_x
+                           else xp.empty(self.shape, dtype=self.dtype)),
+            }
+        return self._workspace
+
+    def _propagate_product(self, product, out=None, copy=True):
+        # the product is a temporary array or the workspace buffer,
+        # which is transformed in-place for `overwrite_x`
+        refoc = scipy.fft.ifft2(product, workers=self.workers,
+                                overwrite_x=self.overwrite_x)
+        if self.workspace and not self.overwrite_x:
+            output = self._get_workspace()["output"]
+            output[...] = refoc
+            refoc = output
+        return self._return_field(refoc, out=out, copy=copy,
+                                  shared=self.workspace)
+
+    def _ifft_many(self, fft_block):
+        return scipy.fft.ifft2(fft_block, axes=(-2, -1),
+                               workers=self.workers,
+                               overwrite_x=self.overwrite_x)
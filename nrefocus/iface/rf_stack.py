@@ -0,0 +1,365 @@
+try:
+    import scipy.fft
+except ImportError:
+    scipy = None
+
+from .._ndarray_backend import xp
+
+from .. import pad
+from .._threads import get_thread_budget
+
+from . import base
+from .base import Refocus
+from .rf_numpy_1d import RefocusNumpy1D
+
+
+class RefocusStack1D(RefocusNumpy1D):
+    """Refocus a stack of 1D fields (e.g. lines) with numpy
+
+    All lines of the (n_lines, N) input field share the geometry
+    and thus the kernel. The lines are padded with one call to
+    :func:`nrefocus.pad.pad_add` and transformed with one batched
+    FFT along the last axis, i.e. refocusing the stack costs a
+    single kernel evaluation instead of one per line. Different
+    distances per line (e.g. a tilted focal plane) are applied by
+    broadcasting (see :func:`RefocusStack1D.propagate`).
+
+    .. versionadded:: 0.7.0
+    """
+    stack_ndim = 1
+
+    def __init__(self, field, wavelength, pixel_size, medium_index=1.3333,
+                 distance=0, kernel="helmholtz", padding=True,
+                 dtype="complex128", workspace=False, real_input=False,
+                 pad_factor=2, pad_size=None):
+        """
+        Parameters
+        ----------
+        field: 2d ndarray
+            Stack of 1D fields with the shape (n_lines, N); the
+            lines are refocused along the last axis
+        wavelength, pixel_size, medium_index, distance, kernel,
+        padding, dtype, workspace, real_input, pad_factor, pad_size:
+            see :func:`RefocusNumpy1D.__init__`; `distance` is the
+            initial focusing distance of all lines
+        """
+        if xp.ndim(field) != 2:
+            raise ValueError(f"Expected a stack of 1D fields with the "
+                             f"shape (n_lines, N), got the shape "
+                             f"{xp.shape(field)}!")
+        super(RefocusStack1D, self).__init__(
+            field=field,
+            wavelength=wavelength,
+            pixel_size=pixel_size,
+            medium_index=medium_index,
+            distance=distance,
+            kernel=kernel,
+            padding=padding,
+            dtype=dtype,
+            workspace=workspace,
+            real_input=real_input,
+            pad_factor=pad_factor,
+            pad_size=pad_size,
+        )
+
+    def autofocus(self, *args, **kwargs):
+        raise TypeError(
+            "Autofocusing is not supported for stacks of lines, "
+            "please use `nrefocus.autofocus_stack`!")
+
+    def propagate(self, distance, out=None, copy=True, roi=None):
+        """Propagate all lines to a common or to individual distances
+
+        Parameters
+        ----------
+        distance: float or 1d ndarray
+            Absolute focusing distance [m] of all lines, or one
+            distance per line (shape (n_lines,))
+        out: ndarray or None
+            If given, the refocused lines are written to this array
+        copy: bool
+            If False, the returned array may be a view of the
+            workspace (see :func:`Refocus.propagate`)
+        roi: slice or list or None
+            If given, only this region of interest of every line
+            is computed (see :func:`Refocus.propagate`)
+
+        Returns
+        -------
+        refocused_field: 2d ndarray
+            Stack of lines refocused at `distance`
+        """
+        return super(RefocusStack1D, self).propagate(
+            distance=distance, out=out, copy=copy, roi=roi)
+
+
+class RefocusStack(Refocus):
+    """Refocus a stack of 2D fields with one shared kernel
+
+    The padded Fourier transforms of all M fields of the (M, Ny, Nx)
+    input stack are stored in one array. The kernel is evaluated
+    once per distance and applied to all fields, which are
+    transformed with batched 2D FFTs over the last two axes. Padding,
+    forward and inverse transforms are computed in chunks of fields,
+    such that the temporary arrays stay within a memory budget.
+
+    If :mod:`scipy` is installed, the Fourier transforms of
+    :mod:`scipy.fft` are used with `workers` threads; otherwise
+    :mod:`numpy.fft` is used.
+
+    .. versionadded:: 0.7.0
+    """
+    backend_expected = "numpy"
+    # cupy doesn't work due to padding
+    backend_incompatible = "cupy"
+    stack_ndim = 1
+
+    def __init__(self, field, wavelength, pixel_size, medium_index=1.3333,
+                 distance=0, kernel="helmholtz", padding=True,
+                 dtype="complex128", workspace=False, real_input=False,
+                 pad_factor=2, pad_size=None, workers=None, chunk_size=None):
+        """
+        Parameters
+        ----------
+        field: 3d ndarray
+            Stack of 2D fields with the shape (M, Ny, Nx)
+        wavelength, pixel_size, medium_index, distance, kernel,
+        padding, dtype, workspace, real_input, pad_factor, pad_size:
+            see :func:`Refocus.__init__`; `distance` is the initial
+            focusing distance of all fields
+        workers: int or None
+            Number of threads of the Fourier transforms (only with
+            :mod:`scipy`); if None, the thread budget of the process
+            is used (see :class:`RefocusPyFFTW`)
+        chunk_size: int or None
+            Number of fields that are padded and transformed at
+            once; if None, the chunk size is chosen such that one
+            chunk of padded fields occupies at most
+            :const:`nrefocus.iface.base.CHUNK_BYTES`
+        """
+        if xp.ndim(field) != 3:
+            raise ValueError(f"Expected a stack of 2D fields with the "
+                             f"shape (M, Ny, Nx), got the shape "
+                             f"{xp.shape(field)}!")
+        self.workers = get_thread_budget() if workers is None else workers
+        self._chunk_size = chunk_size
+        super(RefocusStack, self).__init__(
+            field=field,
+            wavelength=wavelength,
+            pixel_size=pixel_size,
+            medium_index=medium_index,
+            distance=distance,
+            kernel=kernel,
+            padding=padding,
+            dtype=dtype,
+            workspace=workspace,
+            real_input=real_input,
+            pad_factor=pad_factor,
+            pad_size=pad_size,
+        )
+
+    @property
+    def chunk_size(self):
+        """Number of fields that are transformed at once"""
+        if self._chunk_size is not None:
+            return self._chunk_size
+        nbytes = self.dtype.itemsize
+        for size in self.shape:
+            nbytes *= size
+        return max(1, base.CHUNK_BYTES // nbytes)
+
+    @classmethod
+    def propagate_stack(cls, field, focus_distance, out=None,
+                        chunk_size=None, **kwargs):
+        """Propagate a stack once without keeping its Fourier transforms
+
+        A :class:`RefocusStack` holds the padded Fourier transforms of
+        all fields, which is several times the size of the stack.
+        For a single propagation, the stack is instead processed
+        chunk by chunk (padding, Fourier transform, kernel, inverse
+        Fourier transform), such that the memory usage is bounded
+        by the output stack and one chunk. The kernel is shared by
+        the chunks via :data:`nrefocus.kernel_cache`.
+
+        Parameters
+        ----------
+        field: 3d ndarray
+            Stack of 2D fields with the shape (M, Ny, Nx)
+        focus_distance: float or 1d ndarray
+            Absolute focusing distance [m] of all fields, or one
+            distance per field (see :func:`RefocusStack.propagate`)
+        out: ndarray or None
+            If given, the refocused fields are written to this array
+        chunk_size: int or None
+            Number of fields per chunk (see
+            :func:`RefocusStack.__init__`)
+        kwargs:
+            Keyword arguments for :func:`RefocusStack.__init__`
+            (e.g. the initial focusing `distance`)
+
+        Returns
+        -------
+        refocused_field: 3d ndarray
+            Stack of fields refocused at `distance`
+        """
+        num = xp.shape(field)[0]
+        per_field = bool(xp.ndim(focus_distance))
+        start = 0
+        while start < num:
+            # the first chunk only has one field, which determines
+            # the default chunk size for the padded shape
+            stop = min(start + (chunk_size or 1), num)
+            rf = cls(field=field[start:stop], chunk_size=chunk_size,
+                     **kwargs)
+            refoc = rf.propagate(focus_distance[start:stop] if per_field
+                                 else focus_distance)
+            if out is None:
+                out = xp.empty((num,) + refoc.shape[1:], dtype=refoc.dtype)
+            out[start:stop] = refoc
+            chunk_size = rf.chunk_size
+            start = stop
+        return out
+
+    def _iter_chunks(self):
+        """Yield slices of the stack with :attr:`chunk_size` fields"""
+        num = self.stack_shape[0]
+        for start in range(0, num, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, num))
+
+    def _fft2(self, data, inverse=False, overwrite_x=False):
+        """(Inverse) 2D Fourier transform over the last two axes"""
+        if inverse:
+            name = "ifft2"
+        elif self.real_input:
+            name = "rfft2"
+        else:
+            name = "fft2"
+        if scipy is not None:
+            return getattr(scipy.fft, name)(data, axes=(-2, -1),
+                                            workers=self.workers,
+                                            overwrite_x=overwrite_x)
+        return getattr(xp.fft, name)(data, axes=(-2, -1))
+
+    def _init_fft(self, field, padding):
+        """Pad and Fourier transform the stack in chunks
+
+        Parameters
+        ----------
+        field: 3d ndarray
+            Stack of fields to be refocused
+        padding: bool or str
+            Whether to perform boundary-padding with linear ramp
+            (see :attr:`Refocus.pad_mode`)
+
+        Returns
+        -------
+        fft_field0: 3d complex-valued ndarray
+            Fourier transforms of the initial fields
+        """
+        shape = self.shape
+        if self.real_input:
+            shape = shape[:-1] + (shape[-1] // 2 + 1,)
+        fft_field0 = xp.empty(self.stack_shape + shape, dtype=self.dtype)
+        for frames in self._iter_chunks():
+            chunk = field[frames]
+            if self.pad_mode:
+                chunk = pad.pad_add(chunk, size=self.shape,
+                                    mode=self.pad_mode, stack_ndim=1)
+            # never overwrite the input field of the user
+            fft_field0[frames] = self._fft2(
+                chunk, overwrite_x=not xp.may_share_memory(chunk,
+                                                           self.origin))
+        return fft_field0
+
+    def _get_workspace(self):
+        """Only a chunk-sized product buffer is needed"""
+        if self._workspace is None:
+            self._workspace = {
+                "product": xp.empty((self.chunk_size,) + self.shape,
+                                    dtype=self.dtype),
+            }
+        return self._workspace
+
+    def autofocus(self, *args, **kwargs):
+        raise TypeError(
+            "Autofocusing is not supported for stacks of fields, "
+            "please use `nrefocus.autofocus_stack`!")
+
+    def propagate(self, distance, out=None, copy=True, roi=None):
+        """Propagate all fields to a common or to individual distances
+
+        Parameters
+        ----------
+        distance: float or 1d ndarray
+            Absolute focusing distance [m] of all fields, or one
+            distance per field (shape (M,)); a common distance only
+            costs one kernel evaluation for the whole stack
+        out: ndarray or None
+            If given, the refocused fields are written to this array
+        copy: bool
+            Ignored, the returned array is always owned by the
+            caller (kept for compatibility with
+            :func:`Refocus.propagate`)
+        roi: slice or list or None
+            If given, only this region of interest of every field
+            is computed (see :func:`Refocus.propagate`)
+
+        Returns
+        -------
+        refocused_field: 3d ndarray
+            Stack of fields refocused at `distance`
+        """
+        self._fit_padding(distance)
+        if xp.ndim(distance):
+            return self._propagate_chunks(
+                d=self._get_field_distances(distance), out=out, roi=roi)
+        else:
+            return self._propagate_chunks(
+                fft_kernel=self.get_kernel(distance), out=out, roi=roi)
+
+    def _propagate_kernel(self, fft_kernel, out=None, copy=True):
+        return self._propagate_chunks(fft_kernel=fft_kernel, out=out)
+
+    def _propagate_chunks(self, fft_kernel=None, d=None, out=None, roi=None):
+        """Propagate the stack chunk by chunk
+
+        Parameters
+        ----------
+        fft_kernel: ndarray or None
+            Kernel shared by all fields (see
+            :func:`Refocus.get_kernel`)
+        d: ndarray or None
+            Relative distances [px] per field if `fft_kernel`
+            is None (see :func:`Refocus._get_field_distances`)
+        out: ndarray or None
+            Output array for the refocused stack
+        roi: slice or list or None
+            Region of interest (see :func:`Refocus.propagate`)
+        """
+        roi = self.parse_roi(roi)
+        for frames in self._iter_chunks():
+            product = self._apply_kernel(
+                fft_kernel=fft_kernel,
+                d=None if d is None else d[frames],
+                out=(self._get_workspace()["product"][:frames.stop
+                                                      - frames.start]
+                     if self.workspace else None),
+                frames=frames)
+            if roi is not None:
+                refoc = self._propagate_roi(product, roi=roi)
+            else:
+                refoc = self._fft2(product, inverse=True, overwrite_x=True)
+                refoc = refoc[(Ellipsis,) + tuple(
+                    slice(0, s) for s in self.field_shape)]
+            if out is None:
+                out = xp.empty(self.stack_shape + refoc.shape[1:],
+                               dtype=self.dtype)
+            out[frames] = refoc
+        return out
+
+    def _propagate_product(self, product, out=None, copy=True):
+        refoc = self._fft2(product, inverse=True, overwrite_x=True)
+        return self._return_field(refoc, out=out, copy=copy)
+
+    def _ifft_many(self, fft_block):
+        return self._fft2(fft_block, inverse=True, overwrite_x=True)
@@ -8,7 +8,6 @@ def metric_med_gradient(rfi, distance, roi=None, **kwargs):
     -----
     The absolute value of the gradient is returned.
     """
-    data = xp.abs(rfi.propagate(distance))
-    if roi is not None:
-        data = data[roi]
+    # only the ROI is computed
+    data = xp.abs(rfi.propagate(distance, copy=False, roi=roi))
     return xp.median(xp.array(xp.gradient(data))**2)
@@ -8,7 +8,7 @@ def metric_rms_contrast(rfi, distance, roi=None, **kwargs):
     -----
     The negative angle of the field is used for contrast estimation.
     """
-    data = -xp.angle(rfi.propagate(distance))
+    data = -xp.angle(rfi.propagate(distance, copy=False))
     av = xp.average(data, *kwargs)
     mal = 1 / (data.shape[0] * data.shape[1])
     if roi is not None:
@@ -1,3 +1,4 @@
+from .._kernel_cache import kernel_cache
 from .._ndarray_backend import xp
 
 
@@ -10,21 +11,29 @@ def metric_spectrum(rfi, distance, roi=None, **kwargs):
 
     Performs bandpass filtering in Fourier space according to optical
     limit of detection system, approximated by twice the wavelength.
+
+    The propagation kernel and the bandpass filter are shared
+    via :data:`nrefocus.kernel_cache`.
     """
     if roi is not None:
         raise MetricSpectrumValueError(
             "Spectral method does not support ROIs!")
 
     wavelength_px = rfi.wavelength / rfi.pixel_size
-    kernel = rfi.get_kernel(distance)
-    fftdata = rfi.fft_origin * kernel
+    # full spectrum, also for `real_input`
+    fftdata = rfi.get_spectrum(distance)
 
     # Filter Fourier transform
     fftdata[0, 0] = 0
-    kx = 2 * xp.pi * xp.fft.fftfreq(fftdata.shape[0]).reshape(1, -1)
-    ky = 2 * xp.pi * xp.fft.fftfreq(fftdata.shape[1]).reshape(-1, 1)
-    kmax = (2 * xp.pi) / (2 * wavelength_px)
-    fftdata[xp.where(kx ** 2 + ky ** 2 > kmax ** 2)] = 0
+    key = ("metric_spectrum", xp.backend_name(), fftdata.shape, wavelength_px)
+    passband = kernel_cache.get(key)
+    if passband is None:
+        kx = 2 * xp.pi * xp.fft.fftfreq(fftdata.shape[0]).reshape(-1, 1)
+        ky = 2 * xp.pi * xp.fft.fftfreq(fftdata.shape[1]).reshape(1, -1)
+        kmax = (2 * xp.pi) / (2 * wavelength_px)
+        passband = kx ** 2 + ky ** 2 <= kmax ** 2
+        kernel_cache.put(key, passband)
+    xp.multiply(fftdata, passband, out=fftdata)
 
     spec = xp.sum(xp.log(1 + xp.abs(fftdata))) / xp.sqrt(
         xp.prod(xp.array(rfi.shape))
@@ -4,6 +4,8 @@
 """
 from __future__ import division, print_function
 
+import math
+
 from ._ndarray_backend import xp
 
 
@@ -38,7 +40,92 @@ def _get_pad_left_right(small, large):
     return int(leftpad), int(rightpad)
 
 
-def pad_add(av, size=None, stlen=10):
+#: Available padding modes (see :func:`pad_add`)
+PAD_MODES = ["ramp", "zero", "mirror", "apodize"]
+
+#: Prime factors of the sizes returned by :func:`get_fast_size`
+FAST_PRIMES = (2, 3, 5, 7)
+
+
+def get_fast_size(size):
+    """Smallest FFT-friendly length that is not smaller than `size`
+
+    FFT libraries (pocketfft, FFTW, cuFFT) are fastest for lengths
+    that only have small prime factors. This returns the next
+    7-smooth number, i.e. the smallest integer larger than or equal
+    to `size` whose prime factors are all in :const:`FAST_PRIMES`.
+
+    .. versionadded:: 0.7.0
+    """
+    size = int(size)
+    if size <= 1:
+        return 1
+    best = 1 << (size - 1).bit_length()
+    # products of the odd primes that are smaller than a power of two
+    products = [1]
+    for prime in FAST_PRIMES[1:]:
+        new = []
+        for value in products:
+            while value < best:
+                new.append(value)
+                value *= prime
+        products = new
+    for value in products:
+        # multiply with the smallest sufficient power of two
+        value <<= (-(-size // value) - 1).bit_length()
+        best = min(best, value)
+    return best
+
+
+def get_pad_size(shape, pad_factor=2, pad_size=None):
+    """Compute the size of a padded array
+
+    Parameters
+    ----------
+    shape: tuple of ints
+        Shape of the original array
+    pad_factor: float
+        Minimum ratio between the padded size and the original size
+        along each axis (must be at least 1)
+    pad_size: None, str, int, or tuple of ints
+        If None, the padded size along each axis is
+        `ceil(pad_factor * s)`; if "fast", the next FFT-friendly
+        length (see :func:`get_fast_size`) at or above that size is
+        used; otherwise, the padded size itself (`pad_factor` is
+        ignored)
+
+    Returns
+    -------
+    size: tuple of ints
+        Padded size
+
+    .. versionadded:: 0.7.0
+    """
+    shape = tuple(int(s) for s in shape)
+    if pad_size is None or isinstance(pad_size, str):
+        if pad_factor < 1:
+            raise ValueError(f"`pad_factor` must be at least 1, "
+                             f"got {pad_factor}!")
+        # round to suppress floating point errors (e.g. 1.1 * 10)
+        size = tuple(math.ceil(round(pad_factor * s, 6)) for s in shape)
+        if pad_size == "fast":
+            size = tuple(get_fast_size(s) for s in size)
+        elif pad_size is not None:
+            raise ValueError(f"Unknown padding size: '{pad_size}'")
+    else:
+        if not hasattr(pad_size, "__len__"):
+            pad_size = [pad_size] * len(shape)
+        size = tuple(int(s) for s in pad_size)
+        if len(size) != len(shape):
+            raise ValueError("`pad_size` must have same length as shape!")
+        if any(large < small for small, large in zip(shape, size)):
+            raise ValueError(f"`pad_size` {size} must not be smaller "
+                             f"than the shape {shape}!")
+    return size
+
+
+def pad_add(av, size=None, stlen=10, mode="ramp", out=None, alpha=0.2,
+            stack_ndim=0):
     """ Perform linear padding for complex array
 
     The input array `av` is padded with a linear ramp starting at the
@@ -56,89 +143,271 @@ def pad_add(av, size=None, stlen=10):
         The array that will be padded.
     size: int or tuple of length 1 (1D) or tuple of length 2 (2D), optional
         The final size of the padded array. Defaults to double the size
-        of the input array.
+        of the input array (see :func:`get_pad_size` for other padding
+        factors and FFT-friendly sizes).
     stlen: int, optional
         The thickness of the frame within `av` that will be used to
         compute an average value for padding.
-
+    mode: str
+        Padding mode, one of
+
+        - "ramp": linear ramp from the edges to the border average
+          (default, identical to :func:`numpy.pad` with
+          `mode="linear_ramp"`)
+        - "zero": zero padding
+        - "mirror": mirror image of the array (:func:`numpy.pad`
+          with `mode="symmetric"`), which is continuous at the edges
+        - "apodize": no padding; the array is smoothly tapered
+          towards the border average with a Tukey window, which
+          avoids the larger FFTs of padding at the cost of
+          attenuating the border region
+
+        .. versionadded:: 0.7.0
+    out: ndarray, optional
+        Array of the final size to which the padded array is
+        written, e.g. the aligned input buffer of an FFTW plan
+
+        .. versionadded:: 0.7.0
+    alpha: float, optional
+        Fraction of the Tukey window that is tapered
+        (only for `mode="apodize"`)
+
+        .. versionadded:: 0.7.0
+    stack_ndim: int, optional
+        Number of leading axes of `av` that index a stack of 1D or
+        2D arrays, which are padded individually (e.g. 1 for a stack
+        of lines with the shape (n_lines, N)). The border average
+        is computed for every array of the stack. If `size` does
+        not include the stack axes, the stack shape is prepended.
+
+        .. versionadded:: 0.7.0
 
     Returns
     -------
     pv: complex 1D or 2D ndarray
         Padded array `av` with pads appended to right and bottom.
+
+    Notes
+    -----
+    The padded array is written directly in its final layout to a
+    single output array (the pads that :func:`numpy.pad` prepends
+    are rolled to the end) and the border average is computed from
+    edge strips only.
     """
+    if mode not in PAD_MODES:
+        raise ValueError(f"Unknown padding mode: '{mode}'")
+
+    stack = tuple(av.shape[:stack_ndim])
     if size is None:
-        size = list()
-        for s in av.shape:
-            size.append(int(2*s))
+        if mode == "apodize":
+            size = av.shape
+        else:
+            size = list(stack)
+            for s in av.shape[stack_ndim:]:
+                size.append(int(2*s))
     elif not hasattr(size, "__len__"):
         size = [size]
+    size = tuple(size)
+    if len(size) == len(av.shape) - stack_ndim:
+        size = stack + size
 
-    assert len(av.shape) in [1, 2], "Only 1D and 2D arrays!"
+    assert len(av.shape) - stack_ndim in [1, 2], "Only 1D and 2D arrays!"
     assert len(av.shape) == len(
         size), "`size` must have same length as `av.shape`!"
-
-    if len(av.shape) == 2:
-        return _pad_add_2d(av, size, stlen)
+    assert size[:stack_ndim] == stack, "Stack axes cannot be padded!"
+
+    assert all(large >= small for small, large in zip(av.shape, size)), \
+        "Can only pad when new size larger than old size"
+
+    if mode == "apodize":
+        if size != av.shape:
+            raise ValueError("Apodization does not change the size!")
+        return _apodize(av, stlen, alpha, out, stack_ndim)
+
+    if out is None:
+        out = xp.empty(size, dtype=av.dtype)
+    elif out.shape != size:
+        raise ValueError(f"`out` must have the shape {size}, "
+                         f"got {out.shape}!")
+    out[tuple(slice(0, s) for s in av.shape)] = av
+    if mode == "zero":
+        _pad_zero(out, av.shape)
+    elif mode == "mirror":
+        _pad_mirror(out, av.shape)
     else:
-        return _pad_add_1d(av, size, stlen)
+        _pad_ramp(out, av, _get_border_average(av, stlen, stack_ndim))
+    return out
 
 
-def _pad_add_1d(av, size, stlen):
-    """1D component of `pad_add`"""
-    assert len(size) == 1
+def _get_border(av, stlen, stack_ndim=0):
+    """Return the frame of thickness `stlen` of `av` (flattened)
 
-    padx = _get_pad_left_right(av.shape[0], size[0])
-
-    mask = xp.zeros(av.shape, dtype=bool)
-    mask[stlen:-stlen] = True
-    border = av[~mask]
-    if av.dtype.name.count("complex"):
-        padval = xp.average(xp.abs(border)) * \
-            xp.exp(1j*xp.average(xp.angle(border)))
-    else:
-        padval = xp.average(border)
-    if xp.__version__[:3] in ["1.7", "1.8", "1.9"]:
-        end_values = ((padval, padval),)
-    else:
-        end_values = (padval,)
-    bv = xp.pad(av,
-                padx,
-                mode="linear_ramp",
-                end_values=end_values)
-    # roll the array so that the padding values are on the right
-    bv = xp.roll(bv, -padx[0], 0)
-    return bv
-
-
-def _pad_add_2d(av, size, stlen):
-    """2D component of `pad_add`"""
-    assert len(size) == 2
-
-    padx = _get_pad_left_right(av.shape[0], size[0])
-    pady = _get_pad_left_right(av.shape[1], size[1])
-
-    mask = xp.zeros(av.shape, dtype=bool)
-    mask[stlen:-stlen, stlen:-stlen] = True
-    border = av[~mask]
+    The elements are returned in the same (C) order as for
+    `av[~mask]`, where `mask` is True in the interior, but only
+    the edge strips are accessed. For stacks, the frames of the
+    individual arrays are flattened along the last axis.
+    """
+    stack = av.shape[:stack_ndim]
+    pre = (slice(None),) * stack_ndim
+
+    def _flatten(arr):
+        return arr.reshape(stack + (-1,))
+
+    inner = [range(s)[stlen:-stlen] for s in av.shape[stack_ndim:]]
+    if len(inner) == 1 or not len(inner[0]) or not len(inner[1]):
+        if not all(len(ii) for ii in inner):
+            # no interior
+            return _flatten(av)
+        else:
+            return xp.concatenate([av[pre + (slice(0, inner[0].start),)],
+                                   av[pre + (slice(inner[0].stop, None),)]],
+                                  axis=-1)
+    rows = slice(inner[0].start, inner[0].stop)
+    middle = xp.concatenate(
+        [av[pre + (rows, slice(0, inner[1].start))],
+         av[pre + (rows, slice(inner[1].stop, None))]], axis=-1)
+    return xp.concatenate(
+        [_flatten(av[pre + (slice(0, inner[0].start),)]),
+         _flatten(middle),
+         _flatten(av[pre + (slice(inner[0].stop, None),)])], axis=-1)
+
+
+def _get_border_average(av, stlen, stack_ndim=0):
+    """Average value of the frame of thickness `stlen` of `av`
+
+    For complex arrays, the average is computed for phase and
+    amplitude separately. For stacks, an array with the average
+    of every array of the stack is returned, with singleton axes
+    in place of the padded axes.
+    """
+    border = _get_border(av, stlen, stack_ndim)
     if av.dtype.name.count("complex"):
-        padval = xp.average(xp.abs(border)) * \
-            xp.exp(1j*xp.average(xp.angle(border)))
+        padval = xp.average(xp.abs(border), axis=-1) * \
+            xp.exp(1j*xp.average(xp.angle(border), axis=-1))
     else:
-        padval = xp.average(border)
-    padval = padval.item()  # with cupy 0d array we have to get the value
-    if xp.__version__[:3] in ["1.7", "1.8", "1.9"]:
-        end_values = ((padval, padval), (padval, padval))
-    else:
-        end_values = (padval,)
-    bv = xp.pad(av,
-                (padx, pady),
-                mode="linear_ramp",
-                end_values=end_values)
-    # roll the array so that the padding values are on the right
-    bv = xp.roll(bv, -padx[0], 0)
-    bv = xp.roll(bv, -pady[0], 1)
-    return bv
+        padval = xp.average(border, axis=-1)
+    if stack_ndim:
+        return padval.reshape(padval.shape
+                              + (1,) * (len(av.shape) - stack_ndim))
+    # with cupy 0d array we have to get the value
+    return padval.item()
+
+
+def _iter_pad_regions(shape, size):
+    """Yield the pad regions of an array padded along each axis
+
+    Axes are padded one after another (like :func:`numpy.pad`),
+    such that the regions for axis `k` span the full size along
+    the axes that were already padded.
+
+    Yields
+    ------
+    axis: int
+        Padded axis
+    region: list of slices
+        Region of the output filled before padding `axis`
+    right: slice
+        Right pad (the right pad of :func:`numpy.pad`)
+    left: slice
+        Left pad (the left pad of :func:`numpy.pad`, rolled to the
+        end of the axis)
+    """
+    region = [slice(0, s) for s in shape]
+    for axis, (small, large) in enumerate(zip(shape, size)):
+        if small < large:
+            padleft, padright = _get_pad_left_right(small, large)
+            yield (axis, list(region),
+                   slice(small, small + padright),
+                   slice(small + padright, large))
+        region[axis] = slice(None)
+
+
+def _pad_mirror(out, shape):
+    """Fill the pads of `out` with the mirror image of `out[shape]`"""
+    for axis, region, right, left in _iter_pad_regions(shape, out.shape):
+        small = shape[axis]
+        padleft, padright = _get_pad_left_right(small, out.shape[axis])
+        index = xp.pad(xp.arange(small), (padleft, padright),
+                       mode="symmetric")
+        index = xp.roll(index, -padleft)[small:]
+        dest = list(region)
+        dest[axis] = slice(small, None)
+        xp.take(out[tuple(region)], index, axis=axis,
+                out=out[tuple(dest)], mode="clip")
+
+
+def _pad_ramp(out, av, padval):
+    """Fill the pads of `out` with linear ramps towards `padval`
+
+    This reproduces :func:`numpy.pad` with `mode="linear_ramp"`
+    (including its rounding for integer arrays), but writes the
+    ramps directly to the rolled layout in `out`.
+    """
+    for axis, region, right, left in _iter_pad_regions(av.shape, out.shape):
+        small = av.shape[axis]
+        for pad, edge_index in [(right, small - 1), (left, 0)]:
+            width = pad.stop - pad.start
+            if not width:
+                continue
+            edge = list(region)
+            edge[axis] = edge_index
+            edge = out[tuple(edge)]
+            if out.dtype != av.dtype:
+                # ramps are computed in the precision of `av`
+                if av.dtype.kind != "c":
+                    edge = edge.real
+                edge = edge.astype(av.dtype)
+            # `padval` is an array like `end_values` in `numpy.pad`
+            start = xp.asarray(padval)
+            if start.ndim:
+                # stack of border averages (in double precision like
+                # the scalar average)
+                start = xp.squeeze(start, axis=axis).astype(
+                    xp.promote_types(start.dtype, xp.float64))
+            ramp = xp.linspace(start, edge, width,
+                               endpoint=False, dtype=av.dtype, axis=axis)
+            if pad is right:
+                ramp = xp.flip(ramp, axis=axis)
+            dest = list(region)
+            dest[axis] = pad
+            out[tuple(dest)] = ramp
+
+
+def _pad_zero(out, shape):
+    """Set the pads of `out` to zero"""
+    for axis, region, right, left in _iter_pad_regions(shape, out.shape):
+        dest = list(region)
+        dest[axis] = slice(shape[axis], None)
+        out[tuple(dest)] = 0
+
+
+def _apodize(av, stlen, alpha, out=None, stack_ndim=0):
+    """Taper `av` towards its border average with a Tukey window"""
+    padval = _get_border_average(av, stlen, stack_ndim)
+    if out is None:
+        out = xp.empty(av.shape, dtype=xp.result_type(av.dtype, padval))
+    out[...] = av
+    out -= padval
+    for axis, size in enumerate(av.shape):
+        if axis < stack_ndim:
+            continue
+        shape = [1] * len(av.shape)
+        shape[axis] = size
+        out *= _tukey(size, alpha).reshape(shape)
+    out += padval
+    return out
+
+
+def _tukey(size, alpha):
+    """Tukey (tapered cosine) window of length `size`"""
+    window = xp.ones(size)
+    width = alpha * (size - 1) / 2
+    if width > 0:
+        nn = xp.arange(size)
+        taper = nn < width
+        window[taper] = 0.5 * (1 + xp.cos(xp.pi * (nn[taper] / width - 1)))
+        window[::-1][taper] = window[taper]
+    return window
 
 
 def pad_rem(pv, size=None):
@@ -152,9 +421,14 @@ def pad_rem(pv, size=None):
     pv: 1D or 2D ndarray
         The array from which the padding will be removed.
     size: tuple of length 1 (1D) or 2 (2D), optional
-        The final size of the un-padded array. Defaults to half the size
-        of the input array.
+        The final size of the un-padded array, i.e. the size of the
+        array passed to :func:`pad_add`. Defaults to half the size
+        of the input array, which is only correct for the default
+        padding size of :func:`pad_add`.
 
+        .. versionchanged:: 0.7.0
+           a ValueError is raised if `size` is not given for
+           arrays with uneven sizes
 
     Returns
     -------
@@ -164,7 +438,9 @@ def pad_rem(pv, size=None):
     if size is None:
         size = list()
         for s in pv.shape:
-            assert s % 2 == 0, "Uneven size; specify correct size of output!"
+            if s % 2:
+                raise ValueError("Uneven size; specify correct size "
+                                 "of output!")
             size.append(int(s/2))
     elif not hasattr(size, "__len__"):
         size = [size]
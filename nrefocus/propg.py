@@ -2,6 +2,7 @@ import multiprocessing as mp
 from ._ndarray_backend import xp
 
 from . import iface
+from ._executor import map_stack
 
 
 __all__ = ["refocus", "refocus_stack"]
@@ -46,14 +47,23 @@ def refocus(field, d, nm, res, method="helmholtz", padding=True):
     function uses `async` which appears to not work with e.g.
     :mod:`pyfftw`. Use `rf = nrefocus.iface.RefocusCupy` syntax
     if you want to use PyFFTW or Cupy.
+
+    .. versionchanged:: 0.7.0
+       If the shape of `field` was autotuned on this host (see
+       :func:`nrefocus.autotune`), the fastest interface is used.
     """
     fshape = len(field.shape)
+    rfkwargs = {}
     if fshape == 1:
         # 1D field
         rfcls = iface.RefocusNumpy1D
     elif fshape == 2:
         # 2D field
         rfcls = iface.RefocusNumpy
+        tuned = iface.autotune.get_tuned_settings(field.shape)
+        if tuned is not None:
+            # fastest interface on this host (see `nrefocus.autotune`)
+            rfcls, rfkwargs = tuned
     else:
         raise AssertionError("Dimension of `field` must be 1 or 2.")
 
@@ -65,7 +75,8 @@ def refocus(field, d, nm, res, method="helmholtz", padding=True):
                medium_index=nm,
                distance=0,
                kernel=method,
-               padding=padding
+               padding=padding,
+               **rfkwargs
                )
     refoc = rf.propagate(distance=d*pixel_size)
 
@@ -73,7 +84,8 @@ def refocus(field, d, nm, res, method="helmholtz", padding=True):
 
 
 def refocus_stack(fieldstack, d, nm, res, method="helmholtz",
-                  num_cpus=_cpu_count, copy=True, padding=True):
+                  num_cpus=_cpu_count, copy=True, padding=True,
+                  executor=None):
     """Refocus a stack of 1D or 2D fields
 
 
@@ -82,8 +94,12 @@ def refocus_stack(fieldstack, d, nm, res, method="helmholtz",
     fieldstack : 2d or 3d array
         Stack of 1D or 2D background corrected electric fields (Ex/BEx).
         The first axis iterates through the individual fields.
-    d : float
-        Distance to be propagated in pixels (negative for backwards)
+    d : float or 1d array
+        Distance to be propagated in pixels (negative for backwards);
+        alternatively, one distance per field
+
+        .. versionchanged:: 0.7.0
+           one distance per field
     nm : float
         Refractive index of medium
     res : float
@@ -96,7 +112,8 @@ def refocus_stack(fieldstack, d, nm, res, method="helmholtz",
             - "fresnel"   : paraxial approximation `exp(idk²/kₘ)`
 
     num_cpus : int
-        Defines the number of CPUs to be used for refocusing.
+        Defines the number of CPUs (processes or FFT threads) to be
+        used for refocusing.
     copy : bool
         If False, overwrites input stack.
     padding : bool
@@ -104,60 +121,80 @@ def refocus_stack(fieldstack, d, nm, res, method="helmholtz",
         to reduce ringing artifacts.
 
         .. versionadded:: 0.1.4
+    executor : None, str, or concurrent.futures.Executor
+        Executor for refocusing fields with individual distances;
+        "process" (default if None) or "thread" for the persistent
+        process or thread pool with `num_cpus` workers (see
+        :func:`nrefocus.get_executor`), or any executor instance,
+        which is not shut down
+
+        .. versionadded:: 0.7.0
 
     Returns
     -------
     Electric field stack at `d`.
-    """
-    func = refocus
-    names = func.__code__.co_varnames[:func.__code__.co_argcount]
-
-    loc = locals()
-    vardict = dict()
-    for name in names:
-        if name in loc.keys():
-            vardict[name] = loc[name]
-    # default keyword arguments
-    func_def = func.__defaults__[::-1]
 
-    vardict["padding"] = padding
+    Notes
+    -----
+    If all fields share the distance `d`, the stack is refocused in
+    the current process with :class:`nrefocus.RefocusStack` (or
+    :class:`nrefocus.RefocusStack1D`), which evaluates the kernel
+    only once and uses batched Fourier transforms with `num_cpus`
+    threads. 2D fields are processed in memory-bounded chunks (see
+    :func:`nrefocus.RefocusStack.propagate_stack`). Fields with
+    individual distances are refocused with `executor`; worker
+    processes read the input and write the output stack in shared
+    memory (see :mod:`nrefocus._shared_stack`).
+
+    .. versionchanged:: 0.7.0
+       batched refocusing for a common distance, shared memory
+       transport and persistent pools for worker processes
+    """
+    if xp.ndim(d) == 0:
+        # all fields share one kernel
+        rfcls = iface.RefocusStack1D if len(fieldstack.shape) == 2 \
+            else iface.RefocusStack
+        rfkwargs = {} if rfcls is iface.RefocusStack1D \
+            else {"workers": num_cpus}
+        # use a made-up pixel size so we can use the `Refocus` interface
+        pixel_size = 1e-6
+        rfkwargs.update(wavelength=res*pixel_size,
+                        pixel_size=pixel_size,
+                        medium_index=nm,
+                        distance=0,
+                        kernel=method,
+                        padding=padding,
+                        )
+        if rfcls is iface.RefocusStack:
+            # stream the chunks instead of keeping all spectra
+            data = rfcls.propagate_stack(fieldstack, d*pixel_size,
+                                         **rfkwargs)
+        else:
+            rf = rfcls(field=fieldstack, **rfkwargs)
+            data = rf.propagate(distance=d*pixel_size)
+        if not copy:
+            fieldstack[:] = data
+            data = fieldstack
+        return data
 
     M = fieldstack.shape[0]
-    stackargs = list()
-
-    # Create individual arglists for all fields
-    for m in range(M):
-        kwarg = vardict.copy()
-        kwarg["field"] = fieldstack[m]
-        # now we turn the kwarg into an arglist
-        args = list()
-        for i, a in enumerate(names[::-1]):
-            # first set default
-            if i < len(func_def):
-                val = func_def[i]
-            if a in kwarg:
-                val = kwarg[a]
-            args.append(val)
-        stackargs.append(args[::-1])
-
-    p = mp.Pool(num_cpus)
-    result = p.map_async(_refocus_wrapper, stackargs).get()
-    p.close()
-    p.terminate()
-    p.join()
-
-    if copy:
-        data = xp.zeros(fieldstack.shape, dtype=result[0].dtype)
-    else:
+    if xp.shape(d) != (M,):
+        raise ValueError(f"Expected one distance per field ({M}), got "
+                         f"the shape {xp.shape(d)}!")
+    kwargs = {"nm": nm, "res": res, "method": method, "padding": padding}
+    data, _ = map_stack(_refocus_field,
+                        fieldstack,
+                        dtype=complex,
+                        kwargs=[dict(kwargs, d=d[m]) for m in range(M)],
+                        executor=executor,
+                        num_cpus=num_cpus)
+    if not copy:
+        fieldstack[:] = data
         data = fieldstack
 
-    for m in range(M):
-        data[m] = result[m]
-
     return data
 
 
-def _refocus_wrapper(args):
-    """Just calls autofocus with *args. Needed for multiprocessing pool.
-    """
-    return refocus(*args)
+def _refocus_field(field, **kwargs):
+    """Refocus one field of a stack (see :func:`_executor.map_stack`)"""
+    return refocus(field, **kwargs), None
@@ -1,3 +1,4 @@
+import os
 import os.path as op
 import zipfile
 import numpy as np
@@ -5,6 +6,10 @@ import pytest
 
 import nrefocus
 
+# do not use FFTW wisdom or autotuning profiles in the user cache directory
+os.environ["NREFOCUS_FFTW_WISDOM"] = ""
+os.environ["NREFOCUS_AUTOTUNE_PROFILE"] = ""
+
 
 @pytest.fixture(autouse=True)
 def set_ndarray_backend_to_numpy():
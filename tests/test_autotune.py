@@ -0,0 +1,133 @@
+"""Test autotuning of the refocusing interface"""
+import json
+
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus.iface import autotune
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.fixture
+def profile_path(tmp_path, monkeypatch):
+    path = tmp_path / "profile.json"
+    monkeypatch.setenv("NREFOCUS_AUTOTUNE_PROFILE", str(path))
+    return path
+
+
+def test_autotune(profile_path):
+    candidates = [(nrefocus.RefocusNumpy, {"pad_size": None}),
+                  (nrefocus.RefocusNumpy, {"pad_size": "fast"})]
+    result = nrefocus.autotune((30, 40), candidates=candidates, repeats=2)
+    assert len(result["timings"]) == 2
+    assert result["interface"] == "RefocusNumpy"
+    assert result["time"] == min(tt["time"] for tt in result["timings"])
+    data = json.loads(profile_path.read_text())
+    assert data["format"] == 1
+    assert list(data["shapes"]) == ["numpy:30x40"]
+    rfcls, kwargs = autotune.get_tuned_settings((30, 40))
+    assert rfcls is nrefocus.RefocusNumpy
+    assert kwargs == result["kwargs"]
+    # other shapes are not tuned
+    assert autotune.get_tuned_settings((40, 30)) is None
+
+
+def test_autotune_default_candidates(profile_path):
+    candidates = autotune.get_candidates(threads=[1, 2])
+    names = {rfcls.__name__ for rfcls, _ in candidates}
+    assert "RefocusNumpy" in names
+    if nrefocus.RefocusPyFFTW is not None:
+        assert {"dtype": "complex128", "pad_size": "fast", "threads": 2} \
+            in [kw for rfcls, kw in candidates
+                if rfcls is nrefocus.RefocusPyFFTW]
+    result = nrefocus.autotune((16, 16), candidates=candidates, repeats=1,
+                               save=False)
+    assert len(result["timings"]) == len(candidates)
+    assert not profile_path.exists()
+
+
+@skip_if_missing("scipy")
+def test_autotune_profile_used(profile_path, cell_field):
+    result = {"interface": "RefocusScipy",
+              "kwargs": {"workers": 1, "pad_size": "fast"},
+              "time": 1,
+              "init_time": 1}
+    assert autotune.save_result(cell_field.shape, result)
+    # results for other shapes are kept
+    assert autotune.save_result((10, 10), dict(result,
+                                               interface="RefocusNumpy"))
+    assert nrefocus.get_best_interface(shape=cell_field.shape) \
+        is nrefocus.RefocusScipy
+    assert nrefocus.get_best_interface(shape=(10, 10)) \
+        is nrefocus.RefocusNumpy
+
+    # the functional API uses the tuned interface and settings
+    refocused = nrefocus.refocus(cell_field, d=5, nm=1.333, res=4.6)
+    rf = nrefocus.RefocusScipy(field=cell_field,
+                               wavelength=4.6e-6,
+                               pixel_size=1e-6,
+                               medium_index=1.333,
+                               workers=1,
+                               pad_size="fast")
+    assert np.allclose(refocused, rf.propagate(5e-6), rtol=0, atol=1e-14)
+
+
+def test_autotune_kernel_cache_cleared(profile_path, monkeypatch):
+    sizes = []
+
+    class Recorder(nrefocus.RefocusNumpy):
+        def __init__(self, *args, **kwargs):
+            # kernels of previous candidates must not be reused
+            sizes.append(len(nrefocus.kernel_cache))
+            super(Recorder, self).__init__(*args, **kwargs)
+
+    monkeypatch.setattr(nrefocus.iface, "Recorder", Recorder, raising=False)
+    autotune.autotune((20, 30), candidates=[(Recorder, {})] * 3,
+                      repeats=2, save=False)
+    assert sizes == [0, 0, 0]
+
+
+def test_autotune_kernel_cache_unchanged(profile_path):
+    nrefocus.kernel_cache.clear()
+    rf = nrefocus.RefocusNumpy(field=np.ones((20, 30), dtype=complex),
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6)
+    rf.get_kernel(1e-6)
+    rf.get_kernel(1e-6)
+    stats = nrefocus.kernel_cache.stats()
+    keys = list(nrefocus.kernel_cache._data)
+    autotune.autotune((20, 30), candidates=[(nrefocus.RefocusNumpy, {})],
+                      repeats=2, save=False)
+    assert nrefocus.kernel_cache.stats() == stats
+    assert list(nrefocus.kernel_cache._data) == keys
+
+
+def test_autotune_profile_cached(profile_path, monkeypatch):
+    result = {"interface": "RefocusNumpy", "kwargs": {}, "time": 1,
+              "init_time": 1}
+    assert autotune.save_result((10, 10), result)
+    reads = []
+    read_json = autotune.read_json
+    monkeypatch.setattr(autotune, "read_json",
+                        lambda path: reads.append(path) or read_json(path))
+    for _ in range(3):
+        assert autotune.get_tuned_settings((10, 10))[0] \
+            is nrefocus.RefocusNumpy
+    assert len(reads) <= 1
+    # the profile is read again when it changes
+    assert autotune.save_result((12, 10), result)
+    reads.clear()
+    assert autotune.get_tuned_settings((12, 10)) is not None
+    assert autotune.get_tuned_settings((10, 10)) is not None
+    assert len(reads) == 1
+
+
+def test_autotune_invalid_profile(profile_path):
+    profile_path.write_text("{invalid")
+    assert autotune.load_profile() == {}
+    assert nrefocus.get_best_interface(shape=(10, 10)) \
+        is nrefocus.get_best_interface()
+    with pytest.raises(ValueError, match="only implemented for 2D"):
+        nrefocus.autotune((10,))
@@ -1,6 +1,7 @@
 import pathlib
 
 import numpy as np
+import pytest
 
 import nrefocus
 
@@ -25,3 +26,22 @@ def test_2d_refocus1_cupy(set_ndarray_backend_to_cupy):
     reference = np.loadtxt(data_path / "test_2d_refocus1.txt")
     assert np.allclose(np.array(refocused_cpu).flatten().view(float),
                        reference)
+
+
+@skip_if_missing("cupy")
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+@pytest.mark.parametrize("dtype", ["complex128", "complex64"])
+def test_2d_propagate_many_cupy(set_ndarray_backend_to_cupy, kernel, dtype):
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusCupy(field=np.arange(256).reshape(16, 16),
+                              wavelength=8.25 * pixel_size,
+                              pixel_size=pixel_size,
+                              medium_index=1.533,
+                              distance=0,
+                              kernel=kernel,
+                              dtype=dtype)
+    distances = [-1.5 * pixel_size, 0, 2.13 * pixel_size]
+    zstack = rf.propagate_many(distances, chunk_size=2).get()
+    for ii, dd in enumerate(distances):
+        assert np.allclose(zstack[ii], rf.propagate(dd).get(),
+                           rtol=0, atol=1e-5)
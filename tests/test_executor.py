@@ -0,0 +1,73 @@
+import concurrent.futures as cf
+import os
+
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus import _executor
+
+
+def get_stack(field, num=3):
+    field = field[50:90, 40:72]
+    return np.array([field * np.exp(0.1j * ii) for ii in range(num)])
+
+
+def _get_thread_env(_):
+    return os.environ.get("NREFOCUS_NUM_THREADS")
+
+
+def test_executor_persistent():
+    try:
+        ex1 = nrefocus.get_executor("thread", max_workers=2)
+        assert nrefocus.get_executor("thread", max_workers=2) is ex1
+        ex2 = nrefocus.get_executor("thread", max_workers=3)
+        assert ex2 is not ex1
+        assert isinstance(ex2, cf.ThreadPoolExecutor)
+        proc = nrefocus.get_executor("process", max_workers=1)
+        assert isinstance(proc, cf.ProcessPoolExecutor)
+    finally:
+        nrefocus.shutdown_executors()
+    assert not _executor._executors
+
+
+def test_executor_invalid_kind():
+    with pytest.raises(ValueError, match="Unknown executor kind"):
+        nrefocus.get_executor("cluster")
+
+
+def test_executor_process_thread_budget(monkeypatch):
+    monkeypatch.delenv("NREFOCUS_NUM_THREADS", raising=False)
+    try:
+        ex = nrefocus.get_executor("process", max_workers=1)
+        assert list(ex.map(_get_thread_env, [0])) == ["1"]
+    finally:
+        nrefocus.shutdown_executors()
+
+
+@pytest.mark.parametrize("executor", [None, "process", "thread"])
+def test_refocus_stack_executor(cell_field, executor):
+    stack = get_stack(cell_field)
+    distances = np.array([-1.5, 0.5, 2.5])
+    rstack = nrefocus.refocus_stack(stack, d=distances, nm=1.335, res=4.6,
+                                    num_cpus=2, executor=executor)
+    for field, dd, rfield in zip(stack, distances, rstack):
+        assert np.allclose(rfield,
+                           nrefocus.refocus(field, d=dd, nm=1.335, res=4.6),
+                           rtol=0, atol=1e-12)
+
+
+def test_autofocus_stack_executor_instance(cell_field):
+    stack = get_stack(cell_field, num=2)
+    kwargs = {"nm": 1.335, "res": 4.6, "ival": (-5, 5)}
+    with cf.ThreadPoolExecutor(max_workers=2) as ex:
+        d_thread, f_thread = nrefocus.autofocus_stack(stack, executor=ex,
+                                                      **kwargs)
+        # the executor is not shut down
+        assert ex.submit(sum, [1, 2]).result() == 3
+    d_proc, f_proc = nrefocus.autofocus_stack(stack, num_cpus=2, **kwargs)
+    assert np.allclose(d_thread, d_proc, rtol=0, atol=1e-10)
+    assert np.allclose(f_thread, f_proc, rtol=0, atol=1e-10)
+    for field, dd in zip(stack, d_thread):
+        assert np.allclose(dd, nrefocus.autofocus(field, **kwargs)[0],
+                           rtol=0, atol=1e-10)
@@ -0,0 +1,94 @@
+"""Test the process-wide pool of FFTW plans"""
+import gc
+
+import numpy as np
+import pytest
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.fixture
+def registry():
+    from nrefocus._fftw_registry import fftw_registry
+    fftw_registry.clear()
+    yield fftw_registry
+    fftw_registry.max_bytes = 512 * 1024**2
+    fftw_registry.clear()
+
+
+def get_refocus(field, **kwargs):
+    return nrefocus.RefocusPyFFTW(field=field,
+                                  wavelength=647e-9,
+                                  pixel_size=0.139e-6,
+                                  **kwargs)
+
+
+@skip_if_missing("pyfftw")
+def test_registry_reuse(cell_field, registry):
+    rf1 = get_refocus(cell_field)
+    # the forward plan is returned right away
+    assert registry.stats()["idle"] == 1
+    assert registry.stats()["leased"] == 1
+    ifft_obj = rf1._ifft_obj
+    reference = rf1.propagate(1e-6)
+    del rf1
+    gc.collect()
+    assert registry.stats()["leased"] == 0
+    assert registry.stats()["idle"] == 2
+    assert registry.misses == 2
+
+    rf2 = get_refocus(cell_field)
+    assert registry.misses == 2
+    assert registry.hits == 2
+    assert rf2._ifft_obj is ifft_obj
+    assert np.allclose(rf2.propagate(1e-6), reference, rtol=0, atol=0)
+
+    # instances that are alive do not share backward plans
+    rf3 = get_refocus(cell_field[::-1])
+    assert rf3._ifft_obj is not rf2._ifft_obj
+    assert np.allclose(rf3.propagate(1e-6)[::-1], reference,
+                       rtol=0, atol=1e-12)
+    assert np.allclose(rf2.propagate(1e-6), reference, rtol=0, atol=0)
+
+
+@skip_if_missing("pyfftw")
+def test_registry_keys(cell_field, registry):
+    rf1 = get_refocus(cell_field)
+    del rf1
+    gc.collect()
+    # different shape, threads, or planner effort
+    get_refocus(cell_field[:, :-1])
+    get_refocus(cell_field, threads=2)
+    get_refocus(cell_field, planner_effort="FFTW_ESTIMATE")
+    assert registry.hits == 0
+
+
+@skip_if_missing("pyfftw")
+def test_registry_memory_cap(cell_field, registry):
+    registry.max_bytes = 0
+    rf = get_refocus(cell_field)
+    rf.propagate_many([0, 1e-6])
+    del rf
+    gc.collect()
+    assert len(registry) == 0
+    assert registry.nbytes == 0
+
+    registry.max_bytes = 512 * 1024**2
+    rf = get_refocus(cell_field)
+    del rf
+    gc.collect()
+    nbytes = registry.nbytes
+    assert nbytes == 2 * 224**2 * 16 * 2
+    registry.max_bytes = nbytes - 1
+    assert len(registry) == 1
+
+
+@skip_if_missing("pyfftw")
+def test_registry_pad_auto(cell_field, registry):
+    rf = get_refocus(cell_field, pad_size="auto")
+    rf.propagate(1e-6)
+    rf.propagate(3e-6)
+    # the plans of smaller padded shapes were returned
+    assert registry.stats()["leased"] == 1
@@ -0,0 +1,70 @@
+"""Test persistent FFTW wisdom"""
+import json
+
+import numpy as np
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+@skip_if_missing("pyfftw")
+def test_wisdom_save_load(tmp_path, monkeypatch):
+    import pyfftw
+    from nrefocus._fftw_registry import fftw_registry
+    # do not reuse plans from other tests
+    fftw_registry.clear()
+    path = tmp_path / "cache" / "wisdom.json"
+    monkeypatch.setenv("NREFOCUS_FFTW_WISDOM", str(path))
+    pyfftw.forget_wisdom()
+    assert not nrefocus.RefocusPyFFTW.load_wisdom()
+    nrefocus.RefocusPyFFTW(field=np.ones((30, 40), dtype=complex),
+                           wavelength=647e-9,
+                           pixel_size=0.139e-6)
+    wisdom = pyfftw.export_wisdom()
+    assert nrefocus.RefocusPyFFTW.save_wisdom()
+    assert json.loads(path.read_text())["format"] == 1
+    # no temporary files are left behind
+    assert [pp.name for pp in path.parent.iterdir()] == ["wisdom.json"]
+
+    pyfftw.forget_wisdom()
+    assert nrefocus.RefocusPyFFTW.load_wisdom()
+    # FFTW may export the same wisdom in a different order
+    for loaded, saved in zip(pyfftw.export_wisdom(), wisdom):
+        assert sorted(loaded.splitlines()) == sorted(saved.splitlines())
+
+
+@skip_if_missing("pyfftw")
+def test_wisdom_merge(tmp_path):
+    import pyfftw
+    from nrefocus._fftw_registry import fftw_registry
+    # do not reuse plans from other tests
+    fftw_registry.clear()
+    path = tmp_path / "wisdom.json"
+    pyfftw.forget_wisdom()
+    kwargs = dict(wavelength=647e-9, pixel_size=0.139e-6)
+    nrefocus.RefocusPyFFTW(field=np.ones((30, 40), dtype=complex), **kwargs)
+    assert nrefocus.RefocusPyFFTW.save_wisdom(path)
+    wisdom1 = pyfftw.export_wisdom()
+    # wisdom of another process
+    pyfftw.forget_wisdom()
+    fftw_registry.clear()
+    nrefocus.RefocusPyFFTW(field=np.ones((10, 10), dtype=complex), **kwargs)
+    wisdom2 = pyfftw.export_wisdom()
+    assert nrefocus.RefocusPyFFTW.save_wisdom(path)
+    pyfftw.forget_wisdom()
+    nrefocus.RefocusPyFFTW.load_wisdom(path)
+    merged = pyfftw.export_wisdom()
+    assert len(merged[0]) > max(len(wisdom1[0]), len(wisdom2[0]))
+
+
+@skip_if_missing("pyfftw")
+def test_wisdom_invalid_file(tmp_path):
+    path = tmp_path / "wisdom.json"
+    path.write_text("not json")
+    assert not nrefocus.RefocusPyFFTW.load_wisdom(path)
+    path.write_text(json.dumps({"format": 0, "wisdom": []}))
+    assert not nrefocus.RefocusPyFFTW.load_wisdom(path)
+    # the file is overwritten
+    assert nrefocus.RefocusPyFFTW.save_wisdom(path)
+    assert nrefocus.RefocusPyFFTW.load_wisdom(path)
@@ -0,0 +1,64 @@
+"""Test streaming z-sweeps"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.mark.parametrize("reuse_buffer", [True, False])
+def test_iter_planes(cell_field, reuse_buffer):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6)
+    distances = np.linspace(-2e-6, 2e-6, 9)
+    planes = []
+    for dd, plane in zip(distances,
+                         rf.iter_planes(distances,
+                                        reuse_buffer=reuse_buffer)):
+        assert plane.shape == cell_field.shape
+        assert np.allclose(plane, rf.propagate(dd), rtol=0, atol=1e-12)
+        planes.append(plane)
+    assert (planes[0] is planes[-1]) == reuse_buffer
+
+
+def test_iter_planes_max_projection(cell_field):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6)
+    distances = np.linspace(-2e-6, 2e-6, 9)
+    projection = np.zeros(cell_field.shape)
+    for plane in rf.iter_planes(distances):
+        projection = np.maximum(projection, np.abs(plane))
+    reference = np.max(np.abs(rf.propagate_many(distances)), axis=0)
+    assert np.allclose(projection, reference, rtol=0, atol=1e-12)
+
+
+def test_iter_planes_constant_memory(cell_field):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6)
+    peaks = []
+    for num in [5, 50]:
+        tracemalloc.start()
+        for _ in rf.iter_planes(np.linspace(-2e-6, 2e-6, num)):
+            pass
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    # the number of planes does not matter
+    assert peaks[1] < 1.1 * peaks[0]
+    assert peaks[1] < 8 * rf.fft_origin.nbytes
+
+
+@skip_if_missing("pyfftw")
+def test_iter_planes_pyfftw(cell_field):
+    rf = nrefocus.RefocusPyFFTW(field=cell_field,
+                                wavelength=647e-9,
+                                pixel_size=0.139e-6)
+    distances = np.linspace(-2e-6, 2e-6, 5)
+    for dd, plane in zip(distances, rf.iter_planes(distances)):
+        plane = np.array(plane, copy=True)
+        assert np.allclose(plane, rf.propagate(dd), rtol=0, atol=1e-12)
@@ -0,0 +1,124 @@
+"""Test the process-wide kernel cache"""
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus import KernelCache, kernel_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_kernel_cache():
+    kernel_cache.clear()
+    yield
+    kernel_cache.clear()
+
+
+def test_kernel_cache_shared_between_instances():
+    pixel_size = 1e-6
+    kwargs = dict(wavelength=8.25*pixel_size,
+                  pixel_size=pixel_size,
+                  medium_index=1.533,
+                  distance=0,
+                  kernel="helmholtz",
+                  padding=False)
+    rf1 = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16),
+                                **kwargs)
+    rf2 = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16)[::-1],
+                                **kwargs)
+    kernel1 = rf1.get_kernel(distance=2.13*pixel_size)
+    misses = kernel_cache.misses
+    kernel2 = rf2.get_kernel(distance=2.13*pixel_size)
+    assert kernel1 is kernel2
+    assert kernel_cache.misses == misses
+    assert kernel_cache.hits == 1
+    assert not kernel1.flags.writeable
+
+    # different relative distance
+    rf3 = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16),
+                                **dict(kwargs, distance=pixel_size))
+    kernel3 = rf3.get_kernel(distance=2.13*pixel_size)
+    assert not np.allclose(kernel1, kernel3)
+    assert np.allclose(kernel3, rf1.get_kernel(distance=1.13*pixel_size))
+
+
+def test_kernel_cache_lru_eviction():
+    cache = KernelCache(max_bytes=3 * 160)
+    for ii in range(3):
+        cache.put(ii, np.zeros(10, dtype=complex))
+    assert len(cache) == 3
+    # touch the oldest entry, so that `1` is evicted next
+    assert cache.get(0) is not None
+    cache.put(3, np.zeros(10, dtype=complex))
+    assert 1 not in cache
+    assert 0 in cache
+    assert cache.nbytes == 3 * 160
+    assert cache.get(1) is None
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+    # too large entries are not stored
+    cache.put(4, np.zeros(100, dtype=complex))
+    assert 4 not in cache
+
+    # reducing the budget evicts entries
+    cache.max_bytes = 160
+    assert len(cache) == 1
+    assert 3 in cache
+
+
+def test_kernel_cache_disabled():
+    max_bytes = kernel_cache.max_bytes
+    try:
+        kernel_cache.max_bytes = 0
+        rf = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16),
+                                   wavelength=8.25e-6,
+                                   pixel_size=1e-6,
+                                   padding=False)
+        rf.get_kernel(distance=2e-6)
+        assert len(kernel_cache) == 0
+    finally:
+        kernel_cache.max_bytes = max_bytes
+
+
+def test_kernel_cache_propagate_shared_geometry(cell_field):
+    """propagate caches kernels once the geometry is shared"""
+    kwargs = dict(wavelength=647e-9, pixel_size=0.139e-6)
+    rf1 = nrefocus.RefocusNumpy(field=cell_field, **kwargs)
+    field1 = rf1.propagate(1e-6)
+    # fused evaluation: only the kz grid is cached
+    assert len(kernel_cache) == 1
+    rf2 = nrefocus.RefocusNumpy(field=cell_field, **kwargs)
+    field2 = rf2.propagate(1e-6)
+    assert len(kernel_cache) == 2
+    hits = kernel_cache.hits
+    rf3 = nrefocus.RefocusNumpy(field=cell_field, **kwargs)
+    field3 = rf3.propagate(1e-6)
+    assert kernel_cache.hits == hits + 2
+    assert np.allclose(field1, field2, rtol=0, atol=1e-14)
+    assert np.allclose(field1, field3, rtol=0, atol=1e-14)
+
+
+def test_kernel_cache_metric_spectrum_passband(cell_field):
+    """metric_spectrum caches a boolean pass band"""
+    from nrefocus.metrics.mt_spectrum import metric_spectrum
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6)
+    value = metric_spectrum(rf, 1e-6)
+    passband = [val for key, val in kernel_cache._data.items()
+                if key[0] == "metric_spectrum"]
+    assert len(passband) == 1
+    assert passband[0].dtype == bool
+    assert passband[0].shape == rf.shape
+    # reference with explicit indexing
+    fftdata = rf.fft_origin * rf.get_kernel(1e-6)
+    fftdata[0, 0] = 0
+    kx = 2 * np.pi * np.fft.fftfreq(fftdata.shape[0]).reshape(-1, 1)
+    ky = 2 * np.pi * np.fft.fftfreq(fftdata.shape[1]).reshape(1, -1)
+    kmax = np.pi * rf.pixel_size / rf.wavelength
+    fftdata[kx ** 2 + ky ** 2 > kmax ** 2] = 0
+    reference = np.sum(np.log(1 + np.abs(fftdata))) / np.sqrt(
+        np.prod(rf.shape))
+    assert np.allclose(value, reference, rtol=1e-12, atol=0)
+    # cached pass band
+    assert metric_spectrum(rf, 1e-6) == value
@@ -1,8 +1,12 @@
 """Test padding"""
 import numpy as np
+import pytest
 
+import nrefocus
 from nrefocus import pad
 
+from .helper_methods import skip_if_missing
+
 
 def test_pad_2d():
     sizes = [(50, 100),
@@ -50,6 +54,241 @@ def test_pad_2d_cmplx():
         assert np.sum(a - pad.pad_rem(b)) == 0
 
 
+def reference_pad(av, size, mode, **kwargs):
+    """padding with numpy.pad and rolling (previous implementation)"""
+    pads = [pad._get_pad_left_right(s, ps) for s, ps in zip(av.shape, size)]
+    bv = np.pad(av, pads, mode=mode, **kwargs)
+    for axis, (padleft, _) in enumerate(pads):
+        bv = np.roll(bv, -padleft, axis)
+    return bv
+
+
+@pytest.mark.parametrize("dtype", [int, float, complex, np.float32])
+@pytest.mark.parametrize("size", [None, (113, 150)])
+def test_pad_ramp_numpy_linear_ramp(dtype, size):
+    rng = np.random.default_rng(42)
+    a = (100 * rng.random((51, 40))).astype(dtype)
+    if dtype is complex:
+        a = a * np.exp(1j * a)
+    b = pad.pad_add(a, size=size, stlen=10)
+    assert b.dtype == a.dtype
+
+    mask = np.zeros(a.shape, dtype=bool)
+    mask[10:-10, 10:-10] = True
+    border = a[~mask]
+    if dtype is complex:
+        padval = np.average(np.abs(border)) * \
+            np.exp(1j*np.average(np.angle(border)))
+    else:
+        padval = np.average(border)
+    reference = reference_pad(a, b.shape, mode="linear_ramp",
+                              end_values=(padval.item(),))
+    assert np.all(b == reference)
+
+
+def test_pad_out():
+    a = np.arange(200.).reshape(10, 20)
+    out = np.zeros((20, 40), dtype=complex)
+    b = pad.pad_add(a, stlen=3, out=out)
+    assert b is out
+    assert np.all(out == pad.pad_add(a, stlen=3))
+    with pytest.raises(ValueError, match="shape"):
+        pad.pad_add(a, out=np.zeros((21, 40)))
+
+
+def test_pad_modes():
+    a = np.arange(63.).reshape(7, 9) + 1
+    b = pad.pad_add(a, size=(20, 30), mode="mirror")
+    assert np.all(b == reference_pad(a, (20, 30), mode="symmetric"))
+    b = pad.pad_add(a, size=(20, 30), mode="zero")
+    assert np.all(b == reference_pad(a, (20, 30), mode="constant"))
+    # apodization does not change the size
+    c = np.ones((40, 50)) * 2
+    c[10:30, 10:40] = 3
+    d = pad.pad_add(c, mode="apodize", stlen=5)
+    assert d.shape == c.shape
+    assert np.all(d[15:25, 15:35] == 3)
+    assert np.allclose(d[0], 2) and np.allclose(d[:, 0], 2)
+    with pytest.raises(ValueError, match="size"):
+        pad.pad_add(c, size=(80, 100), mode="apodize")
+    with pytest.raises(ValueError, match="mode"):
+        pad.pad_add(c, mode="wrap")
+
+
+@pytest.mark.parametrize("padding", [True, False, "zero", "mirror",
+                                     "apodize"])
+def test_pad_refocus_modes(cell_field, padding):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               kernel="fresnel",
+                               padding=padding)
+    if padding in [False, "apodize"]:
+        assert rf.shape == cell_field.shape
+    else:
+        assert rf.shape == (224, 224)
+    # the Fresnel kernel does not filter the spectrum
+    refocused = rf.propagate(0)
+    assert refocused.shape == cell_field.shape
+    if padding != "apodize":
+        assert np.allclose(refocused, cell_field, rtol=0, atol=1e-12)
+
+
+@skip_if_missing("pyfftw")
+@pytest.mark.parametrize("padding", [True, "mirror"])
+def test_pad_refocus_pyfftw_buffer(cell_field, padding):
+    kwargs = dict(field=cell_field,
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6,
+                  padding=padding)
+    rf = nrefocus.RefocusPyFFTW(**kwargs)
+    reference = nrefocus.RefocusNumpy(**kwargs)
+    assert np.allclose(rf.fft_origin, reference.fft_origin,
+                       rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("size, fast", [
+    (1, 1), (11, 12), (97, 98), (121, 125), (2000, 2000), (2018, 2025)])
+def test_pad_fast_size(size, fast):
+    assert pad.get_fast_size(size) == fast
+
+
+def test_pad_size():
+    assert pad.get_pad_size((1200, 1600)) == (2400, 3200)
+    assert pad.get_pad_size((1009, 10), pad_factor=1.1) == (1110, 11)
+    assert pad.get_pad_size((1009, 10), pad_factor=2,
+                            pad_size="fast") == (2025, 20)
+    assert pad.get_pad_size((1009, 10), pad_size=(1500, 10)) == (1500, 10)
+    with pytest.raises(ValueError, match="at least 1"):
+        pad.get_pad_size((10, 10), pad_factor=0.5)
+    with pytest.raises(ValueError, match="must not be smaller"):
+        pad.get_pad_size((10, 10), pad_size=8)
+    with pytest.raises(ValueError, match="Unknown padding size"):
+        pad.get_pad_size((10, 10), pad_size="slow")
+
+
+def test_pad_rem_uneven():
+    with pytest.raises(ValueError, match="Uneven size"):
+        pad.pad_rem(np.zeros(51))
+    assert pad.pad_rem(np.zeros(51), size=34).shape == (34,)
+
+
+@pytest.mark.parametrize("pad_factor, pad_size, shape", [
+    (1.5, None, (168, 168)),
+    (1.01, None, (114, 114)),
+    (1.01, "fast", (120, 120)),
+    (1, None, (112, 112)),
+])
+def test_pad_refocus_size(cell_field, pad_factor, pad_size, shape):
+    kwargs = dict(field=cell_field,
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6,
+                  kernel="fresnel")
+    rf = nrefocus.RefocusNumpy(pad_factor=pad_factor, pad_size=pad_size,
+                               **kwargs)
+    assert rf.shape == shape
+    assert np.allclose(rf.propagate(0), cell_field, rtol=0, atol=1e-12)
+    # uneven padded sizes
+    rf1d = nrefocus.RefocusNumpy1D(field=cell_field[0],
+                                   wavelength=647e-9,
+                                   pixel_size=0.139e-6,
+                                   pad_factor=pad_factor,
+                                   pad_size=pad_size)
+    assert rf1d.shape == shape[:1]
+    assert rf1d.propagate(1e-6).shape == cell_field[0].shape
+
+
+def test_pad_refocus_size_propagation(cell_field):
+    kwargs = dict(field=cell_field,
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6)
+    reference = nrefocus.RefocusNumpy(**kwargs).propagate(1e-6)
+    refocused = nrefocus.RefocusNumpy(pad_factor=1.5,
+                                      **kwargs).propagate(1e-6)
+    # the padding size mostly affects the image border
+    assert np.allclose(refocused[40:70, 40:70], reference[40:70, 40:70],
+                       rtol=0, atol=5e-3)
+
+
+@pytest.mark.parametrize("kernel, pixel_size, guard", [
+    ("fresnel", 0.139e-6, 89),
+    ("helmholtz", 0.4e-6, 21),
+    ("helmholtz", 0.3e-6, np.inf),
+    ("helmholtz", 0.139e-6, np.inf),
+])
+def test_pad_auto_guard_band(cell_field, kernel, pixel_size, guard):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=pixel_size,
+                               kernel=kernel,
+                               pad_size="auto")
+    assert rf.get_guard_band(5e-6) == guard
+    assert rf.get_guard_band(-5e-6) == guard
+    assert rf.get_guard_band(0) == 0
+    # no padding for the initial distance
+    assert rf.shape == cell_field.shape
+
+
+@pytest.mark.parametrize("pixel_size", [0.3e-6, 0.4e-6, 0.6e-6])
+def test_pad_auto_guard_band_diagonal(cell_field, pixel_size):
+    wavelength = 647e-9
+    medium_index = 1.3333
+    distance = 5e-6
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=wavelength,
+                               pixel_size=pixel_size,
+                               medium_index=medium_index,
+                               pad_size="auto")
+    # lateral shift [px] of all propagating plane waves of the grid
+    km = 2 * np.pi * medium_index / wavelength
+    kk = 2 * np.pi * np.fft.fftfreq(224, d=pixel_size)
+    kx, ky = np.meshgrid(kk, kk, indexing="ij")
+    kz2 = km**2 - kx**2 - ky**2
+    prop = kz2 > 0
+    shift = distance / pixel_size * np.sqrt(
+        kx[prop]**2 + ky[prop]**2) / np.sqrt(kz2[prop])
+    assert rf.get_guard_band(distance) >= shift.max()
+    sin_max = wavelength / (2 * pixel_size * medium_index)
+    if 1 / np.sqrt(2) < sin_max < 1:
+        # diagonal waves travel further than waves along one axis
+        assert rf.get_guard_band(distance) == np.inf
+        assert shift.max() > distance / pixel_size \
+            * sin_max / np.sqrt(1 - sin_max**2)
+
+
+def test_pad_auto_refocus(cell_field):
+    kwargs = dict(field=cell_field,
+                  wavelength=647e-9,
+                  pixel_size=0.4e-6)
+    rf = nrefocus.RefocusNumpy(pad_size="auto", workspace=True, **kwargs)
+    assert rf.shape == (112, 112)
+    # the padding grows with the propagation distance
+    field = rf.propagate(1e-6)
+    assert rf.shape == (120, 120)
+    assert field.shape == cell_field.shape
+    rf.propagate(-2e-6)
+    assert rf.shape == (125, 125)
+    # but never shrinks
+    rf.propagate(1e-6)
+    assert rf.shape == (125, 125)
+    # and it is limited by the padding factor
+    rf.propagate_many([0, 1e-3])
+    assert rf.shape == (224, 224)
+    reference = nrefocus.RefocusNumpy(**kwargs)
+    assert np.allclose(rf.propagate(1e-6), reference.propagate(1e-6),
+                       rtol=0, atol=1e-12)
+
+
+def test_pad_auto_autofocus(cell_field):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.4e-6,
+                               pad_size="auto")
+    rf.autofocus(interval=(-5e-6, 5e-6))
+    # padding sized for the interval
+    assert rf.shape == (135, 135)
+
+
 if __name__ == "__main__":
     # Run all tests
     loc = locals()
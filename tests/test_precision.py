@@ -0,0 +1,79 @@
+"""Test single-precision refocusing"""
+import numpy as np
+import pytest
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+def test_precision_single_dtypes(cell_field, kernel):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               kernel=kernel,
+                               dtype="complex64")
+    assert rf.fft_origin.dtype == np.complex64
+    assert rf._get_kz()[0].dtype == np.float32
+    assert rf.get_kernel(1e-6).dtype == np.complex64
+    assert rf.propagate(1e-6).dtype == np.complex64
+
+    rf_double = nrefocus.RefocusNumpy(field=cell_field,
+                                      wavelength=647e-9,
+                                      pixel_size=0.139e-6,
+                                      kernel=kernel)
+    assert np.allclose(rf.propagate(1e-6), rf_double.propagate(1e-6),
+                       rtol=0, atol=1e-5)
+
+
+def test_precision_single_1d():
+    pixel_size = 1e-6
+    kwargs = dict(field=np.linspace(0, 1, 200),
+                  wavelength=3.25*pixel_size,
+                  pixel_size=pixel_size,
+                  medium_index=1.333)
+    rf = nrefocus.RefocusNumpy1D(dtype="complex64", **kwargs)
+    rf_double = nrefocus.RefocusNumpy1D(**kwargs)
+    refocused = rf.propagate(distance=42.13*pixel_size)
+    assert refocused.dtype == np.complex64
+    assert np.allclose(refocused, rf_double.propagate(42.13*pixel_size),
+                       rtol=0, atol=1e-5)
+
+
+@pytest.mark.parametrize("metric", ["average gradient", "std gradient"])
+def test_precision_single_autofocus(cell_field, metric):
+    """focus distance agrees with double precision within 0.05λ"""
+    wavelength = 647e-9
+    distances = []
+    for dtype in ["complex128", "complex64"]:
+        rf = nrefocus.RefocusNumpy(field=cell_field,
+                                   wavelength=wavelength,
+                                   pixel_size=0.139e-6,
+                                   dtype=dtype)
+        distances.append(rf.autofocus(metric=metric,
+                                      interval=(-5e-6, 5e-6)))
+    assert np.allclose(distances[0], distances[1],
+                       rtol=0, atol=0.05*wavelength)
+
+
+@skip_if_missing("pyfftw")
+def test_precision_single_pyfftw(cell_field):
+    wavelength = 647e-9
+    rf = nrefocus.RefocusPyFFTW(field=cell_field,
+                                wavelength=wavelength,
+                                pixel_size=0.139e-6,
+                                dtype="complex64")
+    assert rf.fft_origin.dtype == np.complex64
+    assert rf.propagate(1e-6).dtype == np.complex64
+    d = rf.autofocus(interval=(-5e-6, 5e-6))
+    assert np.allclose(d, -8.781356558557544e-07,
+                       rtol=0, atol=0.05*wavelength)
+
+
+def test_precision_bad_dtype():
+    with pytest.raises(ValueError, match="Unsupported dtype"):
+        nrefocus.RefocusNumpy(field=np.ones((16, 16)),
+                              wavelength=1e-6,
+                              pixel_size=1e-6,
+                              dtype="float64")
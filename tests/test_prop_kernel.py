@@ -99,3 +99,152 @@ def test_prop_kernel_bad():
     with pytest.raises(KeyError):
         # at this point the kernel name is checked
         _ = rf.get_kernel(distance=distance)
+
+
+@pytest.mark.parametrize(
+    "kernel", [("helmholtz"), ("fresnel"), ]
+)
+def test_prop_kernel_kz_grid_reused(kernel):
+    """the axial wavenumber grid is computed only once per instance"""
+    pixel_size = 1e-6
+    nm = 1.533
+    wavelength = 8.25 * pixel_size
+    rf = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16),
+                               wavelength=wavelength,
+                               pixel_size=pixel_size,
+                               medium_index=nm,
+                               distance=0,
+                               kernel=kernel,
+                               padding=False)
+    kz_grid = rf._get_kz()
+    for dist in [-3.1, 0.5, 2.13]:
+        fft_kernel = rf.get_kernel(distance=dist * pixel_size)
+        assert rf._get_kz() is kz_grid
+
+        # reference implementation
+        km = 2 * np.pi * nm / (wavelength / pixel_size)
+        kx = (np.fft.fftfreq(16) * 2 * np.pi).reshape(-1, 1)
+        ky = (np.fft.fftfreq(16) * 2 * np.pi).reshape(1, -1)
+        if kernel == "helmholtz":
+            root_km = km ** 2 - kx ** 2 - ky ** 2
+            rt0 = root_km > 0
+            reference = np.exp(
+                1j * dist * (np.sqrt(root_km * rt0) - km)) * rt0
+        else:
+            reference = np.exp(-1j * dist * (kx ** 2 + ky ** 2) / (2 * km))
+        assert np.allclose(fft_kernel, reference, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "kernel", [("helmholtz"), ("fresnel"), ]
+)
+def test_prop_kernel_1d(kernel):
+    pixel_size = 1e-6
+    nm = 1.333
+    wavelength = 3.25 * pixel_size
+    rf = nrefocus.RefocusNumpy1D(field=np.arange(200),
+                                 wavelength=wavelength,
+                                 pixel_size=pixel_size,
+                                 medium_index=nm,
+                                 distance=0,
+                                 kernel=kernel,
+                                 padding=False)
+    fft_kernel = rf.get_kernel(distance=42.13 * pixel_size)
+
+    km = 2 * np.pi * nm / (wavelength / pixel_size)
+    kx = np.fft.fftfreq(200) * 2 * np.pi
+    if kernel == "helmholtz":
+        root_km = km ** 2 - kx ** 2
+        rt0 = root_km > 0
+        reference = np.exp(1j * (np.sqrt(root_km * rt0) - km) * 42.13) * rt0
+    else:
+        reference = np.exp(-1j * 42.13 * kx ** 2 / (2 * km))
+    assert np.allclose(fft_kernel, reference, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("shape", [(16, 16), (15, 17), (1, 4)])
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+def test_prop_kernel_quadrant(shape, kernel):
+    """the kernel is evaluated on one quadrant and mirrored"""
+    pixel_size = 1e-6
+    nm = 1.533
+    wavelength = 2.25 * pixel_size
+    field = np.arange(np.prod(shape)).reshape(shape) * (1 + .5j)
+    rf = nrefocus.RefocusNumpy(field=field,
+                               wavelength=wavelength,
+                               pixel_size=pixel_size,
+                               medium_index=nm,
+                               kernel=kernel,
+                               padding=False)
+    kz, _ = rf._get_kz()
+    assert kz.shape == (shape[0] // 2 + 1, shape[1] // 2 + 1)
+
+    km = 2 * np.pi * nm / (wavelength / pixel_size)
+    kx = (np.fft.fftfreq(shape[0]) * 2 * np.pi).reshape(-1, 1)
+    ky = (np.fft.fftfreq(shape[1]) * 2 * np.pi).reshape(1, -1)
+    if kernel == "helmholtz":
+        root_km = km ** 2 - kx ** 2 - ky ** 2
+        rt0 = root_km > 0
+        reference = np.exp(1j * 2.13 * (np.sqrt(root_km * rt0) - km)) * rt0
+    else:
+        reference = np.exp(-1j * 2.13 * (kx ** 2 + ky ** 2) / (2 * km))
+    fft_kernel = rf.get_kernel(distance=2.13 * pixel_size)
+    assert np.allclose(fft_kernel, reference, rtol=0, atol=1e-12)
+    assert np.allclose(rf.propagate(distance=2.13 * pixel_size),
+                       np.fft.ifft2(np.fft.fft2(field) * reference),
+                       rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("size", [200, 201])
+def test_prop_kernel_quadrant_1d(size):
+    pixel_size = 1e-6
+    nm = 1.333
+    wavelength = 3.25 * pixel_size
+    field = np.linspace(0, 1, size) * (1 + .5j)
+    rf = nrefocus.RefocusNumpy1D(field=field,
+                                 wavelength=wavelength,
+                                 pixel_size=pixel_size,
+                                 medium_index=nm,
+                                 padding=False)
+    assert rf._get_kz()[0].shape == (size // 2 + 1,)
+
+    km = 2 * np.pi * nm / (wavelength / pixel_size)
+    kx = np.fft.fftfreq(size) * 2 * np.pi
+    root_km = km ** 2 - kx ** 2
+    rt0 = root_km > 0
+    reference = np.exp(1j * (np.sqrt(root_km * rt0) - km) * 42.13) * rt0
+    assert np.allclose(rf.propagate(distance=42.13 * pixel_size),
+                       np.fft.ifft(np.fft.fft(field) * reference),
+                       rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("real_input", [False, True])
+@pytest.mark.parametrize("dtype", ["complex128", "complex64"])
+def test_prop_kernel_fresnel_separable(real_input, dtype):
+    """the Fresnel kernel is applied as one factor per axis"""
+    pixel_size = 1e-6
+    nm = 1.533
+    wavelength = 2.25 * pixel_size
+    field = np.linspace(0, 1, 15 * 17).reshape(15, 17)
+    rf = nrefocus.RefocusNumpy(field=field,
+                               wavelength=wavelength,
+                               pixel_size=pixel_size,
+                               medium_index=nm,
+                               kernel="fresnel",
+                               padding=False,
+                               dtype=dtype,
+                               real_input=real_input)
+    factors = rf._get_fresnel_factors(2.13)
+    assert [f.shape for f in factors] == [(8, 1), (1, 9)]
+    assert all(f.dtype == np.dtype(dtype) for f in factors)
+
+    km = 2 * np.pi * nm / (wavelength / pixel_size)
+    kx = (np.fft.fftfreq(15) * 2 * np.pi).reshape(-1, 1)
+    ky = (np.fft.fftfreq(17) * 2 * np.pi).reshape(1, -1)
+    reference = np.fft.ifft2(np.fft.fft2(field) * np.exp(
+        -1j * 2.13 * (kx ** 2 + ky ** 2) / (2 * km)))
+    atol = 1e-12 if dtype == "complex128" else 1e-5
+    assert np.allclose(rf.propagate(distance=2.13 * pixel_size), reference,
+                       rtol=0, atol=atol)
+    assert np.allclose(rf.propagate_many([2.13 * pixel_size])[0], reference,
+                       rtol=0, atol=atol)
@@ -0,0 +1,49 @@
+"""Test batched multi-distance propagation"""
+import numpy as np
+import pytest
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 3])
+@pytest.mark.parametrize("padding", [True, False])
+def test_propagate_many_numpy(cell_field, chunk_size, padding):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               distance=1e-6,
+                               padding=padding)
+    distances = np.linspace(-2e-6, 2e-6, 7)
+    stack = rf.propagate_many(distances, chunk_size=chunk_size)
+    assert stack.shape == (7,) + cell_field.shape
+    for dd, field in zip(distances, stack):
+        assert np.allclose(field, rf.propagate(dd), rtol=0, atol=1e-12)
+
+
+def test_propagate_many_numpy_1d():
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusNumpy1D(field=np.linspace(0, 1, 200),
+                                 wavelength=3.25*pixel_size,
+                                 pixel_size=pixel_size,
+                                 medium_index=1.333,
+                                 kernel="fresnel")
+    distances = np.arange(5) * 10.1 * pixel_size
+    stack = rf.propagate_many(distances, chunk_size=2)
+    assert stack.shape == (5, 200)
+    for dd, field in zip(distances, stack):
+        assert np.allclose(field, rf.propagate(dd), rtol=0, atol=1e-12)
+
+
+@skip_if_missing("pyfftw")
+def test_propagate_many_pyfftw(cell_field):
+    rf = nrefocus.RefocusPyFFTW(field=cell_field,
+                                wavelength=647e-9,
+                                pixel_size=0.139e-6,
+                                dtype="complex64")
+    distances = np.linspace(-2e-6, 2e-6, 5)
+    stack = rf.propagate_many(distances, chunk_size=2)
+    assert stack.dtype == np.complex64
+    for dd, field in zip(distances, stack):
+        assert np.allclose(field, rf.propagate(dd), rtol=0, atol=1e-5)
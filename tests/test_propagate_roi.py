@@ -0,0 +1,63 @@
+"""Test refocusing of a region of interest"""
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus.iface.base import _get_ifft_costs
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.mark.parametrize("roi", [
+    [10, 20, 42, 40],
+    (slice(5, 100, 3), slice(None)),
+    (slice(0, 112), slice(111, 0, -2)),
+    slice(50, 60),
+])
+@pytest.mark.parametrize("dtype", ["complex128", "complex64"])
+def test_propagate_roi(cell_field, roi, dtype):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               dtype=dtype)
+    reference = rf.propagate(1e-6)[rf.parse_roi(roi)]
+    refocused = rf.propagate(1e-6, roi=roi)
+    assert refocused.dtype == np.dtype(dtype)
+    atol = 1e-12 if dtype == "complex128" else 1e-5
+    assert np.allclose(refocused, reference, rtol=0, atol=atol)
+
+    out = np.zeros(reference.shape, dtype=dtype)
+    assert rf.propagate(1e-6, roi=roi, out=out) is out
+    assert np.allclose(out, reference, rtol=0, atol=atol)
+
+
+def test_propagate_roi_costs():
+    # a few outputs are computed with a matrix DFT
+    fft_cost, dft_cost = _get_ifft_costs(2048, 16)
+    assert dft_cost < fft_cost
+    # all outputs are computed with an FFT
+    fft_cost, dft_cost = _get_ifft_costs(2048, 2048)
+    assert fft_cost < dft_cost
+
+
+@skip_if_missing("pyfftw")
+def test_propagate_roi_pyfftw(cell_field):
+    rf = nrefocus.RefocusPyFFTW(field=cell_field,
+                                wavelength=647e-9,
+                                pixel_size=0.139e-6,
+                                real_input="auto")
+    roi = (slice(30, 50), slice(60, 90))
+    assert np.allclose(rf.propagate(-1e-6, roi=roi),
+                       rf.propagate(-1e-6)[roi],
+                       rtol=0, atol=1e-12)
+
+
+def test_propagate_roi_1d():
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusNumpy1D(field=np.linspace(0, 1, 200),
+                                 wavelength=3.25*pixel_size,
+                                 pixel_size=pixel_size,
+                                 real_input=True)
+    assert np.allclose(rf.propagate(2e-6, roi=[20, 30]),
+                       rf.propagate(2e-6)[20:30],
+                       rtol=0, atol=1e-12)
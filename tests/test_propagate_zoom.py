@@ -0,0 +1,67 @@
+"""Test chirp-z propagation onto arbitrary output grids"""
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus._czt import izoom
+
+
+@pytest.mark.parametrize("size", [1, 8, 9])
+@pytest.mark.parametrize("start, step, count", [
+    (0, 1, 8), (2.3, 0.25, 17), (-5.5, 1.7, 4)])
+def test_izoom(size, start, step, count):
+    rng = np.random.default_rng(42)
+    spectrum = rng.random((size, 3)) + 1j * rng.random((size, 3))
+    freq = np.fft.fftfreq(size).reshape(-1, 1, 1)
+    pos = (start + np.arange(count) * step).reshape(1, -1, 1)
+    reference = np.sum(spectrum[:, np.newaxis]
+                       * np.exp(2j * np.pi * freq * pos), axis=0) / size
+    assert np.allclose(izoom(spectrum, axis=0, start=start, step=step,
+                             count=count),
+                       reference, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+def test_propagate_zoom(cell_field, kernel):
+    pixel_size = 0.139e-6
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=pixel_size,
+                               kernel=kernel)
+    reference = rf.propagate(1e-6)
+    center = (50 * pixel_size, 30 * pixel_size)
+    # pixel grid
+    zoomed, (yy, xx) = rf.propagate_zoom(1e-6,
+                                         center=center,
+                                         extent=(20 * pixel_size,
+                                                 10 * pixel_size),
+                                         out_shape=(20, 10))
+    assert np.allclose(yy / pixel_size, np.arange(40, 60))
+    assert np.allclose(xx / pixel_size, np.arange(25, 35))
+    assert np.allclose(zoomed, reference[40:60, 25:35], rtol=0, atol=1e-12)
+
+    # 4x oversampling
+    zoomed4, (yy4, xx4) = rf.propagate_zoom(1e-6,
+                                            center=center,
+                                            extent=(20 * pixel_size,
+                                                    10 * pixel_size),
+                                            out_shape=(80, 40))
+    assert zoomed4.shape == (80, 40)
+    assert np.allclose(yy4[::4], yy)
+    assert np.allclose(zoomed4[::4, ::4], zoomed, rtol=0, atol=1e-12)
+
+
+def test_propagate_zoom_1d():
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusNumpy1D(field=np.linspace(0, 1, 200),
+                                 wavelength=3.25*pixel_size,
+                                 pixel_size=pixel_size,
+                                 real_input=True)
+    zoomed, (xx,) = rf.propagate_zoom(2e-6,
+                                      center=100 * pixel_size,
+                                      extent=10 * pixel_size,
+                                      out_shape=30)
+    assert zoomed.shape == (30,)
+    assert np.allclose(xx[::3] / pixel_size, np.arange(95, 105))
+    assert np.allclose(zoomed[::3], rf.propagate(2e-6)[95:105],
+                       rtol=0, atol=1e-12)
@@ -0,0 +1,83 @@
+"""Test the real-to-complex forward transform for real-valued fields"""
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus.metrics.mt_spectrum import metric_spectrum
+
+from .helper_methods import skip_if_missing
+
+
+def get_amplitude(cell_field):
+    # odd shape to test the Hermitian symmetry of uneven sizes
+    return np.abs(cell_field)[:, :-1]
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+@pytest.mark.parametrize("padding", [True, False])
+def test_real_input_numpy(cell_field, kernel, padding):
+    kwargs = dict(field=get_amplitude(cell_field),
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6,
+                  kernel=kernel,
+                  padding=padding)
+    rf = nrefocus.RefocusNumpy(real_input=True, **kwargs)
+    reference = nrefocus.RefocusNumpy(**kwargs)
+    nx = rf.shape[1]
+    assert rf.fft_origin.shape == (rf.shape[0], nx // 2 + 1)
+    assert rf.shape == reference.shape
+    for distance in [-1e-6, 2e-6]:
+        assert np.allclose(rf.propagate(distance),
+                           reference.propagate(distance),
+                           rtol=0, atol=1e-12)
+    assert np.allclose(rf.propagate_many([0, 1e-6]),
+                       reference.propagate_many([0, 1e-6]),
+                       rtol=0, atol=1e-12)
+    assert np.allclose(metric_spectrum(rf, 1e-6),
+                       metric_spectrum(reference, 1e-6),
+                       rtol=1e-12, atol=0)
+    spectrum = rf.get_spectrum(1e-6)
+    assert spectrum.shape == rf.shape
+    assert np.allclose(spectrum, reference.get_spectrum(1e-6),
+                       rtol=0, atol=1e-9)
+    assert np.allclose(spectrum,
+                       reference.fft_origin * reference.get_kernel(1e-6),
+                       rtol=0, atol=1e-9)
+
+
+@skip_if_missing("pyfftw")
+def test_real_input_pyfftw(cell_field):
+    kwargs = dict(field=get_amplitude(cell_field),
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6)
+    rf = nrefocus.RefocusPyFFTW(real_input=True, **kwargs)
+    reference = nrefocus.RefocusNumpy(**kwargs)
+    assert np.allclose(rf.propagate(1e-6), reference.propagate(1e-6),
+                       rtol=0, atol=1e-12)
+
+
+def test_real_input_1d():
+    pixel_size = 1e-6
+    kwargs = dict(field=np.linspace(0, 1, 201),
+                  wavelength=3.25*pixel_size,
+                  pixel_size=pixel_size)
+    rf = nrefocus.RefocusNumpy1D(real_input="auto", **kwargs)
+    assert rf.real_input
+    assert rf.fft_origin.shape == (rf.shape[0] // 2 + 1,)
+    reference = nrefocus.RefocusNumpy1D(**kwargs)
+    assert np.allclose(rf.propagate(2e-6), reference.propagate(2e-6),
+                       rtol=0, atol=1e-12)
+
+
+def test_real_input_complex_field(cell_field):
+    kwargs = dict(wavelength=647e-9,
+                  pixel_size=0.139e-6)
+    rf = nrefocus.RefocusNumpy(field=cell_field, real_input="auto",
+                               **kwargs)
+    assert not rf.real_input
+    # complex fields without imaginary part are accepted
+    field = get_amplitude(cell_field).astype(complex)
+    rf = nrefocus.RefocusNumpy(field=field, real_input=True, **kwargs)
+    assert rf.real_input
+    with pytest.raises(ValueError, match="real-valued"):
+        nrefocus.RefocusNumpy(field=cell_field, real_input=True, **kwargs)
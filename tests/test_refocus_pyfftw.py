@@ -1,8 +1,11 @@
+import multiprocessing as mp
 import pathlib
 
 import numpy as np
+import pytest
 
 import nrefocus
+from nrefocus._threads import get_thread_budget
 
 
 data_path = pathlib.Path(__file__).parent / "data"
@@ -23,6 +26,54 @@ def test_2d_refocus1():
     assert np.allclose(np.array(refocused).flatten().view(float), reference)
 
 
+@pytest.mark.parametrize("planner_effort", ["FFTW_ESTIMATE", "FFTW_PATIENT"])
+def test_2d_refocus_planner(cell_field, planner_effort):
+    kwargs = dict(field=cell_field,
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6)
+    rf = nrefocus.RefocusPyFFTW(threads=2,
+                                planner_effort=planner_effort,
+                                planning_timelimit=1,
+                                **kwargs)
+    assert rf.threads == 2
+    assert planner_effort in rf._ifft_obj.flags
+    reference = nrefocus.RefocusNumpy(**kwargs)
+    assert np.allclose(rf.fft_origin, reference.fft_origin,
+                       rtol=0, atol=1e-10)
+    assert np.allclose(rf.propagate(1e-6), reference.propagate(1e-6),
+                       rtol=0, atol=1e-12)
+
+
+def test_2d_refocus_planner_invalid(cell_field):
+    with pytest.raises(ValueError, match="Unknown planner effort"):
+        nrefocus.RefocusPyFFTW(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               planner_effort="FFTW_QUICK")
+
+
+def test_thread_budget(monkeypatch):
+    monkeypatch.delenv("NREFOCUS_NUM_THREADS", raising=False)
+    monkeypatch.setenv("OMP_NUM_THREADS", "3")
+    assert get_thread_budget() == 3
+    monkeypatch.setenv("NREFOCUS_NUM_THREADS", "5")
+    assert get_thread_budget() == 5
+    monkeypatch.setenv("NREFOCUS_NUM_THREADS", "")
+    monkeypatch.delenv("OMP_NUM_THREADS")
+    assert 1 <= get_thread_budget() <= mp.cpu_count()
+
+
+def _get_thread_budget_in_worker(_):
+    return get_thread_budget()
+
+
+def test_thread_budget_pool(monkeypatch):
+    monkeypatch.delenv("NREFOCUS_NUM_THREADS", raising=False)
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    with mp.Pool(1) as pool:
+        assert pool.map(_get_thread_budget_in_worker, [0]) == [1]
+
+
 if __name__ == "__main__":
     # Run all tests
     loc = locals()
@@ -0,0 +1,78 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+data_path = pathlib.Path(__file__).parent / "data"
+
+
+@skip_if_missing("scipy")
+def test_2d_refocus1():
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusScipy(field=np.arange(256).reshape(16, 16),
+                               wavelength=8.25*pixel_size,
+                               pixel_size=pixel_size,
+                               medium_index=1.533,
+                               distance=0,
+                               kernel="helmholtz",
+                               padding=False)
+
+    refocused = rf.propagate(distance=2.13*pixel_size)
+    reference = np.loadtxt(data_path / "test_2d_refocus1.txt")
+    assert np.allclose(np.array(refocused).flatten().view(float), reference)
+
+
+@skip_if_missing("scipy")
+@pytest.mark.parametrize("workspace", [True, False])
+@pytest.mark.parametrize("overwrite_x", [True, False])
+@pytest.mark.parametrize("dtype", ["complex128", "complex64"])
+def test_2d_refocus_numpy(cell_field, workspace, overwrite_x, dtype):
+    kwargs = dict(wavelength=647e-9,
+                  pixel_size=0.139e-6,
+                  workspace=workspace,
+                  dtype=dtype)
+    rf = nrefocus.RefocusScipy(field=cell_field, workers=2,
+                               overwrite_x=overwrite_x, **kwargs)
+    reference = nrefocus.RefocusNumpy(field=cell_field, **kwargs)
+    atol = 1e-12 if dtype == "complex128" else 1e-5
+    for distance in [1e-6, -2e-6]:
+        refocused = rf.propagate(distance)
+        assert refocused.dtype == np.dtype(dtype)
+        assert np.allclose(refocused, reference.propagate(distance),
+                           rtol=0, atol=atol)
+    assert np.allclose(rf.propagate_many([0, 1e-6]),
+                       reference.propagate_many([0, 1e-6]),
+                       rtol=0, atol=atol)
+
+
+@skip_if_missing("scipy")
+def test_2d_refocus_input_not_overwritten(cell_field):
+    field = np.abs(cell_field)
+    field_copy = field.copy()
+    for real_input in [True, False]:
+        nrefocus.RefocusScipy(field=field,
+                              wavelength=647e-9,
+                              pixel_size=0.139e-6,
+                              padding=False,
+                              real_input=real_input)
+        assert np.all(field == field_copy)
+
+
+@skip_if_missing("scipy")
+def test_best_interface(monkeypatch):
+    monkeypatch.setattr(nrefocus.iface, "RefocusCupy", None)
+    monkeypatch.setattr(nrefocus.iface, "RefocusPyFFTW", None)
+    assert nrefocus.get_best_interface() is nrefocus.RefocusScipy
+
+
+if __name__ == "__main__":
+    # Run all tests
+    loc = locals()
+    for key in list(loc.keys()):
+        if key.startswith("test_") and hasattr(loc[key], "__call__"):
+            loc[key]()
@@ -0,0 +1,191 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus.iface import base
+
+from .helper_methods import skip_if_missing
+
+
+def get_stack(field, num=4):
+    field = field[50:90, 40:72]
+    return np.array([field * np.exp(0.1j * ii) + 0.05 * ii
+                     for ii in range(num)])
+
+
+def get_kwargs(**kwargs):
+    kw = {"wavelength": 647e-9,
+          "pixel_size": 0.139e-6,
+          "medium_index": 1.335,
+          "distance": 0,
+          }
+    kw.update(kwargs)
+    return kw
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+@pytest.mark.parametrize("padding", [True, False, "mirror"])
+def test_stack_same_distance(cell_field, kernel, padding):
+    stack = get_stack(cell_field)
+    kw = get_kwargs(kernel=kernel, padding=padding)
+    rf = nrefocus.RefocusStack(field=stack, chunk_size=3, **kw)
+    assert rf.stack_shape == (4,)
+    assert rf.field_shape == (40, 32)
+    refoc = rf.propagate(0.5e-6)
+    assert refoc.shape == stack.shape
+    for field, rfield in zip(stack, refoc):
+        rf2 = nrefocus.RefocusNumpy(field=field, **kw)
+        assert np.allclose(rfield, rf2.propagate(0.5e-6),
+                           rtol=0, atol=1e-12)
+
+
+def test_stack_kernel_evaluated_once(cell_field, monkeypatch):
+    stack = get_stack(cell_field, num=5)
+    rf = nrefocus.RefocusStack(field=stack, chunk_size=2, **get_kwargs())
+    calls = []
+    evaluate_quadrant = rf._evaluate_quadrant
+    monkeypatch.setattr(rf, "_evaluate_quadrant",
+                        lambda d: calls.append(d) or evaluate_quadrant(d))
+    rf.propagate(0.3e-6)
+    assert len(calls) == 1
+
+
+def test_stack_per_field_distance(cell_field):
+    stack = get_stack(cell_field)
+    kw = get_kwargs(distance=0.1e-6)
+    distances = np.linspace(-0.5e-6, 1e-6, len(stack))
+    rf = nrefocus.RefocusStack(field=stack, chunk_size=3, **kw)
+    refoc = rf.propagate(distances)
+    for field, dd, rfield in zip(stack, distances, refoc):
+        rf2 = nrefocus.RefocusNumpy(field=field, **kw)
+        assert np.allclose(rfield, rf2.propagate(dd), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("real_input", [False, True])
+def test_stack_options(cell_field, real_input):
+    stack = get_stack(cell_field)
+    if real_input:
+        stack = np.abs(stack)
+    kw = get_kwargs(real_input=real_input, pad_size="fast")
+    rf = nrefocus.RefocusStack(field=stack, workspace=True, chunk_size=3,
+                               workers=2, **kw)
+    out = np.empty(stack.shape, dtype=complex)
+    refoc = rf.propagate(0.5e-6, out=out)
+    assert refoc is out
+    roi = rf.propagate(0.5e-6, roi=(slice(5, 15), slice(3, 30)))
+    assert np.allclose(roi, refoc[:, 5:15, 3:30], rtol=0, atol=1e-12)
+    for field, rfield in zip(stack, refoc):
+        rf2 = nrefocus.RefocusNumpy(field=field, **kw)
+        assert np.allclose(rfield, rf2.propagate(0.5e-6),
+                           rtol=0, atol=1e-12)
+
+
+def test_stack_default_chunk_size(cell_field, monkeypatch):
+    stack = get_stack(cell_field)
+    rf = nrefocus.RefocusStack(field=stack, **get_kwargs())
+    # the padded field has 80x64 complex128 pixels
+    assert rf.chunk_size == base.CHUNK_BYTES // (80 * 64 * 16)
+    monkeypatch.setattr(base, "CHUNK_BYTES", 2 * 80 * 64 * 16)
+    assert rf.chunk_size == 2
+
+
+def test_stack_sweep_and_many(cell_field):
+    stack = get_stack(cell_field)
+    distances = [-0.2e-6, 0, 0.2e-6]
+    rf = nrefocus.RefocusStack(field=stack, chunk_size=3, **get_kwargs())
+    zstack = rf.propagate_many(distances)
+    assert zstack.shape == (3,) + stack.shape
+    for ii, plane in enumerate(rf.sweep(distances)):
+        assert np.allclose(plane, zstack[ii], rtol=0, atol=1e-12)
+        assert np.allclose(plane, rf.propagate(distances[ii]),
+                           rtol=0, atol=1e-12)
+
+
+def test_stack_errors(cell_field):
+    stack = get_stack(cell_field)
+    rf = nrefocus.RefocusStack(field=stack, **get_kwargs())
+    with pytest.raises(ValueError, match="one distance per field"):
+        rf.propagate(np.zeros(2))
+    with pytest.raises(TypeError, match="autofocus_stack"):
+        rf.autofocus(interval=(-1e-6, 1e-6))
+    with pytest.raises(ValueError, match="M, Ny, Nx"):
+        nrefocus.RefocusStack(field=stack[0], **get_kwargs())
+
+
+@pytest.mark.parametrize("chunk_size", [None, 3])
+def test_stack_propagate_stack(cell_field, chunk_size, monkeypatch):
+    stack = get_stack(cell_field, num=7)
+    kw = get_kwargs(distance=0.1e-6)
+    reference = nrefocus.RefocusStack(field=stack, **kw)
+    calls = []
+    evaluate_quadrant = nrefocus.RefocusStack._evaluate_quadrant
+    monkeypatch.setattr(
+        nrefocus.RefocusStack, "_evaluate_quadrant",
+        lambda self, d: calls.append(d) or evaluate_quadrant(self, d))
+    nrefocus.kernel_cache.clear()
+    refoc = nrefocus.RefocusStack.propagate_stack(
+        stack, 0.5e-6, chunk_size=chunk_size, **kw)
+    # the kernel is shared by all chunks
+    assert len(calls) == 1
+    assert np.allclose(refoc, reference.propagate(0.5e-6),
+                       rtol=0, atol=1e-12)
+    distances = np.linspace(-0.5e-6, 1e-6, len(stack))
+    out = np.empty(stack.shape, dtype=complex)
+    refoc = nrefocus.RefocusStack.propagate_stack(
+        stack, distances, out=out, chunk_size=chunk_size, **kw)
+    assert refoc is out
+    assert np.allclose(refoc, reference.propagate(distances),
+                       rtol=0, atol=1e-12)
+
+
+def test_refocus_stack_memory_bounded(monkeypatch):
+    stack = np.exp(1j * np.random.default_rng(42).random((40, 64, 64)))
+    # chunks of two padded fields
+    chunk_bytes = 2 * 128 * 128 * 16
+    monkeypatch.setattr(base, "CHUNK_BYTES", chunk_bytes)
+    nrefocus.kernel_cache.clear()
+    tracemalloc.start()
+    try:
+        rstack = nrefocus.refocus_stack(stack, d=2.5, nm=1.335, res=4.6,
+                                        num_cpus=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the padded spectra of all fields would take 20 chunks
+    assert peak < rstack.nbytes + 6 * chunk_bytes
+
+
+@pytest.mark.parametrize("ndim", [1, 2])
+def test_refocus_stack_batched(cell_field, ndim):
+    stack = get_stack(cell_field)
+    if ndim == 1:
+        stack = stack[:, 20]
+    rstack = nrefocus.refocus_stack(stack, d=2.5, nm=1.335, res=4.6,
+                                    num_cpus=1)
+    for field, rfield in zip(stack, rstack):
+        assert np.allclose(rfield,
+                           nrefocus.refocus(field, d=2.5, nm=1.335, res=4.6),
+                           rtol=0, atol=1e-12)
+
+
+def test_refocus_stack_per_field_distance(cell_field):
+    stack = get_stack(cell_field, num=3)
+    distances = np.array([-1.5, 0.5, 2.5])
+    rstack = nrefocus.refocus_stack(stack, d=distances, nm=1.335, res=4.6,
+                                    num_cpus=2)
+    for field, dd, rfield in zip(stack, distances, rstack):
+        assert np.allclose(rfield,
+                           nrefocus.refocus(field, d=dd, nm=1.335, res=4.6),
+                           rtol=0, atol=1e-12)
+
+
+@skip_if_missing("scipy")
+def test_stack_workers(cell_field):
+    stack = get_stack(cell_field)
+    rf1 = nrefocus.RefocusStack(field=stack, workers=1, **get_kwargs())
+    rf2 = nrefocus.RefocusStack(field=stack, workers=2, **get_kwargs())
+    assert rf2.workers == 2
+    assert np.allclose(rf1.propagate(0.5e-6), rf2.propagate(0.5e-6),
+                       rtol=0, atol=1e-12)
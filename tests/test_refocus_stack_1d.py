@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import nrefocus
+
+
+def get_lines(num=5, size=60, seed=42):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(-1, 1, size)
+    lines = []
+    for ii in range(num):
+        phase = rng.uniform(0.5, 2) * np.exp(-(x - 0.1 * ii)**2 / 0.05)
+        lines.append(rng.uniform(0.8, 1.2) * np.exp(1j * phase))
+    return np.array(lines)
+
+
+def get_kwargs(**kwargs):
+    kw = {"wavelength": 500e-9,
+          "pixel_size": 1e-6,
+          "medium_index": 1.333,
+          "distance": 0,
+          }
+    kw.update(kwargs)
+    return kw
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+@pytest.mark.parametrize("padding", [True, False, "mirror", "apodize"])
+def test_stack_1d_same_distance(kernel, padding):
+    lines = get_lines()
+    kw = get_kwargs(kernel=kernel, padding=padding)
+    rf = nrefocus.RefocusStack1D(field=lines, **kw)
+    assert rf.stack_shape == (5,)
+    assert rf.field_shape == (60,)
+    assert rf.shape == ((60,) if padding in [False, "apodize"] else (120,))
+    refoc = rf.propagate(4e-6)
+    assert refoc.shape == lines.shape
+    for line, rline in zip(lines, refoc):
+        rf1 = nrefocus.RefocusNumpy1D(field=line, **kw)
+        assert np.allclose(rline, rf1.propagate(4e-6), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+def test_stack_1d_per_line_distance(kernel):
+    lines = get_lines()
+    kw = get_kwargs(kernel=kernel, distance=1e-6)
+    distances = np.linspace(-3e-6, 5e-6, len(lines))
+    rf = nrefocus.RefocusStack1D(field=lines, **kw)
+    refoc = rf.propagate(distances)
+    for line, dd, rline in zip(lines, distances, refoc):
+        rf1 = nrefocus.RefocusNumpy1D(field=line, **kw)
+        assert np.allclose(rline, rf1.propagate(dd), rtol=0, atol=1e-12)
+
+
+def test_stack_1d_options():
+    lines = get_lines().real
+    kw = get_kwargs(real_input=True, workspace=True, pad_size="fast",
+                    dtype="complex64")
+    distances = np.linspace(-3e-6, 5e-6, len(lines))
+    rf = nrefocus.RefocusStack1D(field=lines, **kw)
+    out = np.empty(lines.shape, dtype=np.complex64)
+    refoc = rf.propagate(distances, out=out)
+    assert refoc is out
+    roi = rf.propagate(distances, roi=slice(10, 20))
+    assert np.allclose(roi, refoc[:, 10:20], rtol=0, atol=1e-5)
+    for line, dd, rline in zip(lines, distances, refoc):
+        rf1 = nrefocus.RefocusNumpy1D(field=line, **kw)
+        assert np.allclose(rline, rf1.propagate(dd), rtol=0, atol=1e-5)
+
+
+def test_stack_1d_propagate_many():
+    lines = get_lines()
+    distances = [-2e-6, 0, 3e-6]
+    rf = nrefocus.RefocusStack1D(field=lines, **get_kwargs())
+    zstack = rf.propagate_many(distances)
+    assert zstack.shape == (3,) + lines.shape
+    for ii, dd in enumerate(distances):
+        assert np.allclose(zstack[ii], rf.propagate(dd), rtol=0, atol=1e-12)
+
+
+def test_stack_1d_errors():
+    rf = nrefocus.RefocusStack1D(field=get_lines(), **get_kwargs())
+    with pytest.raises(ValueError, match="one distance per field"):
+        rf.propagate(np.zeros(3))
+    with pytest.raises(TypeError, match="autofocus_stack"):
+        rf.autofocus(interval=(-1e-6, 1e-6))
+    with pytest.raises(ValueError, match="n_lines, N"):
+        nrefocus.RefocusStack1D(field=get_lines()[0], **get_kwargs())
+
+
+def test_pad_add_stack():
+    lines = get_lines()
+    for mode in nrefocus.pad.PAD_MODES:
+        padded = nrefocus.pad.pad_add(lines, mode=mode, stack_ndim=1)
+        assert padded.shape == ((5, 60) if mode == "apodize" else (5, 120))
+        for line, pline in zip(lines, padded):
+            assert np.array_equal(pline,
+                                  nrefocus.pad.pad_add(line, mode=mode))
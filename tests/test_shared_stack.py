@@ -0,0 +1,52 @@
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus._shared_stack import SharedStack
+
+
+def _square_shared(args):
+    src_spec, dst_spec, index = args
+    src = SharedStack.attach(src_spec)
+    dst = SharedStack.attach(dst_spec)
+    dst.array[index] = src.array[index] ** 2
+    src.close()
+    dst.close()
+
+
+def test_shared_stack_attach():
+    data = np.arange(24, dtype=complex).reshape(2, 3, 4)
+    with SharedStack(data.shape, data.dtype, data=data) as src:
+        assert np.array_equal(src.array, data)
+        other = SharedStack.attach(src.spec)
+        other.array[1] = 0
+        other.close()
+        assert not np.any(src.array[1])
+    assert src.array is None
+
+
+def test_shared_stack_workers():
+    data = np.arange(24.).reshape(4, 6)
+    with SharedStack(data.shape, data.dtype, data=data) as src, \
+            SharedStack(data.shape, data.dtype) as dst:
+        assert not np.any(dst.array)
+        with mp.Pool(2) as p:
+            p.map(_square_shared, [(src.spec, dst.spec, ii)
+                                   for ii in range(4)])
+        assert np.array_equal(dst.array, data**2)
+
+
+def test_shared_stack_removed():
+    stack = SharedStack((2, 2), float)
+    name = stack.spec[0]
+    stack.close()
+    with pytest.raises(FileNotFoundError):
+        SharedStack.attach((name, (2, 2), "<f8"))
+
+
+def test_refocus_stack_distances_shape():
+    stack = np.ones((3, 10, 10), dtype=complex)
+    with pytest.raises(ValueError, match="one distance per field"):
+        nrefocus.refocus_stack(stack, d=[1, 2], nm=1.335, res=4.6)
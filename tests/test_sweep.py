@@ -0,0 +1,83 @@
+"""Test incremental kernel stepping for distance sweeps"""
+import numpy as np
+import pytest
+
+import nrefocus
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.mark.parametrize("kernel", ["helmholtz", "fresnel"])
+def test_sweep_kernels_evenly_spaced(cell_field, kernel):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               kernel=kernel)
+    distances = np.linspace(-5e-6, 5e-6, 100)
+    eps = np.finfo(float).eps
+    phase_max = np.max(np.abs(rf._get_kz()[0])) * 5e-6 / rf.pixel_size
+    for dd, fft_kernel in zip(distances, rf.sweep_kernels(distances)):
+        reference = rf.get_kernel(dd)
+        # documented tolerance
+        assert np.max(np.abs(fft_kernel - reference)) \
+            < (4 * 32 + 2 * phase_max) * eps
+
+
+def test_sweep_kernels_not_evenly_spaced():
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16),
+                               wavelength=8.25*pixel_size,
+                               pixel_size=pixel_size,
+                               medium_index=1.533,
+                               padding=False)
+    distances = np.array([0, 1, 3, 7]) * pixel_size
+    for dd, fft_kernel in zip(distances, rf.sweep_kernels(distances)):
+        assert np.all(fft_kernel == rf.get_kernel(dd))
+
+
+@pytest.mark.parametrize("reanchor", [0, -1])
+def test_sweep_kernels_reanchor_invalid(reanchor):
+    rf = nrefocus.RefocusNumpy(field=np.arange(256).reshape(16, 16),
+                               wavelength=8.25e-6,
+                               pixel_size=1e-6,
+                               padding=False)
+    distances = np.linspace(0, 1e-6, 10)
+    # raised when calling, not when iterating
+    with pytest.raises(ValueError, match="reanchor must be >= 1"):
+        rf.sweep_kernels(distances, reanchor=reanchor)
+    with pytest.raises(ValueError, match="reanchor must be >= 1"):
+        rf.sweep(distances, reanchor=reanchor)
+
+
+def test_sweep_fields(cell_field):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               distance=1e-6)
+    distances = np.linspace(-2e-6, 2e-6, 11)
+    for dd, field in zip(distances, rf.sweep(distances, reanchor=4)):
+        assert np.allclose(field, rf.propagate(dd), rtol=0, atol=1e-12)
+
+
+@skip_if_missing("pyfftw")
+def test_sweep_fields_pyfftw(cell_field):
+    rf = nrefocus.RefocusPyFFTW(field=cell_field,
+                                wavelength=647e-9,
+                                pixel_size=0.139e-6,
+                                distance=1e-6)
+    distances = np.linspace(-2e-6, 2e-6, 11)
+    for dd, field in zip(distances, rf.sweep(distances, reanchor=4)):
+        # pyfftw returns a view of its output buffer
+        field = np.array(field, copy=True)
+        assert np.allclose(field, rf.propagate(dd), rtol=0, atol=1e-12)
+
+
+def test_sweep_fields_1d():
+    pixel_size = 1e-6
+    rf = nrefocus.RefocusNumpy1D(field=np.arange(200),
+                                 wavelength=3.25*pixel_size,
+                                 pixel_size=pixel_size,
+                                 medium_index=1.333)
+    distances = np.arange(10) * 4.2 * pixel_size
+    for dd, field in zip(distances, rf.sweep(distances)):
+        assert np.allclose(field, rf.propagate(dd), rtol=0, atol=1e-10)
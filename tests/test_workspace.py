@@ -0,0 +1,78 @@
+"""Test preallocated workspace and output arrays"""
+import numpy as np
+import pytest
+
+import nrefocus
+from nrefocus import kernel_cache
+
+from .helper_methods import skip_if_missing
+
+
+@pytest.mark.parametrize("dtype", ["complex128", "complex64"])
+def test_workspace_out(cell_field, dtype):
+    kwargs = dict(field=cell_field,
+                  wavelength=647e-9,
+                  pixel_size=0.139e-6,
+                  dtype=dtype)
+    rf = nrefocus.RefocusNumpy(workspace=True, **kwargs)
+    reference = nrefocus.RefocusNumpy(**kwargs).propagate(1e-6)
+
+    out = np.zeros(cell_field.shape, dtype=dtype)
+    refocused = rf.propagate(1e-6, out=out)
+    assert refocused is out
+    assert np.allclose(out, reference, rtol=0, atol=1e-5)
+
+
+def test_workspace_ownership(cell_field):
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               workspace=True)
+    view = rf.propagate(1e-6, copy=False)
+    assert np.shares_memory(view, rf._get_workspace()["output"])
+    owned = rf.propagate(1e-6)
+    assert not np.shares_memory(owned, rf._get_workspace()["output"])
+    assert np.all(view == owned)
+    # the view is overwritten in the next call
+    rf.propagate(-1e-6, copy=False)
+    assert not np.all(view == owned)
+
+
+def test_workspace_fused_product(cell_field):
+    """uncached kernels are multiplied in the product buffer"""
+    kernel_cache.clear()
+    rf = nrefocus.RefocusNumpy(field=cell_field,
+                               wavelength=647e-9,
+                               pixel_size=0.139e-6,
+                               workspace=True)
+    buffer = rf._get_workspace()["product"]
+    product = rf._get_product(1e-6, out=buffer)
+    assert product is buffer
+    assert len(kernel_cache) == 1  # only the kz grid
+    assert np.allclose(product, rf.fft_origin * rf.get_kernel(1e-6),
+                       rtol=0, atol=1e-12)
+
+
+def test_workspace_1d():
+    pixel_size = 1e-6
+    kwargs = dict(field=np.linspace(0, 1, 200),
+                  wavelength=3.25*pixel_size,
+                  pixel_size=pixel_size,
+                  medium_index=1.333)
+    rf = nrefocus.RefocusNumpy1D(workspace=True, **kwargs)
+    reference = nrefocus.RefocusNumpy1D(**kwargs).propagate(4e-6)
+    assert np.allclose(rf.propagate(4e-6), reference, rtol=0, atol=1e-14)
+
+
+@skip_if_missing("pyfftw")
+def test_workspace_pyfftw_ownership(cell_field):
+    rf = nrefocus.RefocusPyFFTW(field=cell_field,
+                                wavelength=647e-9,
+                                pixel_size=0.139e-6)
+    view = rf.propagate(1e-6, copy=False)
+    assert np.shares_memory(view, rf._ifft_obj.output_array)
+    owned = rf.propagate(1e-6)
+    assert not np.shares_memory(owned, rf._ifft_obj.output_array)
+    out = np.zeros(cell_field.shape, dtype=complex)
+    assert rf.propagate(1e-6, out=out) is out
+    assert np.all(out == owned)